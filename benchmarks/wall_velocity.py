@@ -0,0 +1,101 @@
+"""Benchmark the Python and tabulated piston velocity functions.
+
+Integrates a compression of a fuel/air mixture in a detailed mechanism
+in the same way as `uconnrcmpy.Simulation`, once with the velocity
+given by calling a `uconnrcmpy.simulations.VolumeProfile` and once with
+the `cantera.Tabulated1` function from `VolumeProfile.tabulated`, and
+prints the best time of each and the speedup. The volume trace is
+sampled with each of the time steps, which are also the largest time
+steps of the integrator, so the length of the trace and the number of
+evaluations of the velocity change together. Run with::
+
+    python benchmarks/wall_velocity.py --chem-file gri30.xml
+"""
+
+# System imports
+import argparse
+import time as timer
+
+# Third-party imports
+import numpy as np
+import cantera as ct
+
+# Local imports
+from uconnrcmpy.simulations import VolumeProfile
+from uconnrcmpy.solutions import solution_pool
+
+
+def volume_trace(compression_time=0.03, compression_ratio=15.0, end_time=0.1, time_step=1.0E-5):
+    """Build a volume trace of a compression followed by a constant volume.
+
+    Returns
+    -------
+    `tuple` of `numpy.ndarray`
+        The time and the volume
+    """
+    time = np.arange(0, end_time + time_step/2, time_step)
+    progress = np.clip(time/compression_time, 0, 1)
+    volume = 1 - (1 - 1/compression_ratio)*(1 - np.cos(np.pi*progress))/2
+    return time, volume
+
+
+def integrate(chem_file, composition, initial_temperature, velocity, time_step, end_time,
+              is_reactive):
+    """Integrate the reactor network until the end time.
+
+    Returns
+    -------
+    `tuple`
+        The number of steps and the final temperature
+    """
+    with solution_pool.checkout(chem_file) as gas, solution_pool.checkout('air.xml') as air:
+        gas.TPX = initial_temperature, 1.0E5, composition
+        if not is_reactive:
+            gas.set_multiplier(0)
+        reac = ct.IdealGasReactor(gas)
+        env = ct.Reservoir(air)
+        ct.Wall(reac, env, A=1.0, velocity=velocity)
+        netw = ct.ReactorNet([reac])
+        netw.set_max_time_step(time_step)
+        n_steps = 0
+        while reac.T < 2500.0 and netw.time < end_time:
+            netw.step()
+            n_steps += 1
+        return n_steps, reac.T
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--chem-file', default='gri30.xml', help='Chemistry file')
+    parser.add_argument('--composition', default='CH4:1.0, O2:2.0, N2:7.52',
+                        help='Mole fractions of the mixture')
+    parser.add_argument('--initial-temperature', type=float, default=400.0,
+                        help='Initial temperature, in Kelvin')
+    parser.add_argument('--end-time', type=float, default=0.1, help='End time, in seconds')
+    parser.add_argument('--time-steps', type=float, nargs='+', default=[1.0E-3, 1.0E-4, 1.0E-5],
+                        help='Time steps of the volume trace, in seconds')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs of each case')
+    args = parser.parse_args(argv)
+
+    print('{:<12} {:>8} {:>8} {:>10} {:>10} {:>8} {:>8}'.format(
+        'case', 'points', 'steps', 'python', 'tabulated', 'speedup', 'T'))
+    for is_reactive in (False, True):
+        for time_step in args.time_steps:
+            time, volume = volume_trace(end_time=args.end_time, time_step=time_step)
+            profile = VolumeProfile(time, volume)
+            best = {}
+            for name, velocity in (('python', profile), ('tabulated', profile.tabulated())):
+                best[name] = np.inf
+                for _ in range(args.repeat):
+                    start = timer.perf_counter()
+                    n_steps, end_temp = integrate(args.chem_file, args.composition,
+                                                  args.initial_temperature, velocity, time_step,
+                                                  args.end_time, is_reactive)
+                    best[name] = min(best[name], timer.perf_counter() - start)
+            print('{:<12} {:>8d} {:>8d} {:>9.3f}s {:>9.3f}s {:>7.2f}x {:>8.1f}'.format(
+                'reactive' if is_reactive else 'nonreactive', len(time), n_steps,
+                best['python'], best['tabulated'], best['python']/best['tabulated'], end_temp))
+
+
+if __name__ == '__main__':
+    main()
@@ -62,6 +62,7 @@ setup(
     entry_points={
         'console_scripts': [
             'processrcmfolder=uconnrcmpy.dataprocessing:process_folder',
+            'warmmechanismcache=uconnrcmpy.mechanisms:main',
         ],
     },
     install_requires=install_requires,
@@ -1,5 +1,7 @@
 import sys
 from .conditions import Condition, AltCondition, process_folder, process_alt_folder
+from .sensitivity import SensitivityAnalysis
+from .catalogs import ExperimentCatalog
 from ._version import __version__
 
 if sys.version_info[0] < 3 and sys.version_info[1] < 4:
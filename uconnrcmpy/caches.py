@@ -0,0 +1,190 @@
+"""Size-bounded on-disk caches shared by several processes"""
+
+# System imports
+import hashlib
+import os
+from pathlib import Path
+
+
+def cache_home():
+    """Find the folder under which UConnRCMPy stores its caches.
+
+    Returns
+    -------
+    `pathlib.Path`
+        The folder given by the ``UCONNRCMPY_CACHE_DIR`` environment
+        variable if it is set. Otherwise, the ``uconnrcmpy`` folder in
+        ``XDG_CACHE_HOME``, or in ``~/.cache`` if that is not set.
+    """
+    if 'UCONNRCMPY_CACHE_DIR' in os.environ:
+        return Path(os.environ['UCONNRCMPY_CACHE_DIR'])
+    cache_home = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return Path(cache_home) / 'uconnrcmpy'
+
+
+def file_hash(file_path, chunk_size=1024**2):
+    """Compute the hash of the contents of a file.
+
+    Parameters
+    ----------
+    file_path : `str` or `pathlib.Path`
+        Name of the file
+    chunk_size : `int`, optional
+        Number of bytes that are read at a time
+
+    Returns
+    -------
+    `str`
+        The hexadecimal SHA-1 hash
+    """
+    key = hashlib.sha1()
+    with open(str(file_path), 'rb') as in_file:
+        for chunk in iter(lambda: in_file.read(chunk_size), b''):
+            key.update(chunk)
+    return key.hexdigest()
+
+
+class DiskCache(object):
+    """Folder of cached files with least-recently-used eviction.
+
+    Subclasses decide what is stored under each key and set the
+    `suffix` of the files; this class keeps track of their use and
+    their total size.
+
+    Parameters
+    ----------
+    cache_dir : `str` or `pathlib.Path`
+        Folder where the files are stored
+    max_size : `int`
+        Largest total size of the files, in bytes
+
+    Attributes
+    ----------
+    cache_dir : `pathlib.Path`
+        Folder where the files are stored
+    max_size : `int`
+        Largest total size of the files, in bytes
+
+    Notes
+    -----
+    The modification time of a file is updated every time it is used.
+    When the total size of the cache is larger than ``max_size`` after a
+    file is added, the least recently used files are removed until it
+    fits, but the file that was just added is always kept. Files are
+    written under a temporary name and renamed, so several processes
+    can share the cache.
+    """
+
+    suffix = ''
+    """`str`: Extension of the files in the cache"""
+
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = Path(str(cache_dir))
+        self.max_size = max_size
+
+    def __repr__(self):
+        return '{}(cache_dir={self.cache_dir!r}, max_size={self.max_size!r})'.format(
+            type(self).__name__, self=self,
+        )
+
+    def path(self, key):
+        """Find the location of the file stored under a key.
+
+        Parameters
+        ----------
+        key : `str`
+            Hash that identifies the file
+
+        Returns
+        -------
+        `pathlib.Path`
+            Location of the file, which may not exist
+        """
+        return self.cache_dir / (key + self.suffix)
+
+    def touch(self, cache_path):
+        """Mark a file as used if it exists.
+
+        Parameters
+        ----------
+        cache_path : `pathlib.Path`
+            Location of the file
+
+        Returns
+        -------
+        `bool`
+            `True` if the file exists
+        """
+        try:
+            os.utime(str(cache_path))
+        except OSError:
+            return cache_path.exists()
+        return True
+
+    def temp_path(self, cache_path):
+        """Find a temporary location to write a file before renaming it.
+
+        The temporary location is unique to this process and does not
+        have the `suffix`, so it is never listed by `files`.
+
+        Parameters
+        ----------
+        cache_path : `pathlib.Path`
+            Final location of the file
+
+        Returns
+        -------
+        `pathlib.Path`
+            The temporary location
+        """
+        os.makedirs(str(self.cache_dir), exist_ok=True)
+        return cache_path.with_name(cache_path.name + '.tmp{}'.format(os.getpid()))
+
+    def files(self):
+        """List the files in the cache.
+
+        Returns
+        -------
+        `list` of `tuple`
+            The location and size in bytes of each file, from the least
+            to the most recently used
+        """
+        if not self.cache_dir.is_dir():
+            return []
+        files = []
+        for cache_file in self.cache_dir.iterdir():
+            if cache_file.suffix != self.suffix:
+                continue
+            try:
+                stat = cache_file.stat()
+            except OSError:
+                # Removed by another process
+                continue
+            files.append((stat.st_mtime, stat.st_size, cache_file))
+        return [(cache_file, size) for _, size, cache_file in sorted(files)]
+
+    def evict(self, keep=None):
+        """Remove the least recently used files larger than the limit.
+
+        Parameters
+        ----------
+        keep : `pathlib.Path`, optional
+            A file that is never removed
+        """
+        files = self.files()
+        total_size = sum(size for _, size in files)
+        for old_file, size in files:
+            if total_size <= self.max_size:
+                break
+            if old_file == keep:
+                continue
+            try:
+                old_file.unlink()
+            except OSError:
+                pass
+            total_size -= size
+
+    def clear(self):
+        """Remove all of the files from the cache."""
+        for old_file, _ in self.files():
+            old_file.unlink()
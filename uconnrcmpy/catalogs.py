@@ -0,0 +1,309 @@
+"""Indexed catalog of experiments and their results"""
+
+# System imports
+from collections import OrderedDict
+from datetime import datetime
+import os
+from pathlib import Path
+import sqlite3
+
+# Local imports
+from .conditions import process_files
+from .experiments import scan_file_name
+from .sinks import ResultsSink, plain, quote
+
+
+def file_metadata(file_path):
+    """Parse the metadata of an experiment from the name of its file.
+
+    Parameters
+    ----------
+    file_path : `str` or `pathlib.Path`
+        Name of the experimental file, in the format of either
+        `~uconnrcmpy.experiments.Experiment` or
+        `~uconnrcmpy.experiments.AltExperiment`
+
+    Returns
+    -------
+    `collections.OrderedDict`
+        The metadata from `~uconnrcmpy.experiments.scan_file_name`, with
+        the ``date`` and time in ISO format and the ``time_of_day``
+
+    Raises
+    ------
+    ValueError
+        If the name is not in a known format
+    """
+    metadata = scan_file_name(file_path)
+    if metadata is None:
+        raise ValueError('The name of {} is not in a known format'.format(file_path))
+    date = metadata.pop('date')
+    metadata['date'] = date.strftime('%Y-%m-%d %H:%M')
+    metadata['time_of_day'] = date.strftime('%H%M')
+    return metadata
+
+
+def sql_value(value):
+    """Convert a value of a criterion of a query to an SQLite value.
+
+    Parameters
+    ----------
+    value
+        Value of a column of the catalog
+
+    Returns
+    -------
+    The value as a Python object that can be compared with the column,
+    where a `datetime.datetime` is converted to the format of the
+    ``date`` column
+    """
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M')
+    return plain(value)
+
+
+class ExperimentCatalog(ResultsSink):
+    """SQLite catalog of the metadata and results of experiments.
+
+    Each experimental file has one row in the ``experiments`` table,
+    keyed by its ``path``, with the metadata parsed from the name of
+    the file by `file_metadata` and, once the file has been processed,
+    its results and the ``file_hash`` and ``parameters`` that identify
+    them. The metadata used to select experiments are indexed, so
+    queries do not read the experimental files.
+
+    The catalog is a `~uconnrcmpy.sinks.ResultsSink`, so it can be
+    given as the ``sink`` of `~uconnrcmpy.conditions.process_folder`.
+
+    Parameters
+    ----------
+    filename : `str` or `pathlib.Path`, optional
+        Name of the database file
+
+    Attributes
+    ----------
+    connection : `sqlite3.Connection`
+        The connection to the database
+    """
+
+    keeps_records = True
+
+    columns = OrderedDict([
+        ('path', 'TEXT PRIMARY KEY'),
+        ('kind', 'TEXT'),
+        ('reactive', 'INTEGER'),
+        ('fuel', 'TEXT'),
+        ('date', 'TEXT'),
+        ('time_of_day', 'TEXT'),
+        ('Tin', 'REAL'),
+        ('pin', 'REAL'),
+        ('spacers', 'REAL'),
+        ('shims', 'REAL'),
+        ('factor', 'REAL'),
+        ('file_hash', 'TEXT'),
+        ('parameters', 'TEXT'),
+        ('p_EOC', 'REAL'),
+        ('ignition_delay', 'REAL'),
+        ('first_stage', 'REAL'),
+        ('T_EOC', 'REAL'),
+        ('filter_frequency', 'REAL'),
+    ])
+    """`collections.OrderedDict`: SQL types of the columns of the
+    ``experiments`` table, keyed by their names"""
+
+    indexed_columns = ('Tin', 'pin', 'spacers', 'shims', 'date')
+    """`tuple` of `str`: Columns of the ``experiments`` table with an
+    index"""
+
+    def __init__(self, filename='catalog.db'):
+        self.filename = str(filename)
+        self.connection = sqlite3.connect(self.filename)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS experiments ({})'.format(
+            ', '.join('{} {}'.format(quote(name), sql_type)
+                      for name, sql_type in self.columns.items())))
+        for name in self.indexed_columns:
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS {} ON experiments ({})'.format(
+                    quote('experiments_' + name), quote(name)))
+        self.connection.commit()
+
+    def __repr__(self):
+        return 'ExperimentCatalog(filename={self.filename!r})'.format(self=self)
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM experiments').fetchone()[0]
+
+    def upsert(self, values):
+        """Insert or update the row of one file.
+
+        Parameters
+        ----------
+        values : `dict`
+            Values of the columns, which must include the ``path``.
+            Keys that are not `columns` are ignored, and the columns
+            that are not given keep their values.
+        """
+        values = OrderedDict((name, plain(value)) for name, value in values.items()
+                             if name in self.columns)
+        self.connection.execute('INSERT OR IGNORE INTO experiments (path) VALUES (?)',
+                                [values['path']])
+        self.connection.execute('UPDATE experiments SET {} WHERE path = ?'.format(
+            ', '.join('{} = ?'.format(quote(name)) for name in values)),
+            list(values.values()) + [values['path']])
+
+    def add_files(self, files):
+        """Add the metadata of experimental files to the catalog.
+
+        Parameters
+        ----------
+        files : `list` of `pathlib.Path`
+            Experimental files
+
+        Returns
+        -------
+        `dict`
+            Error messages of the files whose names are not in a known
+            format, keyed by the file
+        """
+        failures = {}
+        with self.connection:
+            for f in files:
+                try:
+                    metadata = file_metadata(f)
+                except ValueError as e:
+                    failures[f] = str(e)
+                    continue
+                metadata['path'] = str(Path(str(f)).resolve())
+                self.upsert(metadata)
+        return failures
+
+    def write(self, record):
+        """Store the results of a processed experiment.
+
+        Parameters
+        ----------
+        record : `dict`
+            Results of the experiment with the
+            `~uconnrcmpy.sinks.ResultsSink.manifest_columns`, as written
+            by `~uconnrcmpy.conditions.process_files`
+        """
+        with self.connection:
+            self.upsert(record)
+
+    def records(self):
+        cursor = self.connection.execute('SELECT * FROM experiments ORDER BY rowid')
+        names = [description[0] for description in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def scan(self, cti_file, path='.', alternate=False, jobs=1):
+        """Add the experiments in a folder and process the new ones.
+
+        The metadata of all of the files are added, and the files that
+        are new or have changed since they were processed are processed
+        by `~uconnrcmpy.conditions.process_files`.
+
+        Parameters
+        ----------
+        cti_file : `str` or `pathlib.Path`
+            File containing the CTI for Cantera
+        path : `str`, optional
+            Path to folder to be scanned. Defaults to the current
+            folder.
+        alternate : `bool`, optional
+            True to scan the files of
+            `~uconnrcmpy.conditions.process_alt_folder` instead of
+            `~uconnrcmpy.conditions.process_folder`. False by default.
+        jobs : `int` or `None`, optional
+            Number of worker processes that process the files
+
+        Returns
+        -------
+        `dict`
+            Error messages of the files that could not be added or
+            processed, keyed by the file
+        """
+        if alternate:
+            files = [f for f in Path(path).glob('Fuel_MF*.txt') if 'NR' not in f.name]
+        else:
+            files = list(Path(path).glob('[0-3]*.txt'))
+        failures = self.add_files(files)
+        files = [f for f in files if f not in failures]
+        _, process_failures = process_files(files, cti_file, alternate, jobs=jobs, sink=self)
+        failures.update(process_failures)
+        return failures
+
+    def query(self, reactive=None, processed=None, **criteria):
+        """Select experiments by their metadata.
+
+        Parameters
+        ----------
+        reactive : `bool`, optional
+            If given, only reactive or only non-reactive experiments are
+            selected
+        processed : `bool`, optional
+            If given, only experiments that have or have not been
+            processed are selected
+        criteria
+            Criteria on the other `columns`, such as ``Tin``, ``pin``,
+            ``spacers``, ``shims``, or ``date``. A value selects the
+            experiments with exactly that value, and a `tuple` of two
+            values selects the experiments between them, inclusive. Use
+            `None` for one end of a range without a bound at that end.
+            Dates are given as `datetime.datetime` or as strings in the
+            format ``YYYY-MM-DD HH:MM``.
+
+        Returns
+        -------
+        `list` of `dict`
+            The rows of the selected experiments, sorted by date
+
+        Examples
+        --------
+        All the reactive experiments at 333 K between 1100 and 1200
+        Torr::
+
+            catalog.query(reactive=True, Tin=333, pin=(1100, 1200))
+        """
+        clauses = []
+        values = []
+        if reactive is not None:
+            clauses.append('reactive = ?')
+            values.append(int(reactive))
+        if processed is not None:
+            clauses.append('file_hash IS {}NULL'.format('NOT ' if processed else ''))
+        for name, value in sorted(criteria.items()):
+            if name not in self.columns:
+                raise ValueError('Unknown column of the catalog: {}'.format(name))
+            if isinstance(value, tuple):
+                low, high = value
+                if low is not None:
+                    clauses.append('{} >= ?'.format(quote(name)))
+                    values.append(sql_value(low))
+                if high is not None:
+                    clauses.append('{} <= ?'.format(quote(name)))
+                    values.append(sql_value(high))
+            else:
+                clauses.append('{} = ?'.format(quote(name)))
+                values.append(sql_value(value))
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+        cursor = self.connection.execute(
+            'SELECT * FROM experiments{} ORDER BY date, path'.format(where), values)
+        names = [description[0] for description in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def remove_missing(self):
+        """Remove the rows of files that no longer exist.
+
+        Returns
+        -------
+        `int`
+            Number of rows that were removed
+        """
+        missing = [(path,) for (path,) in self.connection.execute('SELECT path FROM experiments')
+                   if not os.path.exists(path)]
+        with self.connection:
+            self.connection.executemany('DELETE FROM experiments WHERE path = ?', missing)
+        return len(missing)
+
+    def close(self):
+        self.connection.close()
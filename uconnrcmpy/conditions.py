@@ -1,8 +1,12 @@
 """Data Processing Module"""
 
 # System imports
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from glob import glob
+import os
 import platform
 import sys
 
@@ -14,12 +18,20 @@ import cantera as ct
 
 # Local imports
 from pyperclip import copy
-from .traces import (TemperatureFromPressure,
-                     VolumeFromPressure,
+from .traces import (IsentropicTrace,
                      PressureFromVolume,
                      )
-from .experiments import Experiment, AltExperiment
-from .simulations import Simulation
+from .isentropes import get_isentrope_table
+from .solutions import solution_pool
+from .caches import file_hash
+from .experiments import (Experiment,
+                          AltExperiment,
+                          experiment_cache,
+                          processing_key,
+                          scan_file_name,
+                          )
+from .sinks import open_sink
+from .simulations import Simulation, simulation_cache, stroke_key
 
 
 class Condition(object):
@@ -107,8 +119,11 @@ class Condition(object):
         with open(str(cti_file), 'r') as in_file:
             self.cti_source = in_file.read()
 
+        # Check the mechanism once with the thermo warnings shown. The
+        # Solution is kept in the pool for the rest of the process.
         ct.suppress_thermo_warnings(False)
-        ct.Solution(self.cti_file)
+        with solution_pool.checkout(self.cti_file):
+            pass
         ct.suppress_thermo_warnings()
 
     def __repr__(self):
@@ -293,7 +308,8 @@ class Condition(object):
             if self.reactive_file in self.reactive_experiments:
                 self.reactive_case = self.reactive_experiments[self.reactive_file]
             else:
-                self.reactive_case = Experiment(self.reactive_file, cti_file=self.cti_file)
+                self.reactive_case = Experiment(self.reactive_file, cti_file=self.cti_file,
+                                                experiment_cache=experiment_cache)
                 self.reactive_experiments[self.reactive_file] = self.reactive_case
 
     def add_nonreactive_case(self):
@@ -308,19 +324,32 @@ class Condition(object):
             if self.nonreactive_file in self.nonreactive_experiments:
                 self.nonreactive_case = self.nonreactive_experiments[self.nonreactive_file]
             else:
-                self.nonreactive_case = Experiment(self.nonreactive_file, cti_file=self.cti_file)
+                self.nonreactive_case = Experiment(self.nonreactive_file, cti_file=self.cti_file,
+                                                   experiment_cache=experiment_cache)
                 self.nonreactive_experiments[self.nonreactive_file] = self.nonreactive_case
 
-    def add_experiment(self, file_name=None, **kwargs):
+    def add_experiment(self, file_name=None, use_cache=True, **kwargs):
         """Add an experiment to the Condition.
 
         Parameters
         ----------
-        file_name : `pathlib.Path` or `str` or `None`
+        file_name : `pathlib.Path` or `str` or `Experiment` or `None`
             Filename of the file with the voltage trace of the
-            experiment to be added.
+            experiment to be added, or an `Experiment` that has already
+            been processed.
+        use_cache : `bool`, optional
+            If `True`, the experiment is loaded from
+            `~uconnrcmpy.experiments.experiment_cache` if it has been
+            processed before with the same inputs, and is stored there
+            otherwise. True by default.
+        kwargs
+            Other arguments of `~uconnrcmpy.experiments.Experiment`
         """
-        exp = Experiment(file_name, cti_file=self.cti_file, **kwargs)
+        if isinstance(file_name, Experiment):
+            exp = file_name
+        else:
+            kwargs.setdefault('experiment_cache', experiment_cache if use_cache else None)
+            exp = Experiment(file_name, cti_file=self.cti_file, **kwargs)
         if exp.pressure_trace.is_reactive:
             self.reactive_experiments[exp.file_path.name] = exp
             if self.plotting:
@@ -579,23 +608,26 @@ class Condition(object):
         n_print_pts = len(print_pressure)
         time = np.arange(-self.reactive_compression_time/1000.0, self.nonreactive_end_time/1000.0,
                          1/self.reactive_case.pressure_trace.frequency)
-        stroke_volume = VolumeFromPressure(
-            stroke_pressure,
-            1.0,
+        # All of the isentropes in the volume trace are evaluated on
+        # the table for the initial temperature, which is shared with
+        # every other experiment at this initial temperature
+        isentrope_table = get_isentrope_table(
             self.reactive_case.experiment_parameters['Tin'],
             chem_file=str(self.cti_file),
-        ).volume
-        stroke_temperature = TemperatureFromPressure(
+        )
+        stroke_trace = IsentropicTrace(
             stroke_pressure,
+            1.0,
             self.reactive_case.experiment_parameters['Tin'],
-            chem_file=str(self.cti_file),
-        ).temperature
+            isentrope_table=isentrope_table,
+        )
+        stroke_volume = stroke_trace.volume
 
-        post_volume = VolumeFromPressure(
+        post_volume = IsentropicTrace(
             post_pressure,
             stroke_volume[-1],
-            stroke_temperature[-1],
-            chem_file=str(self.cti_file),
+            stroke_trace.temperature[-1],
+            isentrope_table=isentrope_table,
         ).volume
 
         # The post_volume array is indexed from the second element to
@@ -607,7 +639,7 @@ class Condition(object):
             volume[::5],
             stroke_pressure[0]*1E5,
             self.reactive_case.experiment_parameters['Tin'],
-            chem_file=str(self.cti_file),
+            isentrope_table=isentrope_table,
         ).pressure
 
         copy('{:.4f}'.format(stroke_pressure[0]))
@@ -694,8 +726,28 @@ class Condition(object):
         np.savetxt('volume.csv', volout, delimiter=',')
         np.savetxt('Tc__P0__T0_{}K_pressure.txt'.format(Tin), presout, delimiter='\t')
 
+    def simulation_parameters(self):
+        """Collect the parameters of the simulations of this condition.
+
+        Returns
+        -------
+        `dict`
+            The ``initial_temperature``, ``initial_pressure``,
+            ``volume``, and ``chem_file`` arguments of `Simulation`,
+            from the reactive case, the volume trace, and the
+            experimental pressure trace
+        """
+        return dict(
+            initial_temperature=self.reactive_case.experiment_parameters['Tin'],
+            initial_pressure=self.presout[0, 1]*1E5,
+            volume=self.volout,
+            chem_file=str(self.cti_file),
+        )
+
     def run_simulation(self, run_reactive=False, run_nonreactive=True,
-                       end_temp=2500.0, end_time=0.2):
+                       end_temp=2500.0, end_time=0.2, tabulated_velocity=False,
+                       step_control='fixed', frozen_nonreactive=True, overwrite='skip',
+                       parallel=False, warm_start=True, use_cache=True):
         """Run the simulations for this condition.
 
         Parameters
@@ -708,68 +760,100 @@ class Condition(object):
             Temperature at which the simulation is ended
         end_time : `float`, optional
             Time at which the simulation is ended.
+        tabulated_velocity : `bool`, optional
+            True to give the piston velocity to Cantera as a tabulated
+            function instead of a Python callback. False by default.
+        step_control : `str`, optional
+            How the largest time step of the integrator is chosen, one
+            of ``'fixed'`` or ``'phased'``. See `Simulation`.
+        frozen_nonreactive : `bool`, optional
+            True to compute the nonreactive case along the isentrope of
+            the initial mixture instead of integrating a reactor. True
+            by default.
+        overwrite : `str`, optional
+            What to do if a case has already been simulated. One of
+            ``'skip'`` to keep the existing simulation, ``'overwrite'``
+            to run it again, or ``'error'`` to raise a `RuntimeError`.
+            ``'skip'`` by default.
+        parallel : `bool`, optional
+            True to run the reactive and nonreactive cases at the same
+            time in separate worker processes, each of which parses its
+            own mechanism, with no more workers than there are CPUs.
+            False by default.
+        warm_start : `bool`, optional
+            True to start the reactive case from the end of compression
+            of the previous reactive simulation of this condition, if it
+            has the same initial state, volume trace, and mechanism.
+            True by default.
+        use_cache : `bool`, optional
+            True to load the simulations from the
+            `~uconnrcmpy.simulations.simulation_cache` if they have been
+            run before with the same inputs, and to store them in it
+            otherwise. True by default.
+
+        Notes
+        -----
+        The reactive simulation stores the state of the reactor at the
+        end of compression, given by `reactive_compression_time`, in
+        its ``checkpoint``, so a reactive case that is simulated again
+        with ``overwrite='overwrite'`` only integrates the part of the
+        simulation after the end of compression.
         """
-        def process_choice(sim_type):
-            choice = input('Are you sure you want to overwrite the {sim_type} simulation? '
-                           'Input y or n: '.format(sim_type=sim_type))
-            if choice.startswith('n'):
-                return False
-            elif choice.startswith('y'):
+        if overwrite not in ('skip', 'overwrite', 'error'):
+            raise ValueError('overwrite must be one of "skip", "overwrite", or "error", '
+                             'not {!r}'.format(overwrite))
+
+        def needs_run(sim_type, sim):
+            if sim is None or overwrite == 'overwrite':
                 return True
+            elif overwrite == 'error':
+                raise RuntimeError('The {} simulation has already been run.'.format(sim_type))
             else:
-                raise IOError('Invalid input')
+                print('The {} simulation already exists. Nothing was done'.format(sim_type))
+                return False
 
+        run_nonreactive = run_nonreactive and needs_run('nonreactive', self.nonreactive_sim)
+        run_reactive = run_reactive and needs_run('reactive', self.reactive_sim)
+        if not (run_nonreactive or run_reactive):
+            return
+
+        common = dict(
+            self.simulation_parameters(),
+            end_temp=end_temp,
+            end_time=end_time,
+            tabulated_velocity=tabulated_velocity,
+            step_control=step_control,
+            cache=simulation_cache if use_cache else None,
+        )
+        runs = []
         if run_nonreactive:
-            if self.nonreactive_sim is None:
-                self.nonreactive_sim = Simulation(
-                    initial_temperature=self.reactive_case.experiment_parameters['Tin'],
-                    initial_pressure=self.presout[0, 1]*1E5,
-                    volume=self.volout,
-                    is_reactive=False,
-                    end_temp=end_temp,
-                    end_time=end_time,
-                    chem_file=str(self.cti_file),
-                )
-            else:
-                if process_choice('nonreactive'):
-                    self.nonreactive_sim = Simulation(
-                        initial_temperature=self.reactive_case.experiment_parameters['Tin'],
-                        initial_pressure=self.presout[0, 1]*1E5,
-                        volume=self.volout,
-                        is_reactive=False,
-                        end_temp=end_temp,
-                        end_time=end_time,
-                        chem_file=str(self.cti_file),
-                    )
-                else:
-                    print('Nothing was done')
-
+            runs.append(('nonreactive_sim',
+                         dict(common, is_reactive=False, frozen_chemistry=frozen_nonreactive)))
         if run_reactive:
-            if self.reactive_sim is None:
-                self.reactive_sim = Simulation(
-                    initial_temperature=self.reactive_case.experiment_parameters['Tin'],
-                    initial_pressure=self.presout[0, 1]*1E5,
-                    volume=self.volout,
-                    is_reactive=True,
-                    end_temp=end_temp,
-                    end_time=end_time,
-                    chem_file=str(self.cti_file),
-                )
-            else:
-                if process_choice('reactive'):
-                    self.reactive_sim = Simulation(
-                        initial_temperature=self.reactive_case.experiment_parameters['Tin'],
-                        initial_pressure=self.presout[0, 1]*1E5,
-                        volume=self.volout,
-                        is_reactive=True,
-                        end_temp=end_temp,
-                        end_time=end_time,
-                        chem_file=str(self.cti_file),
-                    )
-                else:
-                    print('Nothing was done')
-
-    def compare_to_sim(self, run_reactive=False, run_nonreactive=True):
+            reactive = dict(common, is_reactive=True)
+            if self.reactive_compression_time is not None:
+                reactive['checkpoint_time'] = self.reactive_compression_time/1000
+            previous = getattr(self.reactive_sim, 'checkpoint', None)
+            if (warm_start and previous is not None and
+                    previous.stroke_key == stroke_key(is_reactive=True,
+                                                      **self.simulation_parameters())):
+                reactive['restart'] = previous
+            runs.append(('reactive_sim', reactive))
+
+        if parallel and len(runs) > 1:
+            # The Simulations are returned from the workers by pickling,
+            # which copies the buffers of their arrays
+            with ProcessPoolExecutor(max_workers=min(len(runs), os.cpu_count() or 1)) as executor:
+                futures = [(attribute, executor.submit(Simulation, **kwargs))
+                           for attribute, kwargs in runs]
+                for attribute, future in futures:
+                    setattr(self, attribute, future.result())
+        else:
+            for attribute, kwargs in runs:
+                setattr(self, attribute, Simulation(**kwargs))
+
+    def compare_to_sim(self, run_reactive=False, run_nonreactive=True, overwrite='skip',
+                       parallel=False, sink=None):
         """Compare the experiments to the simulations.
 
         Run the simulations for this condition, and if plotting is on,
@@ -781,6 +865,17 @@ class Condition(object):
             True to run the reactive comparison. False by default.
         run_nonreactive : `bool`, optional
             True to run the nonreactive comparison. True by default.
+        overwrite : `str`, optional
+            What to do if a case has already been simulated. See
+            `run_simulation`.
+        parallel : `bool`, optional
+            True to run the cases in separate worker processes. See
+            `run_simulation`.
+        sink : `~uconnrcmpy.sinks.ResultsSink`, optional
+            Sink to which a record of the simulated temperature at the
+            end of compression and ignition delay is written, with the
+            ``path`` of the reactive experiment. If not given, they are
+            copied to the clipboard.
         """
         if self.presout is None:
             # Load the experimental pressure trace. Try the glob function first
@@ -790,7 +885,7 @@ class Condition(object):
                 flist = [input('Input the experimental pressure trace file name: ')]
             self.presout = np.genfromtxt(flist[0])
 
-        self.run_simulation(run_reactive, run_nonreactive)
+        self.run_simulation(run_reactive, run_nonreactive, overwrite=overwrite, parallel=parallel)
 
         # Plot the pressure traces together
         compression_time = self.reactive_compression_time
@@ -847,8 +942,7 @@ class Condition(object):
             if self.nonreactive_sim is not None:
                 print_str += '\t'
                 copy_str += '\t\t\t\t'
-            ignition_idx = np.argmax(self.reactive_sim.derivative)
-            ignition_delay = self.reactive_sim.time[ignition_idx]*1000 - compression_time
+            ignition_delay = self.reactive_sim.ignition_delay(compression_time)
             print_str += '{:.6f}'.format(ignition_delay)
             copy_str += '{}'.format(ignition_delay)
 
@@ -863,7 +957,15 @@ class Condition(object):
                 print('T_EOC_nonreactive = {} K'.format(T_EOC))
                 print('T_EOC_reactive = {} K'.format(T_EOC_reactive))
         print(print_str)
-        copy(copy_str)
+        if sink is None:
+            copy(copy_str)
+        else:
+            sink.write(OrderedDict([
+                ('path', str(self.reactive_case.file_path)),
+                ('simulated_T_EOC', T_EOC if self.nonreactive_sim is not None else None),
+                ('simulated_ignition_delay',
+                 ignition_delay if self.reactive_sim is not None else None),
+            ]))
 
 
 class AltCondition(Condition):
@@ -875,11 +977,15 @@ class AltCondition(Condition):
 
         Parameters
         ----------
-        file_name : `str` or `None`
+        file_name : `str` or `AltExperiment` or `None`
             Filename of the file with the voltage trace of the
-            experiment to be added.
+            experiment to be added, or an `AltExperiment` that has
+            already been processed.
         """
-        exp = AltExperiment(file_name, cti_file=self.cti_file)
+        if isinstance(file_name, AltExperiment):
+            exp = file_name
+        else:
+            exp = AltExperiment(file_name, cti_file=self.cti_file)
         if exp.pressure_trace.is_reactive:
             self.reactive_experiments[exp.file_path.name] = exp
             if self.plotting:
@@ -893,53 +999,181 @@ class AltCondition(Condition):
         return 'AltCondition(plotting={!r})'.format(self.plotting)
 
 
-def process_folder(cti_file, path='.', plot=False):
-    """Process a folder of experimental files.
+def process_file(file_path, cti_file, alternate=False, plot=False):
+    """Process one experimental file for `process_folder`.
 
-    Process a folder containing files with reactive experiments to
-    calculate the ignition delays and copy a table with the results
-    to the clipboard.
+    This runs in the worker processes of `process_folder` and
+    `process_alt_folder`, so errors are returned instead of raised.
 
     Parameters
     ----------
-    cti_file : `str` or `pathlib.Path`
+    file_path : `pathlib.Path`
+        Experimental file to be processed
+    cti_file : `pathlib.Path`
         File containing the CTI for Cantera
-    path : `str`, optional
-        Path to folder to be analyzed. Defaults to the current folder.
+    alternate : `bool`, optional
+        True if the file is processed with
+        `~uconnrcmpy.experiments.AltExperiment`. False by default.
     plot : `bool`, optional
-        True to enable plotting. False by default.
+        True to return the pressure trace for plotting. False by
+        default.
+
+    Returns
+    -------
+    `tuple`
+        The results of the experiment from
+        `~uconnrcmpy.experiments.Experiment.results`, the zeroed time,
+        pressure, and date of the experiment if ``plot`` is True, and
+        the error message if processing the file failed, each of which
+        is `None` if it does not apply
     """
-    p = Path(path)
-    result = []
+    try:
+        if alternate:
+            case = AltExperiment(file_path.resolve(), cti_file=cti_file, copy=False)
+        else:
+            case = Experiment(file_path.resolve(), cti_file=cti_file, copy=False,
+                              experiment_cache=experiment_cache)
+        results = case.results()
+    except Exception as e:
+        return None, None, '{}: {}'.format(type(e).__name__, e)
+
+    line = None
+    if plot:
+        line = (case.pressure_trace.zeroed_time, case.pressure_trace.pressure,
+                case.experiment_parameters['date'])
+    return results, line, None
+
+
+def process_files(files, cti_file, alternate=False, plot=False, jobs=1, sink=None):
+    """Process experimental files in order, in parallel if requested.
 
+    Parameters
+    ----------
+    files : `list` of `pathlib.Path`
+        Experimental files to be processed
+    cti_file : `str` or `pathlib.Path`
+        File containing the CTI for Cantera
+    alternate : `bool`, optional
+        True if the files are processed with
+        `~uconnrcmpy.experiments.AltExperiment`. False by default.
+    plot : `bool`, optional
+        True to plot the pressure traces. False by default.
+    jobs : `int` or `None`, optional
+        Number of worker processes. If one, the files are processed in
+        this process. If `None`, the number of processors is used.
+    sink : `~uconnrcmpy.sinks.ResultsSink`, optional
+        Sink to which the results of each file are written as soon as
+        it is processed. If the sink keeps its records, files whose
+        contents and processing parameters are in the manifest of the
+        sink are skipped.
+
+    Returns
+    -------
+    `tuple`
+        The `list` of the records of results of the processed files
+        and a `dict` of the error messages of the files that failed,
+        keyed by the file
+
+    Notes
+    -----
+    The files are processed and the records are written in sorted
+    order, so the results do not depend on the order of the files in
+    the folder or on the number of ``jobs``. Each worker process checks
+    out its own `cantera.Solution` objects from its
+    `~uconnrcmpy.solutions.solution_pool`. The records have the
+    `~uconnrcmpy.sinks.ResultsSink.manifest_columns` in addition to the
+    results of the experiment. The files are only hashed if the sink
+    keeps its records, and the ``file_hash`` is `None` otherwise.
+    """
+    files = sorted(files)
     cti_file = Path(cti_file).resolve()
+    records = []
+    failures = {}
+
+    with open(str(cti_file), 'r') as in_file:
+        parameters = processing_key(AltExperiment if alternate else Experiment, in_file.read())
+    hashes = {}
+    if sink is not None and sink.keeps_records:
+        manifest = sink.manifest()
+        for f in files:
+            hashes[f] = file_hash(f)
+            if (hashes[f], parameters) in manifest:
+                print('Skipping {}, which has not changed'.format(f))
+        files = [f for f in files if (hashes[f], parameters) not in manifest]
 
     if plot:
         fig = plt.figure()
         ax = fig.add_subplot(1, 1, 1)
 
-    for f in p.glob('[0-3]*.txt'):
-        print(f)
-        case = Experiment(f.resolve(), cti_file=cti_file, copy=False)
-        result.append('\t'.join(map(str, [
-            case.experiment_parameters['time_of_day'], case.experiment_parameters['pin'],
-            case.experiment_parameters['Tin'], case.pressure_trace.p_EOC, case.ignition_delay,
-            case.first_stage, case.T_EOC, case.experiment_parameters['spacers'],
-            case.experiment_parameters['shims'], case.voltage_trace.filter_frequency])))
-        if plot:
-            ax.plot(case.pressure_trace.zeroed_time, case.pressure_trace.pressure,
-                    label=case.experiment_parameters['date'])
-
-    copy('\n'.join(sorted(result)))
-    print('Finished')
+    def report(results):
+        for f, (record, line, error) in zip(files, results):
+            print(f)
+            if error is not None:
+                print('Failed to process {}: {}'.format(f, error))
+                failures[f] = error
+                continue
+            record['path'] = str(f.resolve())
+            record['file_hash'] = hashes.get(f)
+            record['parameters'] = parameters
+            if sink is not None:
+                sink.write(record)
+            records.append(record)
+            if line is not None:
+                zeroed_time, pressure, date = line
+                ax.plot(zeroed_time, pressure, label=date)
+
+    if jobs == 1:
+        report(process_file(f, cti_file, alternate, plot) for f in files)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            report(executor.map(process_file, files, repeat(cti_file), repeat(alternate),
+                                repeat(plot)))
+
+    return records, failures
+
+
+def process_folder(cti_file, path='.', plot=False, jobs=1, sink=None):
+    """Process a folder of experimental files.
 
+    Process a folder containing files with reactive experiments to
+    calculate the ignition delays and write a table with the results
+    to a results sink, by default the clipboard.
 
-def process_alt_folder(cti_file, path='.', plot=False):
+    Parameters
+    ----------
+    cti_file : `str` or `pathlib.Path`
+        File containing the CTI for Cantera
+    path : `str`, optional
+        Path to folder to be analyzed. Defaults to the current folder.
+    plot : `bool`, optional
+        True to enable plotting. False by default.
+    jobs : `int` or `None`, optional
+        Number of worker processes that process the files. See
+        `process_files`. One by default.
+    sink : `~uconnrcmpy.sinks.ResultsSink`, `str`, or `pathlib.Path`, optional
+        Sink to which the results are written, or the name of a CSV,
+        JSON Lines, or SQLite file, as in `~uconnrcmpy.sinks.open_sink`.
+        The files that are already in the sink are not processed
+        again. If not given, the results are copied to the clipboard.
+        A sink that is given as a `~uconnrcmpy.sinks.ResultsSink` is
+        not closed.
+
+    Returns
+    -------
+    `dict`
+        Error messages of the files that could not be processed, keyed
+        by the file. These files are left out of the table.
+    """
+    files = Path(path).glob('[0-3]*.txt')
+    return write_folder(files, cti_file, False, plot, jobs, sink)
+
+
+def process_alt_folder(cti_file, path='.', plot=False, jobs=1, sink=None):
     """Process a folder of alternative experimental files.
 
     Process a folder containing files with reactive experiments to
-    calculate the ignition delays and copy a table with the results
-    to the clipboard.
+    calculate the ignition delays and write a table with the results
+    to a results sink, by default the clipboard.
 
     Parameters
     ----------
@@ -949,33 +1183,257 @@ def process_alt_folder(cti_file, path='.', plot=False):
         Path to folder to be analyzed. Defaults to the current folder.
     plot : `bool`, optional
         True to enable plotting. False by default.
+    jobs : `int` or `None`, optional
+        Number of worker processes that process the files. See
+        `process_files`. One by default.
+    sink : `~uconnrcmpy.sinks.ResultsSink`, `str`, or `pathlib.Path`, optional
+        Sink to which the results are written. See `process_folder`.
+
+    Returns
+    -------
+    `dict`
+        Error messages of the files that could not be processed, keyed
+        by the file. These files are left out of the table.
     """
-    p = Path(path)
-    result = []
+    files = [f for f in Path(path).glob('Fuel_MF*.txt') if 'NR' not in f.name]
+    return write_folder(files, cti_file, True, plot, jobs, sink)
 
-    cti_file = Path(cti_file).resolve()
 
-    if plot:
-        fig = plt.figure()
-        ax = fig.add_subplot(1, 1, 1)
+def write_folder(files, cti_file, alternate, plot, jobs, sink):
+    """Process the files of a folder and write the results to a sink.
 
-    for f in p.glob('Fuel_MF*.txt'):
-        if 'NR' in f.name:
-            continue
-        print(f)
-        case = AltExperiment(f.resolve(), cti_file=cti_file, copy=False)
-        result.append('\t'.join(map(str, [
-            case.experiment_parameters['date_year'], case.experiment_parameters['time_of_day'],
-            case.experiment_parameters['pin'], case.experiment_parameters['Tin'],
-            case.pressure_trace.p_EOC, case.ignition_delay, case.first_stage, case.T_EOC,
-            case.experiment_parameters['spacers'], case.experiment_parameters['shims'],
-            case.pressure_trace.filter_frequency, f.name])))
-        if plot:
-            ax.plot(case.pressure_trace.zeroed_time, case.pressure_trace.pressure,
-                    label=case.experiment_parameters['date'])
-
-    copy('\n'.join(sorted(result)))
+    Parameters
+    ----------
+    files : `list` of `pathlib.Path`
+        Experimental files to be processed
+    cti_file : `str` or `pathlib.Path`
+        File containing the CTI for Cantera
+    alternate : `bool`
+        True if the files are processed with
+        `~uconnrcmpy.experiments.AltExperiment`
+    plot : `bool`
+        True to plot the pressure traces
+    jobs : `int` or `None`
+        Number of worker processes
+    sink : `~uconnrcmpy.sinks.ResultsSink`, `str`, `pathlib.Path`, or `None`
+        Sink to which the results are written, as in
+        `~uconnrcmpy.sinks.open_sink`
+
+    Returns
+    -------
+    `dict`
+        Error messages of the files that could not be processed, keyed
+        by the file
+    """
+    opened = open_sink(sink)
+    try:
+        _, failures = process_files(files, cti_file, alternate, plot, jobs, opened)
+    finally:
+        if opened is not sink:
+            opened.close()
+    if failures:
+        print('Failed to process {} files'.format(len(failures)))
     print('Finished')
+    return failures
+
+
+def group_files(files):
+    """Group experimental files by condition from their names.
+
+    Only the names of the files are parsed, by
+    `~uconnrcmpy.experiments.scan_file_name`; files whose names are not
+    in a known format are left out.
+
+    Parameters
+    ----------
+    files : `list` of `pathlib.Path`
+        Experimental files
+
+    Returns
+    -------
+    `collections.OrderedDict`
+        Sorted lists of the files at each condition, keyed by the
+        ``(Tin, pin, spacers, shims, fuel)`` of the condition and
+        sorted by the key, where the ``fuel`` is `None` for files in
+        the format of `~uconnrcmpy.experiments.Experiment`
+    """
+    groups = {}
+    for f in sorted(files):
+        metadata = scan_file_name(f)
+        if metadata is None:
+            continue
+        key = (metadata['Tin'], metadata['pin'], metadata['spacers'], metadata['shims'],
+               metadata['fuel'])
+        groups.setdefault(key, []).append(Path(f))
+    return OrderedDict((key, groups[key]) for key in sorted(groups, key=repr))
+
+
+def load_experiment(file_path, cti_file):
+    """Load one experiment for `scan_conditions`.
+
+    This runs in the worker processes of `scan_conditions`, so errors
+    are returned instead of raised.
+
+    Parameters
+    ----------
+    file_path : `pathlib.Path`
+        Experimental file to be loaded
+    cti_file : `pathlib.Path`
+        File containing the CTI for Cantera
+
+    Returns
+    -------
+    `tuple`
+        The `~uconnrcmpy.experiments.Experiment` and `None`, or `None`
+        and the error message if the file could not be processed
+    """
+    try:
+        if scan_file_name(file_path)['kind'] == 'AltExperiment':
+            return AltExperiment(file_path, cti_file=cti_file, copy=False), None
+        return Experiment(file_path, cti_file=cti_file, copy=False,
+                          experiment_cache=experiment_cache), None
+    except Exception as e:
+        return None, '{}: {}'.format(type(e).__name__, e)
+
+
+class ConditionGroup(object):
+    """Experimental files at one condition, found from their names.
+
+    The `Condition` is only built, and the experiments processed, when
+    the `condition` attribute is first used.
+
+    Parameters
+    ----------
+    key : `tuple`
+        The ``(Tin, pin, spacers, shims, fuel)`` of the condition
+    files : `list` of `pathlib.Path`
+        Experimental files at the condition
+    cti_file : `str` or `pathlib.Path`
+        File containing the CTI for Cantera
+    plotting : `bool`, optional
+        True to enable plotting in the `Condition`. False by default.
+
+    Attributes
+    ----------
+    Tin : `int`
+        Initial temperature, in Kelvin
+    pin : `int`
+        Initial pressure, in Torr
+    spacers : `float`
+        Inches of spacers
+    shims : `int`
+        Millimeters of shims
+    fuel : `str` or `None`
+        Fuel of the alternate experiments
+    failures : `dict`
+        Error messages of the files that could not be added to the
+        `Condition`, keyed by the file
+    """
+    def __init__(self, key, files, cti_file, plotting=False):
+        self.key = key
+        self.Tin, self.pin, self.spacers, self.shims, self.fuel = key
+        self.files = list(files)
+        self.cti_file = cti_file
+        self.plotting = plotting
+        self.failures = {}
+        self._condition = None
+
+    def __repr__(self):
+        return ('ConditionGroup(Tin={self.Tin!r}, pin={self.pin!r}, spacers={self.spacers!r}, '
+                'shims={self.shims!r}, fuel={self.fuel!r}, files={n_files})').format(
+                    self=self, n_files=len(self.files),
+                )
+
+    def __len__(self):
+        return len(self.files)
+
+    @property
+    def built(self):
+        """`bool`: True if the `Condition` has been built"""
+        return self._condition is not None
+
+    @property
+    def condition(self):
+        """`Condition`: The condition with all of the experiments, which is
+        built the first time it is used"""
+        if self._condition is None:
+            self.build()
+        return self._condition
+
+    def build(self, experiments=None):
+        """Build the `Condition` and add the experiments to it.
+
+        Parameters
+        ----------
+        experiments : `dict`, optional
+            Results of `load_experiment` for files that have already
+            been processed, keyed by the file. The files that are not in
+            it are processed here.
+        """
+        experiments = experiments or {}
+        condition_class = AltCondition if self.fuel is not None else Condition
+        condition = condition_class(cti_file=self.cti_file, plotting=self.plotting)
+        for f in self.files:
+            exp, error = experiments.get(f, (None, None))
+            if exp is None and error is None:
+                exp, error = load_experiment(f, self.cti_file)
+            if error is not None:
+                print('Failed to add {}: {}'.format(f, error))
+                self.failures[f] = error
+                continue
+            condition.add_experiment(exp)
+        self._condition = condition
+
+
+def scan_conditions(cti_file, path='.', lazy=True, jobs=1, plotting=False):
+    """Group the experimental files in a folder into Conditions.
+
+    The files are grouped by `group_files` from their names only, so
+    scanning a folder does not read any of the files.
+
+    Parameters
+    ----------
+    cti_file : `str` or `pathlib.Path`
+        File containing the CTI for Cantera
+    path : `str`, optional
+        Path to the folder to be scanned. Defaults to the current
+        folder.
+    lazy : `bool`, optional
+        True to build the `Condition` of each group the first time it
+        is used. False to build all of them before returning. True by
+        default.
+    jobs : `int` or `None`, optional
+        Number of worker processes that process the experiments when
+        ``lazy`` is False. If one, they are processed in this process.
+        If `None`, the number of processors is used.
+    plotting : `bool`, optional
+        True to enable plotting in the Conditions. False by default.
+
+    Returns
+    -------
+    `collections.OrderedDict`
+        The `ConditionGroup` of each condition, keyed by the
+        ``(Tin, pin, spacers, shims, fuel)`` of the condition
+    """
+    cti_file = Path(cti_file).resolve()
+    groups = OrderedDict(
+        (key, ConditionGroup(key, files, cti_file, plotting))
+        for key, files in group_files(Path(path).glob('*.txt')).items()
+    )
+    if lazy:
+        return groups
+
+    if jobs == 1:
+        for group in groups.values():
+            group.build()
+    else:
+        files = [f for group in groups.values() for f in group.files]
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            experiments = dict(zip(files, executor.map(load_experiment, files,
+                                                       repeat(cti_file))))
+        for group in groups.values():
+            group.build(experiments)
+    return groups
 
 
 if __name__ == '__main__':
@@ -0,0 +1,247 @@
+"""Kernels to compute the derivatives of traces"""
+
+# Third-party imports
+import numpy as np
+from scipy.signal import savgol_coeffs
+from scipy.ndimage import convolve1d
+
+
+def forward_difference(dep_var, indep_var, out=None, work=None):
+    """Compute the derivative by a second-order forward difference.
+
+    Parameters
+    ----------
+    dep_var : `numpy.ndarray`
+        Dependent variable (e.g., the pressure)
+    indep_var : `numpy.ndarray`
+        Independent variable (e.g., the time)
+    out : `numpy.ndarray`, optional
+        Array of the same length as ``dep_var`` where the derivative is
+        stored. If not given, a new array is allocated.
+    work : `numpy.ndarray`, optional
+        Scratch array at least as long as ``dep_var``. If not given, a
+        new array is allocated.
+
+    Returns
+    -------
+    `numpy.ndarray`
+        1-D array containing the derivative. This is ``out`` if it was
+        given.
+
+    Notes
+    -----
+    The derivative at the last two points is set to zero. The step
+    between the first two points of the stencil is used as the spacing,
+    and the derivative is set to zero anywhere that step is zero.
+    """
+    m = len(dep_var)
+    if out is None:
+        out = np.empty(m)
+    if work is None:
+        work = np.empty(m)
+
+    ddt = out[:m-2]
+    step = work[:m-2]
+    np.multiply(dep_var[1:m-1], 4, out=ddt)
+    np.multiply(dep_var[:m-2], 3, out=step)
+    ddt -= step
+    ddt -= dep_var[2:m]
+
+    np.subtract(indep_var[1:m-1], indep_var[:m-2], out=step)
+    step *= 2
+    if not np.all(step):
+        # Dividing by an infinite step sets the derivative to zero
+        step[step == 0] = np.inf
+    ddt /= step
+    out[m-2:] = 0
+    return out
+
+
+def moving_average(data, n_points, out=None, work=None):
+    """Smooth an array with a centered moving average.
+
+    Parameters
+    ----------
+    data : `numpy.ndarray`
+        The data to be smoothed
+    n_points : `int`
+        Odd number of points in the averaging window
+    out : `numpy.ndarray`, optional
+        Array of the same length as ``data`` where the result is stored.
+        May be the same array as ``data``. If not given, a new array is
+        allocated.
+    work : `numpy.ndarray`, optional
+        Scratch array at least one element longer than ``data``. If not
+        given, a new array is allocated.
+
+    Returns
+    -------
+    `numpy.ndarray`
+        1-D array containing the smoothed data. This is ``out`` if it was
+        given.
+
+    Notes
+    -----
+    The sum over each window is computed as the difference of two
+    elements of the cumulative sum of the data, so the cost does not
+    depend on ``n_points``. Points outside the array are taken to be
+    zero, so the result is the same as convolving with
+    ``np.ones(n_points)/n_points`` and ``mode='same'``.
+    """
+    if n_points % 2 == 0:
+        raise ValueError('The number of points in the moving average must be odd.')
+    m = len(data)
+    if m < n_points:
+        raise ValueError('The data must be at least as long as the moving average.')
+    if out is None:
+        out = np.empty(m)
+    if work is None:
+        work = np.empty(m + 1)
+
+    half = n_points//2
+    cumsum = work[:m+1]
+    cumsum[0] = 0
+    np.cumsum(data, out=cumsum[1:])
+    # The sum of the window centered on point i is
+    # cumsum[i + half + 1] - cumsum[i - half], where the indices are
+    # clipped to the ends of the array
+    out[:half] = cumsum[half+1:n_points]
+    np.subtract(cumsum[n_points:], cumsum[:m+1-n_points], out=out[half:m-half])
+    np.subtract(cumsum[m], cumsum[m+1-n_points:m-half], out=out[m-half:])
+    out /= n_points
+    return out
+
+
+def smoothed_forward_difference(dep_var, indep_var, n_points, out=None, work=None):
+    """Compute the derivative by a forward difference and smooth it.
+
+    This is the same as calling `forward_difference` followed by
+    `moving_average`, sharing the output and scratch arrays between
+    the two steps.
+
+    Parameters
+    ----------
+    dep_var : `numpy.ndarray`
+        Dependent variable (e.g., the pressure)
+    indep_var : `numpy.ndarray`
+        Independent variable (e.g., the time)
+    n_points : `int`
+        Odd number of points in the averaging window
+    out : `numpy.ndarray`, optional
+        Array of the same length as ``dep_var`` where the derivative is
+        stored. If not given, a new array is allocated.
+    work : `numpy.ndarray`, optional
+        Scratch array at least one element longer than ``dep_var``. If
+        not given, a new array is allocated.
+
+    Returns
+    -------
+    `numpy.ndarray`
+        1-D array containing the smoothed derivative. This is ``out`` if
+        it was given.
+    """
+    if out is None:
+        out = np.empty(len(dep_var))
+    if work is None:
+        work = np.empty(len(dep_var) + 1)
+    forward_difference(dep_var, indep_var, out=out, work=work)
+    return moving_average(out, n_points, out=out, work=work)
+
+
+def savgol_derivative(dep_var, delta, n_points, polyorder=2, out=None):
+    """Compute a smoothed derivative with a Savitzky-Golay filter.
+
+    Parameters
+    ----------
+    dep_var : `numpy.ndarray`
+        Dependent variable (e.g., the pressure), evenly spaced in the
+        independent variable
+    delta : `float`
+        Spacing of the samples in the independent variable
+    n_points : `int`
+        Odd number of points in the filter window
+    polyorder : `int`, optional
+        Order of the polynomial fit in each window
+    out : `numpy.ndarray`, optional
+        Array of the same length as ``dep_var`` where the derivative is
+        stored. If not given, a new array is allocated.
+
+    Returns
+    -------
+    `numpy.ndarray`
+        1-D array containing the derivative. This is ``out`` if it was
+        given.
+
+    Notes
+    -----
+    The derivative is the slope of a least-squares polynomial fit to the
+    points in the window centered on each point. The filter
+    coefficients are computed by `scipy.signal.savgol_coeffs` and
+    applied by `scipy.ndimage.convolve1d`. Near the ends of the array,
+    the first and last points are repeated to fill the window.
+    """
+    if out is None:
+        out = np.empty(len(dep_var))
+    coeffs = savgol_coeffs(n_points, polyorder, deriv=1, delta=delta)
+    convolve1d(dep_var, coeffs, output=out, mode='nearest')
+    return out
+
+
+def nonuniform_derivative(dep_var, indep_var, out=None):
+    """Compute the derivative on an unevenly spaced grid.
+
+    Parameters
+    ----------
+    dep_var : `numpy.ndarray`
+        Dependent variable (e.g., the pressure)
+    indep_var : `numpy.ndarray`
+        Independent variable (e.g., the time), which may be unevenly
+        spaced
+    out : `numpy.ndarray`, optional
+        Array of the same length as ``dep_var`` where the derivative is
+        stored. If not given, a new array is allocated.
+
+    Returns
+    -------
+    `numpy.ndarray`
+        1-D array containing the derivative. This is ``out`` if it was
+        given.
+
+    Notes
+    -----
+    The derivative is the slope of the second-order Lagrange polynomial
+    through each point and its nearest neighbors. At the first and last
+    points, the polynomial through the three points at that end of the
+    array is used instead, so the derivative is second-order accurate
+    everywhere. With only two points, the derivative at both is the
+    slope of the line between them. The derivative is set to zero
+    anywhere the stencil has a zero step.
+    """
+    y = np.asarray(dep_var, dtype=float)
+    x = np.asarray(indep_var, dtype=float)
+    m = len(y)
+    if out is None:
+        out = np.empty(m)
+    if m < 3:
+        out[:] = 0
+        if m == 2 and x[1] != x[0]:
+            out[:] = (y[1] - y[0])/(x[1] - x[0])
+        return out
+
+    h = np.diff(x)
+    h_min = h[:-1]
+    h_plu = h[1:]
+    h_sum = h_min + h_plu
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[1:m-1] = (-h_plu/(h_min*h_sum)*y[:m-2] +
+                      (h_plu - h_min)/(h_min*h_plu)*y[1:m-1] +
+                      h_min/(h_plu*h_sum)*y[2:])
+        out[0] = (-(2*h[0] + h[1])/(h[0]*(h[0] + h[1]))*y[0] +
+                  (h[0] + h[1])/(h[0]*h[1])*y[1] -
+                  h[0]/(h[1]*(h[0] + h[1]))*y[2])
+        out[m-1] = (h[-1]/(h[-2]*(h[-2] + h[-1]))*y[m-3] -
+                    (h[-2] + h[-1])/(h[-2]*h[-1])*y[m-2] +
+                    (2*h[-1] + h[-2])/(h[-1]*(h[-2] + h[-1]))*y[m-1])
+    if not np.all(h):
+        out[~np.isfinite(out)] = 0
+    return out
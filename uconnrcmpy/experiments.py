@@ -1,9 +1,13 @@
 """Experiments module"""
 
 # System imports
+from collections import OrderedDict
 from datetime import datetime
+import hashlib
+import os
 from pathlib import Path
 import platform
+import re
 
 # Third-part imports
 import cantera as ct
@@ -17,6 +21,222 @@ from .traces import (VoltageTrace,
                      AltExperimentalPressureTrace,
                      TemperatureFromPressure,
                      )
+from .caches import cache_home, DiskCache, file_hash
+from .mechanisms import mechanism_hash
+from ._version import __version__
+
+
+file_name_patterns = OrderedDict([
+    ('Experiment', re.compile(
+        r'^(?P<nonreactive>NR_)?(?P<spacers>\d+)_in_(?P<shims>\d+)_mm_'
+        r'(?P<Tin>\d+)K-(?P<pin>\d+)t-(?P<factor>\d+)x-'
+        r'(?P<day>\d{1,2})-(?P<month>[A-Za-z]{3})-(?P<year>\d{2})-(?P<hour>\d{2})(?P<minute>\d{2})'
+        r'(?:\.txt)?$')),
+    ('AltExperiment', re.compile(
+        r'^Fuel_(?P<fuel>[^_]+)_EqRatio_[\d.]+_PercentAr_[\d.]+_PercentN2_[\d.]+_'
+        r'(?P<nonreactive>NR_)?(?P<spacers>\d+)_in_(?P<shims>\d+)_mm_'
+        r'(?P<Tin>\d+)K_(?P<pin>\d+)torr-'
+        r'(?P<day>\d{1,2})-(?P<month>[A-Za-z]{3})-(?P<year>\d{2})-(?P<hour>\d{2})(?P<minute>\d{2})'
+        r'_Endplug_[A-Z]+(?:\.txt)?$')),
+])
+"""`collections.OrderedDict`: Compiled regular expressions of the file
+names of each kind of experiment, keyed by the name of the class"""
+
+month_numbers = {month: number + 1 for number, month in enumerate(
+    ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])}
+
+
+def scan_file_name(file_path):
+    """Parse the metadata of an experiment from the name of its file.
+
+    Unlike `Experiment.parse_file_name`, the kind of experiment is
+    found from the name, and the name is matched by one regular
+    expression in `file_name_patterns`, so folders with many files can
+    be scanned quickly. The file is not opened.
+
+    Parameters
+    ----------
+    file_path : `str` or `pathlib.Path`
+        Name of the experimental file
+
+    Returns
+    -------
+    `collections.OrderedDict` or `None`
+        The ``kind`` of experiment (``'Experiment'`` or
+        ``'AltExperiment'``), if it is ``reactive``, the ``fuel`` (`None`
+        for an `Experiment`), ``Tin``, ``pin``, ``spacers``, ``shims``,
+        ``factor`` (`None` for an `AltExperiment`), and the ``date`` and
+        time as a `datetime.datetime`, with the same units as
+        `Experiment.parse_file_name`. `None` if the name is not in the
+        format of any kind of experiment.
+    """
+    name = Path(str(file_path)).name
+    for kind, pattern in file_name_patterns.items():
+        match = pattern.match(name)
+        if match is not None:
+            break
+    else:
+        return None
+
+    groups = match.groupdict()
+    month = month_numbers.get(groups['month'].title())
+    if month is None:
+        return None
+    # Two-digit years are interpreted like the %y directive of strptime
+    year = int(groups['year'])
+    year += 2000 if year < 69 else 1900
+    return OrderedDict([
+        ('kind', kind),
+        ('reactive', groups['nonreactive'] is None),
+        ('fuel', groups.get('fuel')),
+        ('Tin', int(groups['Tin'])),
+        ('pin', int(groups['pin'])),
+        ('spacers', int(groups['spacers'])/10),
+        ('shims', int(groups['shims'])),
+        ('factor', int(groups['factor']) if groups.get('factor') else None),
+        ('date', datetime(year, month, int(groups['day']), int(groups['hour']),
+                          int(groups['minute']))),
+    ])
+
+
+def processing_key(experiment_class, cti_source=None):
+    """Compute the hash of the inputs of an experiment other than its file.
+
+    Parameters
+    ----------
+    experiment_class : `type`
+        `Experiment` or `AltExperiment`
+    cti_source : `str`, optional
+        Contents of the CTI file used to compute the temperature at the
+        end of compression
+
+    Returns
+    -------
+    `str`
+        The hexadecimal SHA-1 hash of the class, the mechanism, and the
+        version of UConnRCMPy, which together with the hash of the file
+        identify the results of the experiment
+    """
+    mechanism = None if cti_source is None else mechanism_hash(cti_source=cti_source)
+    key = repr((experiment_class.__name__, mechanism, __version__))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def experiment_key(experiment_class, file_path, cti_source=None, **parameters):
+    """Compute the hash of all of the inputs of a processed experiment.
+
+    Parameters
+    ----------
+    experiment_class : `type`
+        `Experiment` or `AltExperiment`
+    file_path : `str` or `pathlib.Path`
+        Experimental file
+    cti_source : `str`, optional
+        Contents of the CTI file used to compute the temperature at the
+        end of compression
+    parameters
+        Parameters of the processing that change the results, such as
+        the ``cutoff_method`` or the ``filter_frequency``
+
+    Returns
+    -------
+    `str`
+        The hexadecimal SHA-1 hash of the contents of the file, the
+        `processing_key`, and the ``parameters``
+    """
+    key = hashlib.sha1()
+    key.update(file_hash(file_path).encode('utf-8'))
+    key.update(processing_key(experiment_class, cti_source).encode('utf-8'))
+    key.update(repr(sorted(parameters.items())).encode('utf-8'))
+    return key.hexdigest()
+
+
+class ExperimentCache(DiskCache):
+    """On-disk cache of processed experiments.
+
+    The cutoff frequency of the filter and the results of an
+    `Experiment` are stored in a NumPy ``.npz`` file under its
+    `Experiment.cache_key`, so an experiment that was processed before,
+    e.g., in an earlier analysis session, is loaded without searching
+    for the cutoff frequency or computing the temperature at the end of
+    compression again. The least recently used files are removed as
+    described in `~uconnrcmpy.caches.DiskCache`.
+
+    Parameters
+    ----------
+    cache_dir : `str` or `pathlib.Path`, optional
+        Folder where the experiments are stored. If not given, the
+        ``experiments`` folder in `~uconnrcmpy.caches.cache_home` is
+        used.
+    max_size : `int`, optional
+        Largest total size of the stored experiments, in bytes
+
+    Notes
+    -----
+    The voltage is loaded from the binary sidecar of the text file (see
+    `~uconnrcmpy.readers.load_trace`), and filtering it at the stored
+    cutoff frequency and computing the pressure trace from it take a
+    few milliseconds, so the arrays of the traces are not stored and
+    each file is only a few hundred bytes.
+    """
+
+    suffix = '.npz'
+
+    def __init__(self, cache_dir=None, max_size=64*1024**2):
+        if cache_dir is None:
+            cache_dir = cache_home() / 'experiments'
+        super().__init__(cache_dir, max_size)
+
+    def get(self, key):
+        """Load the processed experiment stored under a key.
+
+        Parameters
+        ----------
+        key : `str`
+            The `Experiment.cache_key` of the experiment
+
+        Returns
+        -------
+        `dict` or `None`
+            The values given to `put`, or `None` if there is no
+            experiment stored under ``key``
+        """
+        cache_path = self.path(key)
+        if not self.touch(cache_path):
+            return None
+        try:
+            with np.load(str(cache_path)) as data:
+                return {name: data[name][()] for name in data.files}
+        except OSError:
+            # Removed by another process
+            return None
+
+    def put(self, key, values):
+        """Store a processed experiment under a key.
+
+        Parameters
+        ----------
+        key : `str`
+            The `Experiment.cache_key` of the experiment
+        values : `dict`
+            The ``filter_frequency``, ``ignition_delay``,
+            ``first_stage``, and ``T_EOC`` of the experiment
+        """
+        cache_path = self.path(key)
+        temp_path = self.temp_path(cache_path)
+        try:
+            with open(str(temp_path), 'wb') as out_file:
+                np.savez(out_file, **values)
+            os.replace(str(temp_path), str(cache_path))
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        self.evict(keep=cache_path)
+
+
+experiment_cache = ExperimentCache()
+"""`ExperimentCache`: The cache used by
+`~uconnrcmpy.conditions.Condition.add_experiment`."""
 
 
 class Experiment(object):
@@ -36,6 +256,28 @@ class Experiment(object):
     copy : `bool`, optional
         Boolean indicating whether values should be copied to
         the clipboard.
+    cache : `bool`, optional
+        Boolean indicating whether the voltage trace should be loaded
+        from, and saved to, a binary sidecar of the text file.
+    cutoff_method : `str`, optional
+        Method used to compute the filter residuals when the cutoff
+        frequency is set automatically. See
+        `~uconnrcmpy.traces.VoltageTrace.filter_frequency`.
+    search_freqs : `int`, optional
+        Number of cutoff frequencies in the coarse grid of the
+        ``'search'`` cutoff method. See
+        `~uconnrcmpy.traces.VoltageTrace.search_residuals`.
+    derivative_method : `str`, optional
+        Method used to compute the smoothed derivative of the pressure.
+        See `~uconnrcmpy.traces.ExperimentalPressureTrace`.
+    filter_frequency : `float`, optional
+        Cutoff frequency of the filter. If not given, the optimal
+        cutoff frequency is found by the ``cutoff_method``.
+    experiment_cache : `ExperimentCache`, optional
+        Cache from which the processed experiment is loaded if it has
+        been processed before with the same inputs, and to which it is
+        saved otherwise. If not given, the experiment is always
+        processed.
 
     Attributes
     ----------
@@ -65,37 +307,68 @@ class Experiment(object):
         ignition.
     T_EOC : `float`
         The temperature estimated at the end of compression
+    cache_key : `str` or `None`
+        Hash of all of the inputs of the processing, computed by
+        `experiment_key`, under which the experiment is stored in the
+        ``experiment_cache``, or `None` if no cache was given
+    cached : `bool`
+        If the experiment was loaded from the ``experiment_cache``
     """
 
-    def __init__(self, file_path=None, cti_file=None, cti_source=None, copy=True):
+    def __init__(self, file_path=None, cti_file=None, cti_source=None, copy=True, cache=True,
+                 cutoff_method='filtfilt', search_freqs=13, derivative_method='boxcar',
+                 filter_frequency=None, experiment_cache=None):
         self.resolve_file_path(file_path)
         self.experiment_parameters = self.parse_file_name(self.file_path)
-        self.voltage_trace = VoltageTrace(self.file_path)
+        self.derivative_method = derivative_method
+        self.resolve_cti(cti_file, cti_source)
+
+        self.cache_key = None
+        cached = None
+        if experiment_cache is not None:
+            self.cache_key = experiment_key(type(self), self.file_path, self.cti_source,
+                                            cutoff_method=cutoff_method,
+                                            search_freqs=search_freqs,
+                                            derivative_method=derivative_method,
+                                            filter_frequency=filter_frequency)
+            cached = experiment_cache.get(self.cache_key)
+        self.cached = cached is not None
+        if self.cached:
+            filter_frequency = cached['filter_frequency']
+
+        self.voltage_trace = VoltageTrace(self.file_path, cache=cache,
+                                          cutoff_method=cutoff_method,
+                                          search_freqs=search_freqs,
+                                          filter_frequency=filter_frequency)
         self.pressure_trace = ExperimentalPressureTrace(self.voltage_trace,
                                                         self.experiment_parameters['pin'],
                                                         self.experiment_parameters['factor'],
+                                                        self.derivative_method,
                                                         )
         self.compression_time = None
         self.output_end_time = None
         self.offset_points = None
-        if cti_source is None and cti_file is None:
-            raise ValueError('One of cti_file or cti_source must be specified')
-        elif cti_source is not None and cti_file is not None:
-            raise ValueError('Only one of cti_file or cti_source can be specified')
-        elif cti_source is None:
-            self.cti_file = Path(cti_file).resolve()
-            with open(str(cti_file), 'r') as in_file:
-                self.cti_source = in_file.read()
+        if self.cached:
+            self.ignition_delay = cached['ignition_delay']
+            self.first_stage = cached['first_stage']
+            self.T_EOC = cached['T_EOC']
         else:
-            self.cti_source = cti_source
-        self.process_pressure_trace()
+            self.process_pressure_trace()
+            if experiment_cache is not None:
+                experiment_cache.put(self.cache_key, {
+                    'filter_frequency': self.voltage_trace.filter_frequency,
+                    'ignition_delay': self.ignition_delay,
+                    'first_stage': self.first_stage,
+                    'T_EOC': self.T_EOC,
+                })
         if copy:
             self.copy_to_clipboard()
 
     def __repr__(self):
         return 'Experiment(file_path={self.file_path!r})'.format(self=self)
 
-    def parse_file_name(self, file_path):
+    @staticmethod
+    def parse_file_name(file_path):
         """Parse the file name of an experimental trace.
 
         Parameters
@@ -159,6 +432,33 @@ class Experiment(object):
             self.file_path = self.file_path.with_suffix('.txt')
             self.file_path = self.file_path.resolve()
 
+    def resolve_cti(self, cti_file=None, cti_source=None):
+        """Set the mechanism used to compute the temperature at the end of compression.
+
+        Parameters
+        ----------
+        cti_file : `str` or `pathlib.Path`, optional
+            Location of the CTI file for Cantera
+        cti_source : `str`, optional
+            String containing the source of a CTI file for Cantera
+
+        Raises
+        ------
+        ValueError
+            If neither or both of ``cti_file`` and ``cti_source`` are
+            given
+        """
+        if cti_source is None and cti_file is None:
+            raise ValueError('One of cti_file or cti_source must be specified')
+        elif cti_source is not None and cti_file is not None:
+            raise ValueError('Only one of cti_file or cti_source can be specified')
+        elif cti_source is None:
+            self.cti_file = Path(cti_file).resolve()
+            with open(str(cti_file), 'r') as in_file:
+                self.cti_source = in_file.read()
+        else:
+            self.cti_source = cti_source
+
     def process_pressure_trace(self):
         if self.pressure_trace.is_reactive:
             self.ignition_delay, self.first_stage = self.calculate_ignition_delay()
@@ -183,6 +483,7 @@ class Experiment(object):
         self.pressure_trace = ExperimentalPressureTrace(self.voltage_trace,
                                                         self.experiment_parameters['pin'],
                                                         self.experiment_parameters['factor'],
+                                                        self.derivative_method,
                                                         )
         self.process_pressure_trace()
         self.copy_to_clipboard()
@@ -209,28 +510,63 @@ class Experiment(object):
                                 self.pressure_trace.derivative/1000.0,
                                 'm', label="Derivative")
 
+    def results(self):
+        """Collect the results of the experiment.
+
+        Returns
+        -------
+        `collections.OrderedDict`
+            The results in the following order, keyed by the names of
+            the columns given in parentheses:
+
+            A. 4-digit time of day (``time_of_day``)
+            B. The initial pressure of the experiment, in Torr (``pin``)
+            C. The initial temperature of the experiment, in K (``Tin``)
+            D. The end of compression pressure (``p_EOC``)
+            E. The overall ignition delay (``ignition_delay``)
+            F. The first stage ignition delay (``first_stage``)
+            G. The estimated end of compression temperature (``T_EOC``)
+            H. The inches of spacers for the experiment (``spacers``)
+            I. The millimeters of shims for the experiment (``shims``)
+            J. The cutoff frequency that was used to filter the voltage
+               trace (``filter_frequency``)
+        """
+        return OrderedDict([
+            ('time_of_day', self.experiment_parameters['time_of_day']),
+            ('pin', self.experiment_parameters['pin']),
+            ('Tin', self.experiment_parameters['Tin']),
+            ('p_EOC', self.pressure_trace.p_EOC),
+            ('ignition_delay', self.ignition_delay),
+            ('first_stage', self.first_stage),
+            ('T_EOC', self.T_EOC),
+            ('spacers', self.experiment_parameters['spacers']),
+            ('shims', self.experiment_parameters['shims']),
+            ('filter_frequency', self.voltage_trace.filter_frequency),
+        ])
+
     def copy_to_clipboard(self):
         """Copy experimental information to the clipboard
 
         The information is intended to be pasted to a spreadsheet.
-        The information is ordered by columns in the following way:
-
-        A. 4-digit time of day
-        B. The initial pressure of the experiment, in Torr
-        C. The initial temperature of the experiment, in K
-        D. The end of compression pressure
-        E. The overall ignition delay
-        F. The first stage ignition delay
-        G. The estimated end of compression temperature
-        H. The inches of spacers for the experiment
-        I. The millimeters of shims for the experiment
-        J. The cutoff frequency that was used to filter the voltage trace
+        The information is ordered by columns as in `results`.
         """
-        copy('\t'.join(map(str, [
-            self.experiment_parameters['time_of_day'], self.experiment_parameters['pin'],
-            self.experiment_parameters['Tin'], self.pressure_trace.p_EOC, self.ignition_delay,
-            self.first_stage, self.T_EOC, self.experiment_parameters['spacers'],
-            self.experiment_parameters['shims'], self.voltage_trace.filter_frequency])))
+        copy('\t'.join(map(str, self.results().values())))
+
+    def write_results(self, sink):
+        """Write the results of the experiment to a results sink.
+
+        Parameters
+        ----------
+        sink : `~uconnrcmpy.sinks.ResultsSink`
+            The sink. The record has the columns of `results` and the
+            `~uconnrcmpy.sinks.ResultsSink.manifest_columns`. The file
+            is only hashed if the sink keeps its records.
+        """
+        record = self.results()
+        record['path'] = str(self.file_path)
+        record['file_hash'] = file_hash(self.file_path) if sink.keeps_records else None
+        record['parameters'] = processing_key(type(self), getattr(self, 'cti_source', None))
+        sink.write(record)
 
     def calculate_ignition_delay(self):
         """Calculate the ignition delay from the pressure trace.
@@ -304,22 +640,68 @@ class Experiment(object):
 class AltExperiment(Experiment):
     """Contains all the information of a single alternate RCM experiment.
     See the documentation for `Experiment` for attribute descriptions.
+
+    Parameters
+    ----------
+    file_path : `str` or `pathlib.Path`, optional
+        Location of the file with the pressure trace. If not given, the
+        filename is read from the standard input.
+    cti_file : `str` or `pathlib.Path`, optional
+        Location of the CTI file for Cantera
+    cti_source : `str`, optional
+        String containing the source of a CTI file for Cantera
+    copy : `bool`, optional
+        Boolean indicating whether values should be copied to
+        the clipboard.
+    cache : `bool`, optional
+        Boolean indicating whether the pressure trace should be loaded
+        from, and saved to, a binary sidecar of the text file.
     """
-    def __init__(self, file_path=None):
+    def __init__(self, file_path=None, cti_file=None, cti_source=None, copy=True, cache=True):
         self.resolve_file_path(file_path)
         self.experiment_parameters = self.parse_file_name(self.file_path)
+        self.resolve_cti(cti_file, cti_source)
         self.pressure_trace = AltExperimentalPressureTrace(self.file_path,
-                                                           self.experiment_parameters['pin'])
+                                                           self.experiment_parameters['pin'],
+                                                           cache=cache)
         self.compression_time = None
         self.output_end_time = None
         self.offset_points = None
         self.process_pressure_trace()
-        self.copy_to_clipboard()
+        if copy:
+            self.copy_to_clipboard()
 
     def __repr__(self):
         return 'AltExperiment(file_path={self.file_path!r})'.format(self=self)
 
-    def parse_file_name(self, file_path):
+    def results(self):
+        """Collect the results of the experiment.
+
+        Returns
+        -------
+        `collections.OrderedDict`
+            The ``date_year``, followed by the results of
+            `Experiment.results`, with the ``filter_frequency`` of the
+            pressure trace, and the name of the ``file``
+        """
+        results = OrderedDict([('date_year', self.experiment_parameters['date_year'])])
+        results.update([
+            ('time_of_day', self.experiment_parameters['time_of_day']),
+            ('pin', self.experiment_parameters['pin']),
+            ('Tin', self.experiment_parameters['Tin']),
+            ('p_EOC', self.pressure_trace.p_EOC),
+            ('ignition_delay', self.ignition_delay),
+            ('first_stage', self.first_stage),
+            ('T_EOC', self.T_EOC),
+            ('spacers', self.experiment_parameters['spacers']),
+            ('shims', self.experiment_parameters['shims']),
+            ('filter_frequency', self.pressure_trace.filter_frequency),
+            ('file', self.file_path.name),
+        ])
+        return results
+
+    @staticmethod
+    def parse_file_name(file_path):
         """Parse the file name of an experimental trace, where the name is in an alternate format.
 
         Parameters
@@ -0,0 +1,402 @@
+"""Tabulated isentropes of ideal gas mixtures"""
+
+# Third-party imports
+import numpy as np
+import cantera as ct
+
+# Local imports
+from .thermo import NASA7Mixture
+from .solutions import solution_pool
+
+_isentrope_tables = {}
+
+
+class IsentropeTable(object):
+    r"""Table of the temperature along an isentrope of an ideal gas.
+
+    The isentrope of the mixture in the chemistry file that passes
+    through the initial temperature is tabulated on a grid of the
+    logarithm of the pressure ratio. The table is built once and then
+    evaluated with `numpy.interp`, so computing the state along a long
+    trace does not require setting the state of a `cantera.Solution`
+    at every point.
+
+    Parameters
+    ----------
+    T_initial : `float`
+        Temperature at which the table starts, in Kelvin
+    chem_file : `str`, optional
+        Filename of the chemistry file to be used
+    cti_source : `str`, optional
+        Contents of the chemistry file to be used. If given, this is
+        used instead of ``chem_file``.
+    rtol : `float`, optional
+        Largest allowed relative error of the interpolated temperature
+    max_step : `float`, optional
+        Largest spacing of the grid of the logarithm of the pressure
+        ratio
+    min_step : `float`, optional
+        Smallest spacing of the grid of the logarithm of the pressure
+        ratio
+    backend : `str`, optional
+        How the temperatures on the grid are computed. With
+        ``'nasa7'``, all the points of the grid are solved at once by
+        a `~uconnrcmpy.thermo.NASA7Mixture`, unless a species in the
+        mixture does not use NASA 7-coefficient polynomials. With
+        ``'cantera'``, the state of a `cantera.Solution` is set at each
+        point.
+
+    Attributes
+    ----------
+    T_initial : `float`
+        Temperature at which the table starts, in Kelvin
+    rtol : `float`
+        Largest allowed relative error of the interpolated temperature
+    log_pressure_ratio : `numpy.ndarray`
+        Grid of the logarithm of the ratio of the pressure to the
+        pressure at ``T_initial``
+    log_temperature : `numpy.ndarray`
+        Logarithm of the temperature at each point of the grid
+    mixture : `~uconnrcmpy.thermo.NASA7Mixture` or `None`
+        Thermodynamic properties used to compute the grid, or `None` if
+        the grid is computed by Cantera
+
+    Notes
+    -----
+    The entropy of an ideal gas mixture of fixed composition is
+    :math:`s(T, p) = s^\circ(T) - R\ln(p)`, so the isentropes that
+    pass through the same temperature at different pressures only
+    differ by a constant factor on the pressure. The table is built at
+    an arbitrary pressure and any reference state :math:`(T_{ref},
+    p_{ref})` is found on it by interpolating the pressure ratio at
+    which the table temperature is :math:`T_{ref}`. This means one
+    table serves every experiment at the same initial temperature,
+    regardless of the initial pressure, as well as reference states
+    along the isentrope, such as the end of compression.
+
+    Each interval of the grid is split in half until the linear
+    interpolation of the logarithm of the temperature at its midpoint
+    differs from the value on the isentrope by no more than a quarter of
+    ``rtol``, so the grid is only dense where the heat capacity changes
+    quickly. The margin covers intervals where the largest error is not
+    at the midpoint. Intervals are not split below ``min_step``, because
+    the entropy jumps slightly at the temperature where the two NASA
+    polynomials of a species meet if they are not exactly continuous
+    there; the error in that interval is the size of the jump. The
+    relative error of the specific volume is bounded by the same value,
+    and the relative error of the pressure computed from the specific
+    volume is at most :math:`c_p/c_v` times larger. When a trace extends
+    beyond the range of the table, the table is extended with the same
+    tolerance.
+    """
+    def __init__(self, T_initial, chem_file='species.cti', cti_source=None, rtol=1.0E-6,
+                 max_step=0.05, min_step=1.0E-6, backend='nasa7'):
+        if backend not in ('nasa7', 'cantera'):
+            raise ValueError('backend must be one of "nasa7" or "cantera"')
+        self.chem_file = chem_file
+        self.cti_source = cti_source
+        self.T_initial = T_initial
+        self.rtol = rtol
+        self.max_step = max_step
+        self.min_step = min_step
+        self.mixture = None
+        with solution_pool.checkout(chem_file, cti_source) as gas:
+            if backend == 'nasa7':
+                try:
+                    self.mixture = NASA7Mixture(gas)
+                except ValueError:
+                    pass
+            self.mean_molecular_weight = gas.mean_molecular_weight
+            gas.TP = T_initial, ct.one_atm
+            self.initial_entropy = gas.entropy_mass
+
+        # Start with the range of pressure ratios of a typical compression
+        self.log_pressure_ratio = np.zeros(1)
+        self.log_temperature = np.log([T_initial])
+        self.extend(np.log(0.5), np.log(200.0))
+
+    def __repr__(self):
+        return ('IsentropeTable(T_initial={self.T_initial!r}, rtol={self.rtol!r}, '
+                'n_points={n_points!r})').format(self=self, n_points=len(self.log_pressure_ratio))
+
+    def solve(self, log_pressure_ratio):
+        """Compute the logarithm of the temperature on the isentrope.
+
+        Parameters
+        ----------
+        log_pressure_ratio : `numpy.ndarray`
+            Logarithm of the ratio of the pressure to the pressure at
+            `~IsentropeTable.T_initial`
+
+        Returns
+        -------
+        `numpy.ndarray`
+            Logarithm of the temperature at each pressure ratio
+        """
+        if self.mixture is not None:
+            return np.log(self.mixture.isentropic_temperature(np.exp(log_pressure_ratio),
+                                                              self.T_initial, 1.0))
+
+        log_temperature = np.zeros(len(log_pressure_ratio))
+        with solution_pool.checkout(self.chem_file, self.cti_source) as gas:
+            for i, x in enumerate(log_pressure_ratio):
+                gas.SP = self.initial_entropy, ct.one_atm*np.exp(x)
+                log_temperature[i] = np.log(gas.T)
+        return log_temperature
+
+    def tabulate(self, x_start, x_end):
+        """Tabulate the logarithm of the temperature on an interval.
+
+        Parameters
+        ----------
+        x_start : `float`
+            Logarithm of the pressure ratio at the start of the interval
+        x_end : `float`
+            Logarithm of the pressure ratio at the end of the interval
+
+        Returns
+        -------
+        `tuple` of `numpy.ndarray`
+            The grid of the logarithm of the pressure ratio, including
+            both ends of the interval, and the logarithm of the
+            temperature on the grid
+        """
+        n_steps = max(int(np.ceil(abs(x_end - x_start)/self.max_step)), 1)
+        x = np.linspace(x_start, x_end, n_steps + 1)
+        log_temperature = self.solve(x)
+        check = np.ones(n_steps, dtype=bool)
+        while np.any(check):
+            idx = np.nonzero(check)[0]
+            x_mid = 0.5*(x[idx] + x[idx + 1])
+            log_temperature_mid = self.solve(x_mid)
+            error = np.abs(0.5*(log_temperature[idx] + log_temperature[idx + 1]) -
+                           log_temperature_mid)
+            split = (error > 0.25*self.rtol) & (np.abs(x[idx + 1] - x[idx]) > 2*self.min_step)
+
+            # Split the intervals where the error is too large at their
+            # midpoints, which were already computed, and check both
+            # halves on the next pass
+            n_before = np.cumsum(split) - split
+            new_idx = idx[split] + n_before[split]
+            x = np.insert(x, idx[split] + 1, x_mid[split])
+            log_temperature = np.insert(log_temperature, idx[split] + 1,
+                                        log_temperature_mid[split])
+            check = np.zeros(len(x) - 1, dtype=bool)
+            check[new_idx] = True
+            check[new_idx + 1] = True
+
+        return x, log_temperature
+
+    def extend(self, x_min, x_max):
+        """Extend the table to cover a range of pressure ratios.
+
+        Parameters
+        ----------
+        x_min : `float`
+            Smallest logarithm of the pressure ratio to be covered
+        x_max : `float`
+            Largest logarithm of the pressure ratio to be covered
+        """
+        if x_min < self.log_pressure_ratio[0]:
+            x, log_temperature = self.tabulate(x_min, self.log_pressure_ratio[0])
+            self.log_pressure_ratio = np.concatenate((x[:-1], self.log_pressure_ratio))
+            self.log_temperature = np.concatenate((log_temperature[:-1], self.log_temperature))
+        if x_max > self.log_pressure_ratio[-1]:
+            x, log_temperature = self.tabulate(self.log_pressure_ratio[-1], x_max)
+            self.log_pressure_ratio = np.concatenate((self.log_pressure_ratio, x[1:]))
+            self.log_temperature = np.concatenate((self.log_temperature, log_temperature[1:]))
+
+    def grow(self, below):
+        """Double the range of the table on one side.
+
+        Parameters
+        ----------
+        below : `bool`
+            If `True`, the table is extended to lower pressures,
+            otherwise to higher pressures
+        """
+        width = max(self.log_pressure_ratio[-1] - self.log_pressure_ratio[0], self.max_step)
+        if below:
+            self.extend(self.log_pressure_ratio[0] - width, self.log_pressure_ratio[-1])
+        else:
+            self.extend(self.log_pressure_ratio[0], self.log_pressure_ratio[-1] + width)
+
+    def reference_log_pressure_ratio(self, T_ref):
+        """Find the logarithm of the pressure ratio at a temperature.
+
+        Parameters
+        ----------
+        T_ref : `float`
+            Temperature of the reference state, in Kelvin
+
+        Returns
+        -------
+        `float`
+            Logarithm of the pressure ratio at which the table
+            temperature is ``T_ref``
+        """
+        log_T_ref = np.log(T_ref)
+        while log_T_ref < self.log_temperature[0]:
+            self.grow(below=True)
+        while log_T_ref > self.log_temperature[-1]:
+            self.grow(below=False)
+        return np.interp(log_T_ref, self.log_temperature, self.log_pressure_ratio)
+
+    def temperature(self, pressure, T_ref, p_ref):
+        """Compute the temperature along an isentrope from the pressure.
+
+        Parameters
+        ----------
+        pressure : `numpy.ndarray`
+            1-D array containing the pressure
+        T_ref : `float`
+            Temperature of the reference state of the isentrope, in
+            Kelvin
+        p_ref : `float`
+            Pressure of the reference state of the isentrope, in the
+            same units as ``pressure``
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The temperature at each pressure, in Kelvin
+        """
+        x = np.log(np.asarray(pressure)/p_ref) + self.reference_log_pressure_ratio(T_ref)
+        self.extend(np.amin(x), np.amax(x))
+        return np.exp(np.interp(x, self.log_pressure_ratio, self.log_temperature))
+
+    def volume(self, pressure, v_ref, T_ref, p_ref):
+        """Compute the volume along an isentrope from the pressure.
+
+        Parameters
+        ----------
+        pressure : `numpy.ndarray`
+            1-D array containing the pressure
+        v_ref : `float`
+            Volume of the reference state of the isentrope
+        T_ref : `float`
+            Temperature of the reference state of the isentrope, in
+            Kelvin
+        p_ref : `float`
+            Pressure of the reference state of the isentrope, in the
+            same units as ``pressure``
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The volume at each pressure, in the same units as ``v_ref``
+        """
+        pressure = np.asarray(pressure)
+        return v_ref*p_ref/pressure*self.temperature(pressure, T_ref, p_ref)/T_ref
+
+    def pressure(self, volume, v_ref, T_ref, p_ref):
+        """Compute the pressure along an isentrope from the volume.
+
+        Parameters
+        ----------
+        volume : `numpy.ndarray`
+            1-D array containing the volume
+        v_ref : `float`
+            Volume of the reference state of the isentrope, in the same
+            units as ``volume``
+        T_ref : `float`
+            Temperature of the reference state of the isentrope, in
+            Kelvin
+        p_ref : `float`
+            Pressure of the reference state of the isentrope
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The pressure at each volume, in the same units as ``p_ref``
+        """
+        x_ref = self.reference_log_pressure_ratio(T_ref)
+        # The logarithm of the volume, up to a constant, decreases
+        # monotonically along the table
+        y_ref = np.log(T_ref) - x_ref
+        y = np.log(np.asarray(volume)/v_ref) + y_ref
+        y_min, y_max = np.amin(y), np.amax(y)
+        while y_max > self.log_temperature[0] - self.log_pressure_ratio[0]:
+            self.grow(below=True)
+        while y_min < self.log_temperature[-1] - self.log_pressure_ratio[-1]:
+            self.grow(below=False)
+        log_volume = self.log_temperature - self.log_pressure_ratio
+        x = np.interp(y, log_volume[::-1], self.log_pressure_ratio[::-1])
+        return p_ref*np.exp(x - x_ref)
+
+    def density(self, pressure, temperature):
+        """Compute the density of the mixture.
+
+        Parameters
+        ----------
+        pressure : `numpy.ndarray`
+            1-D array containing the pressure, in Pa
+        temperature : `numpy.ndarray`
+            1-D array containing the temperature, in Kelvin
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The density, in kg/m**3
+        """
+        return (np.asarray(pressure)*self.mean_molecular_weight /
+                (ct.gas_constant*np.asarray(temperature)))
+
+    def enthalpy(self, temperature):
+        """Compute the specific enthalpy of the mixture.
+
+        The enthalpy of an ideal gas does not depend on the pressure.
+
+        Parameters
+        ----------
+        temperature : `numpy.ndarray`
+            1-D array containing the temperature, in Kelvin
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The enthalpy, in J/kg
+        """
+        temperature = np.asarray(temperature, dtype=float)
+        if self.mixture is not None:
+            return (self.mixture.h_RT(temperature)*ct.gas_constant*temperature /
+                    self.mixture.mean_molecular_weight)
+
+        enthalpy = np.zeros(len(temperature))
+        with solution_pool.checkout(self.chem_file, self.cti_source) as gas:
+            for i, T in enumerate(temperature):
+                gas.TP = T, ct.one_atm
+                enthalpy[i] = gas.enthalpy_mass
+        return enthalpy
+
+
+def get_isentrope_table(T_initial, chem_file='species.cti', cti_source=None, backend='nasa7'):
+    """Get the `IsentropeTable` for a mechanism and initial temperature.
+
+    Tables are stored for the life of the process and shared by every
+    caller with the same contents of the chemistry file, initial
+    temperature, and backend.
+
+    Parameters
+    ----------
+    T_initial : `float`
+        Temperature at which the table starts, in Kelvin
+    chem_file : `str`, optional
+        Filename of the chemistry file to be used
+    cti_source : `str`, optional
+        Contents of the chemistry file to be used. If given, this is
+        used instead of ``chem_file``.
+    backend : `str`, optional
+        How the temperatures on the grid are computed, see
+        `IsentropeTable`
+
+    Returns
+    -------
+    `IsentropeTable`
+        The table for the mechanism and initial temperature
+    """
+    key = (solution_pool.key(chem_file, cti_source), float(T_initial), backend)
+    if key not in _isentrope_tables:
+        _isentrope_tables[key] = IsentropeTable(T_initial, chem_file=chem_file,
+                                                cti_source=cti_source, backend=backend)
+    return _isentrope_tables[key]
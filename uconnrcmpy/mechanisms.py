@@ -0,0 +1,245 @@
+"""Persistent cache of converted chemistry files"""
+
+# System imports
+import argparse
+import hashlib
+import os
+from pathlib import Path
+import threading
+
+# Third-party imports
+import cantera as ct
+try:
+    from cantera import cti2yaml as converter
+    converted_suffix = '.yaml'
+except ImportError:
+    from cantera import ctml_writer as converter
+    converted_suffix = '.xml'
+
+# Local imports
+from .caches import cache_home, DiskCache
+
+# Cantera 3.0 removed support for loading CTI files, so they can only
+# be loaded after they are converted
+cti_loadable = int(ct.__version__.split('.')[0]) < 3
+
+# The converters keep the mechanism being converted in module globals
+_converter_lock = threading.Lock()
+
+
+def mechanism_hash(chem_file='species.cti', cti_source=None):
+    """Compute the hash of the contents of a chemistry file.
+
+    Parameters
+    ----------
+    chem_file : `str` or `pathlib.Path`, optional
+        Filename of the chemistry file. If the file does not exist, it
+        is assumed to be one of the data files distributed with Cantera
+        (e.g., ``air.xml``), and the name is hashed instead.
+    cti_source : `str`, optional
+        Contents of the chemistry file. If given, this is hashed
+        instead of the file.
+
+    Returns
+    -------
+    `str`
+        The hexadecimal SHA-1 hash
+    """
+    if cti_source is None:
+        if Path(str(chem_file)).is_file():
+            with open(str(chem_file), 'r') as in_file:
+                cti_source = in_file.read()
+        else:
+            cti_source = 'cantera-data:{}'.format(chem_file)
+    return hashlib.sha1(cti_source.encode('utf-8')).hexdigest()
+
+
+def is_cti(chem_file=None, cti_source=None):
+    """Determine if a chemistry file is in the CTI format.
+
+    Parameters
+    ----------
+    chem_file : `str` or `pathlib.Path`, optional
+        Filename of the chemistry file
+    cti_source : `str`, optional
+        Contents of the chemistry file. If given, this is used
+        instead of ``chem_file``.
+
+    Returns
+    -------
+    `bool`
+        `True` if the chemistry file has the ``.cti`` extension, or if
+        the contents are not XML
+    """
+    if cti_source is not None:
+        return not cti_source.lstrip().startswith('<')
+    return Path(str(chem_file)).suffix == '.cti'
+
+
+class MechanismCache(DiskCache):
+    """On-disk cache of chemistry files converted from the CTI format.
+
+    Cantera converts a CTI file every time it is loaded, which takes
+    most of the time to load a detailed mechanism. The converted file
+    (YAML for Cantera 2.5 and newer, XML for older versions) is stored
+    under the hash of the contents of the CTI file, so every later
+    process loads the converted file directly. The least recently used
+    files are removed as described in `~uconnrcmpy.caches.DiskCache`.
+
+    Parameters
+    ----------
+    cache_dir : `str` or `pathlib.Path`, optional
+        Folder where the converted files are stored. If not given, the
+        ``mechanisms`` folder in `~uconnrcmpy.caches.cache_home` is
+        used.
+    max_size : `int`, optional
+        Largest total size of the converted files, in bytes
+    """
+
+    suffix = converted_suffix
+
+    def __init__(self, cache_dir=None, max_size=256*1024**2):
+        if cache_dir is None:
+            cache_dir = cache_home() / 'mechanisms'
+        super().__init__(cache_dir, max_size)
+
+    def path(self, chem_file=None, cti_source=None):
+        """Find the location of the converted file for a chemistry file.
+
+        Parameters
+        ----------
+        chem_file : `str` or `pathlib.Path`, optional
+            Filename of the chemistry file
+        cti_source : `str`, optional
+            Contents of the chemistry file. If given, this is used
+            instead of ``chem_file``.
+
+        Returns
+        -------
+        `pathlib.Path`
+            Location of the converted file, which may not exist yet
+        """
+        return super().path(mechanism_hash(chem_file, cti_source))
+
+    def get(self, chem_file=None, cti_source=None):
+        """Get the converted file for a chemistry file.
+
+        The file is converted and stored in the cache if it is not
+        there already.
+
+        Parameters
+        ----------
+        chem_file : `str` or `pathlib.Path`, optional
+            Filename of the chemistry file
+        cti_source : `str`, optional
+            Contents of the chemistry file. If given, this is used
+            instead of ``chem_file``.
+
+        Returns
+        -------
+        `pathlib.Path`
+            Location of the converted file
+        """
+        cache_path = self.path(chem_file, cti_source)
+        if self.touch(cache_path):
+            return cache_path
+
+        if cti_source is None:
+            with open(str(chem_file), 'r') as in_file:
+                cti_source = in_file.read()
+
+        temp_path = self.temp_path(cache_path)
+        try:
+            with _converter_lock:
+                if converted_suffix == '.yaml':
+                    converter.convert(text=cti_source, output_name=str(temp_path))
+                else:
+                    converter.convert(text=cti_source, outName=str(temp_path))
+            os.replace(str(temp_path), str(cache_path))
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        self.evict(keep=cache_path)
+        return cache_path
+
+
+mechanism_cache = MechanismCache()
+"""`MechanismCache`: The cache used when a `cantera.Solution` is created."""
+
+
+def load_path(chem_file='species.cti', cti_source=None):
+    """Find the file Cantera should load for a chemistry file.
+
+    Parameters
+    ----------
+    chem_file : `str` or `pathlib.Path`, optional
+        Filename of the chemistry file
+    cti_source : `str`, optional
+        Contents of the chemistry file. If given, this is used
+        instead of ``chem_file``.
+
+    Returns
+    -------
+    `str` or `None`
+        The converted file in `mechanism_cache` for a CTI chemistry
+        file, or `None` if the chemistry file should be loaded
+        directly, because it is not in the CTI format, it is one of
+        the data files distributed with Cantera, or it has a syntax
+        error and Cantera can load CTI files, so Cantera reports the
+        error when it loads the original file
+
+    Raises
+    ------
+    ValueError
+        If the CTI file has a syntax error and the installed Cantera
+        cannot load CTI files
+    """
+    if not is_cti(chem_file, cti_source):
+        return None
+    if cti_source is None and not Path(str(chem_file)).is_file():
+        return None
+    try:
+        return str(mechanism_cache.get(chem_file, cti_source))
+    except SystemExit:
+        # The converters print the syntax error and exit
+        if cti_loadable:
+            return None
+        name = 'source' if cti_source is not None else 'file {}'.format(chem_file)
+        raise ValueError('The CTI {} could not be converted because of the syntax error printed '
+                         'above'.format(name))
+
+
+def main(argv=None):
+    """Convert chemistry files and store them in the cache.
+
+    Run as ``python -m uconnrcmpy.mechanisms`` or ``warmmechanismcache``
+    with the CTI files as arguments.
+
+    Parameters
+    ----------
+    argv : `list` of `str`, optional
+        Command line arguments. If not given, `sys.argv` is used.
+    """
+    parser = argparse.ArgumentParser(
+        description='Convert CTI files and store them in the UConnRCMPy mechanism cache.',
+    )
+    parser.add_argument('chem_files', nargs='*', metavar='CTI_FILE',
+                        help='CTI files to convert and store in the cache')
+    parser.add_argument('--cache-dir', help='Folder of the cache. Defaults to {}'.format(
+        cache_home() / 'mechanisms'))
+    parser.add_argument('--max-size', type=int, default=mechanism_cache.max_size,
+                        help='Largest total size of the cache, in bytes')
+    parser.add_argument('--clear', action='store_true',
+                        help='Remove all of the files from the cache before converting')
+    args = parser.parse_args(argv)
+
+    cache = MechanismCache(args.cache_dir, args.max_size)
+    if args.clear:
+        cache.clear()
+    for chem_file in args.chem_files:
+        print('{} -> {}'.format(chem_file, cache.get(chem_file)))
+
+
+if __name__ == '__main__':
+    main()
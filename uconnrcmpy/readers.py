@@ -0,0 +1,147 @@
+"""Readers for the text files written by the data acquisition system"""
+
+# System imports
+import os
+from pathlib import Path
+import warnings
+
+# Third-party imports
+import numpy as np
+
+
+def parse_trace(file_path):
+    """Parse a whitespace-delimited text trace into a 2-D array.
+
+    Parameters
+    ----------
+    file_path : `str` or `pathlib.Path`
+        Location of the text file to be parsed
+
+    Returns
+    -------
+    `numpy.ndarray`
+        2-D array with one row per line of the file and one column per
+        whitespace-delimited field
+
+    Notes
+    -----
+    The numbers are converted in a single pass by `numpy.fromstring`,
+    which is an order of magnitude faster than `numpy.genfromtxt` for
+    the two-column files written by the data acquisition system. If the
+    file does not consist of a rectangular block of numbers (e.g., it
+    has a header or missing values), the file is parsed by
+    `numpy.genfromtxt` instead.
+    """
+    with open(str(file_path), 'rb') as in_file:
+        raw = in_file.read().strip()
+
+    n_columns = len(raw.split(b'\n', 1)[0].split())
+    n_rows = raw.count(b'\n') + 1
+    with warnings.catch_warnings():
+        # Newer versions of NumPy warn when the string cannot be
+        # parsed to its end; treat that the same as a size mismatch
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            data = np.fromstring(raw, sep=' ')
+        except (ValueError, DeprecationWarning):
+            data = np.zeros(0)
+
+    if n_columns == 0 or data.size != n_rows*n_columns:
+        return np.genfromtxt(str(file_path))
+
+    return data.reshape(n_rows, n_columns)
+
+
+def sidecar_path(file_path):
+    """Return the location of the binary sidecar for a text trace.
+
+    The sidecar is a hidden ``.npy`` file in the same folder as the
+    text file. Its name contains the size and the modification time of
+    the text file, so a sidecar is never used for a file that has been
+    changed since the sidecar was written.
+
+    Parameters
+    ----------
+    file_path : `str` or `pathlib.Path`
+        Location of the text file
+
+    Returns
+    -------
+    `pathlib.Path`
+        Location of the sidecar file
+    """
+    file_path = Path(file_path)
+    stat = os.stat(str(file_path))
+    return file_path.with_name('.{name}.{size}-{mtime}.npy'.format(
+        name=file_path.name, size=stat.st_size, mtime=stat.st_mtime_ns,
+    ))
+
+
+def write_sidecar(file_path, data):
+    """Write the parsed array of a text trace to its binary sidecar.
+
+    Any sidecars of older versions of the text file are removed. Errors
+    writing the sidecar (e.g., a read-only folder) are ignored, since the
+    sidecar only exists to speed up later loads.
+
+    Parameters
+    ----------
+    file_path : `str` or `pathlib.Path`
+        Location of the text file
+    data : `numpy.ndarray`
+        The parsed contents of the text file
+    """
+    file_path = Path(file_path)
+    cache_path = sidecar_path(file_path)
+    prefix = '.{}.'.format(file_path.name)
+    try:
+        for old_path in file_path.parent.iterdir():
+            if (old_path.name.startswith(prefix) and old_path.suffix == '.npy' and
+                    old_path != cache_path):
+                old_path.unlink()
+
+        temp_path = cache_path.with_name(cache_path.name + '.tmp{}'.format(os.getpid()))
+        with open(str(temp_path), 'wb') as out_file:
+            np.save(out_file, data)
+        os.replace(str(temp_path), str(cache_path))
+    except (IOError, OSError):
+        pass
+
+
+def load_trace(file_path, cache=True):
+    """Load a text trace, using the binary sidecar when possible.
+
+    Parameters
+    ----------
+    file_path : `str` or `pathlib.Path`
+        Location of the text file
+    cache : `bool`, optional
+        If `True`, the array is loaded from the sidecar written by
+        `write_sidecar` when it matches the current size and
+        modification time of the text file. Otherwise, the text file
+        is parsed by `parse_trace` and a new sidecar is written. If
+        `False`, the text file is always parsed and no sidecar is
+        written.
+
+    Returns
+    -------
+    `numpy.ndarray`
+        2-D array with the contents of the text file
+
+    Notes
+    -----
+    Sidecars are memory-mapped in copy-on-write mode, so the returned
+    array can be modified in place without changing the sidecar.
+    """
+    if not cache:
+        return parse_trace(file_path)
+
+    cache_path = sidecar_path(file_path)
+    try:
+        return np.asarray(np.load(str(cache_path), mmap_mode='c'))
+    except (IOError, OSError, ValueError):
+        pass
+
+    data = parse_trace(file_path)
+    write_sidecar(file_path, data)
+    return data
@@ -0,0 +1,353 @@
+"""Brute-force sensitivity of the ignition delay to the reaction rates"""
+
+# System imports
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import csv
+import hashlib
+import os
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from .simulations import Simulation, simulation_cache
+from .solutions import solution_pool
+
+
+def simulate_ignition_delay(compression_time, **kwargs):
+    """Run a reactive simulation and find its ignition delay.
+
+    Parameters
+    ----------
+    compression_time : `float`
+        Time of the end of compression, in ms
+    kwargs
+        Arguments of `~uconnrcmpy.simulations.Simulation`, except for
+        ``is_reactive``
+
+    Returns
+    -------
+    `float`
+        The ignition delay, in ms, or NaN if the temperature did not
+        reach the ``end_temp`` before the ``end_time``
+    """
+    sim = Simulation(is_reactive=True, **kwargs)
+    if sim.temperature[-1] < sim.end_temp:
+        return np.nan
+    return sim.ignition_delay(compression_time)
+
+
+class SensitivityAnalysis(object):
+    r"""Sensitivity of the ignition delay of a condition to the reaction rates.
+
+    The rate of each reaction is multiplied by ``factor`` in turn and
+    the ignition delay of the reactive simulation of the condition is
+    computed as in `~uconnrcmpy.conditions.Condition.compare_to_sim`.
+    The sensitivity coefficient of reaction :math:`i` is
+
+    .. math::
+
+        S_i = \frac{\ln(\tau_i/\tau_0)}{\ln f}
+
+    where :math:`\tau_i` is the perturbed ignition delay,
+    :math:`\tau_0` is the nominal ignition delay, and :math:`f` is the
+    ``factor``.
+
+    Parameters
+    ----------
+    condition : `~uconnrcmpy.conditions.Condition`
+        Condition whose volume trace, experimental pressure trace,
+        reactive case, and compression time are used for the
+        simulations
+    reactions : `list` of `int`, optional
+        Indices of the reactions to perturb. If not given, all of the
+        reactions in the mechanism are perturbed.
+    factor : `float`, optional
+        Multiplier of the rate of the perturbed reaction
+    end_temp : `float`, optional
+        Temperature at which the simulations are ended
+    end_time : `float`, optional
+        Time at which the simulations are ended
+    share_compression : `bool`, optional
+        If `True`, the perturbed simulations start from the state of the
+        nominal simulation at the end of compression, if the chemistry
+        is frozen during the compression
+    progress_file : `str`, optional
+        CSV file where the ignition delay of each simulation is written
+        as soon as it is finished, so an interrupted analysis can be
+        resumed
+    jobs : `int`, optional
+        Number of worker processes that run the simulations. If one,
+        the simulations are run in this process.
+    use_cache : `bool`, optional
+        True to load the nominal simulation and its state at the end
+        of compression from the `~uconnrcmpy.simulations.simulation_cache`
+        when a shared compression analysis is resumed, and to store
+        them in it otherwise. True by default.
+
+    Attributes
+    ----------
+    reactions : `list` of `int`
+        Indices of the perturbed reactions
+    equations : `list` of `str`
+        Equations of the perturbed reactions
+    key : `str`
+        Hash of the inputs of the simulations, which identifies the
+        rows of this analysis in the ``progress_file``
+    nominal_delay : `float`
+        Ignition delay of the nominal simulation, in ms
+    ignition_delays : `dict`
+        Ignition delay of each perturbed simulation, in ms, keyed by the
+        index of the reaction
+    checkpoint : `~uconnrcmpy.simulations.SimulationCheckpoint` or `None`
+        State of the nominal simulation at the end of compression from
+        which the perturbed simulations start, or `None` if they start
+        from the beginning
+
+    Notes
+    -----
+    The compression stroke is shared if the temperature of the nominal
+    simulation at the end of compression differs from the temperature
+    of a nonreactive simulation by less than `compression_rtol`. This
+    assumes that multiplying one reaction rate by ``factor`` does not
+    make the chemistry during the compression significant either.
+
+    The ``progress_file`` can hold the rows of several analyses; when
+    an analysis is run again, the reactions that already have a row
+    with the same `key` are not simulated again. The nominal ignition
+    delay is read from the ``progress_file`` as well, and the nominal
+    simulation is only needed again for the shared compression state
+    if some reactions have not been simulated.
+    """
+
+    compression_rtol = 1.0E-4
+    """`float`: Largest relative difference between the temperature of
+    the nominal and nonreactive simulations at the end of compression
+    for which the compression stroke is shared"""
+
+    def __init__(self, condition, reactions=None, factor=2.0, end_temp=2500.0, end_time=0.2,
+                 share_compression=True, progress_file='sensitivity-runs.csv', jobs=1,
+                 use_cache=True):
+        self.condition = condition
+        self.factor = factor
+        self.end_temp = end_temp
+        self.end_time = end_time
+        self.share_compression = share_compression
+        self.progress_file = progress_file
+        self.jobs = jobs
+        self.use_cache = use_cache
+        self.compression_time = condition.reactive_compression_time
+        self.parameters = dict(condition.simulation_parameters(), end_temp=end_temp,
+                               end_time=end_time)
+
+        chem_file = self.parameters['chem_file']
+        with solution_pool.checkout(chem_file) as gas:
+            if reactions is None:
+                reactions = range(gas.n_reactions)
+            self.reactions = [int(i) for i in reactions]
+            self.equations = [gas.reaction(i).equation for i in self.reactions]
+
+        key = hashlib.sha1()
+        key.update(solution_pool.key(chem_file).encode('utf-8'))
+        key.update(np.ascontiguousarray(self.parameters['volume'], dtype=float).tobytes())
+        key.update(repr((float(self.parameters['initial_temperature']),
+                         float(self.parameters['initial_pressure']), float(end_temp),
+                         float(end_time), float(factor), bool(share_compression),
+                         float(self.compression_time))).encode('utf-8'))
+        self.key = key.hexdigest()
+
+        self.nominal_delay = None
+        self.ignition_delays = {}
+        self.checkpoint = None
+
+    def __repr__(self):
+        return ('SensitivityAnalysis(reactions={self.reactions!r}, factor={self.factor!r}, '
+                'end_temp={self.end_temp!r}, end_time={self.end_time!r}, '
+                'share_compression={self.share_compression!r}, '
+                'progress_file={self.progress_file!r}, jobs={self.jobs!r}, '
+                'use_cache={self.use_cache!r})').format(self=self)
+
+    def load_progress(self):
+        """Read the ignition delays of this analysis from the progress file.
+
+        Returns
+        -------
+        `dict`
+            Ignition delays keyed by the index of the reaction, where the
+            nominal simulation has the index ``-1``
+        """
+        delays = {}
+        if not os.path.exists(self.progress_file):
+            return delays
+        with open(self.progress_file, 'r', newline='') as in_file:
+            for row in csv.DictReader(in_file):
+                if row['key'] == self.key:
+                    delays[int(row['reaction'])] = float(row['ignition_delay'])
+        return delays
+
+    def save_progress(self, reaction, ignition_delay):
+        """Append the ignition delay of one simulation to the progress file.
+
+        Parameters
+        ----------
+        reaction : `int`
+            Index of the perturbed reaction, or ``-1`` for the nominal
+            simulation
+        ignition_delay : `float`
+            Ignition delay of the simulation, in ms
+        """
+        new_file = not os.path.exists(self.progress_file)
+        with open(self.progress_file, 'a', newline='') as out_file:
+            writer = csv.writer(out_file)
+            if new_file:
+                writer.writerow(['key', 'reaction', 'multiplier', 'ignition_delay'])
+            multiplier = 1.0 if reaction < 0 else self.factor
+            writer.writerow([self.key, reaction, multiplier, repr(float(ignition_delay))])
+
+    def run_nominal(self):
+        """Run the nominal simulation and find the shared compression state.
+
+        Sets `nominal_delay` and `checkpoint`. The nominal ignition
+        delay is read from the progress file if it is there, and the
+        nominal simulation is skipped unless its state at the end of
+        compression is needed for the reactions that have not been
+        simulated.
+
+        Raises
+        ------
+        RuntimeError
+            If the nominal simulation does not ignite after the end of
+            compression, so the sensitivities cannot be computed
+        """
+        done = self.load_progress()
+        if -1 in done:
+            self.nominal_delay = done[-1]
+        nominal = None
+        if not self.share_compression or all(i in done for i in self.reactions):
+            if -1 not in done:
+                self.nominal_delay = simulate_ignition_delay(self.compression_time,
+                                                             **self.parameters)
+                self.save_progress(-1, self.nominal_delay)
+        else:
+            eoc_time = self.compression_time/1000
+            cache = simulation_cache if self.use_cache else None
+            nominal = Simulation(is_reactive=True, checkpoint_time=eoc_time, cache=cache,
+                                 **self.parameters)
+            if -1 not in done:
+                self.nominal_delay = nominal.ignition_delay(self.compression_time)
+                if nominal.temperature[-1] < self.end_temp:
+                    self.nominal_delay = np.nan
+                self.save_progress(-1, self.nominal_delay)
+
+        if not self.nominal_delay > 0:
+            raise RuntimeError('The nominal simulation did not ignite after the end of '
+                               'compression before the end_time, so the sensitivities cannot '
+                               'be computed. Its ignition delay is {} ms.'.format(
+                                   self.nominal_delay))
+        if nominal is None:
+            return
+
+        checkpoint = nominal.checkpoint
+        if checkpoint is not None:
+            nonreactive = Simulation(is_reactive=False, cache=cache,
+                                     **dict(self.parameters, end_time=eoc_time))
+            T_nonreactive = np.interp(eoc_time, nonreactive.time, nonreactive.temperature)
+            frozen = np.isclose(checkpoint.temperature, T_nonreactive,
+                                rtol=self.compression_rtol, atol=0)
+        if checkpoint is not None and frozen:
+            self.checkpoint = checkpoint
+        else:
+            print('The chemistry is not frozen during the compression, so the perturbed '
+                  'simulations start from the beginning')
+
+    def run(self):
+        """Run the simulations that are not in the progress file.
+
+        Returns
+        -------
+        `list` of `tuple`
+            The ranked sensitivity table. See `table`.
+
+        Raises
+        ------
+        RuntimeError
+            If the nominal simulation does not ignite. See
+            `run_nominal`.
+        """
+        self.run_nominal()
+        done = self.load_progress()
+        self.ignition_delays = {i: done[i] for i in self.reactions if i in done}
+        pending = [i for i in self.reactions if i not in done]
+
+        kwargs = dict(self.parameters)
+        if self.checkpoint is not None:
+            kwargs['restart'] = self.checkpoint
+
+        if self.jobs == 1:
+            for i in pending:
+                delay = simulate_ignition_delay(self.compression_time,
+                                                multipliers={i: self.factor}, **kwargs)
+                self.ignition_delays[i] = delay
+                self.save_progress(i, delay)
+        else:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                futures = {executor.submit(simulate_ignition_delay, self.compression_time,
+                                           multipliers={i: self.factor}, **kwargs): i
+                           for i in pending}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    self.ignition_delays[i] = future.result()
+                    self.save_progress(i, self.ignition_delays[i])
+
+        return self.table()
+
+    def sensitivity(self, ignition_delay):
+        """Compute the sensitivity coefficient from a perturbed ignition delay.
+
+        Parameters
+        ----------
+        ignition_delay : `float`
+            Perturbed ignition delay, in ms
+
+        Returns
+        -------
+        `float`
+            The sensitivity coefficient, or NaN if either ignition delay
+            is not positive
+        """
+        if not (ignition_delay > 0 and self.nominal_delay > 0):
+            return np.nan
+        return np.log(ignition_delay/self.nominal_delay)/np.log(self.factor)
+
+    def table(self):
+        """Rank the reactions by the magnitude of their sensitivity.
+
+        Returns
+        -------
+        `list` of `tuple`
+            The rank, reaction index, equation, perturbed ignition delay,
+            and sensitivity coefficient of each reaction that has been
+            simulated, from the largest to the smallest magnitude of the
+            sensitivity, followed by the reactions whose sensitivity is
+            NaN
+        """
+        rows = []
+        for i, equation in zip(self.reactions, self.equations):
+            if i in self.ignition_delays:
+                delay = self.ignition_delays[i]
+                rows.append((i, equation, delay, self.sensitivity(delay)))
+        rows.sort(key=lambda row: (np.isnan(row[3]), -abs(row[3])))
+        return [(rank + 1,) + row for rank, row in enumerate(rows)]
+
+    def write_table(self, filename='sensitivity.csv'):
+        """Write the ranked sensitivity table to a CSV file.
+
+        Parameters
+        ----------
+        filename : `str`, optional
+            Name of the CSV file
+        """
+        with open(filename, 'w', newline='') as out_file:
+            writer = csv.writer(out_file)
+            writer.writerow(['rank', 'reaction', 'equation', 'ignition_delay', 'sensitivity'])
+            writer.writerows(self.table())
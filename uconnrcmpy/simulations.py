@@ -1,9 +1,265 @@
 """Simulations Module"""
 
+# System imports
+from bisect import bisect_right
+import hashlib
+import os
+
 # Third party imports
 import numpy as np
 import cantera as ct
 
+# Local imports
+from .caches import cache_home, DiskCache
+from .derivatives import nonuniform_derivative
+from .isentropes import get_isentrope_table
+from .solutions import solution_pool
+
+
+def stroke_key(initial_temperature, initial_pressure, volume, is_reactive,
+               chem_file='species.cti', cti_source=None):
+    """Compute the hash of the inputs that determine a compression stroke.
+
+    Two simulations with the same key integrate the same equations from
+    the same initial state, so a `SimulationCheckpoint` of one of them
+    can be used to start the other one.
+
+    Parameters
+    ----------
+    initial_temperature : `float`
+        The initial temperature of the simulation
+    initial_pressure : `float`
+        The initial pressure of the simulation
+    volume : `numpy.ndarray`
+        The volume trace of the simulation
+    is_reactive : `bool`
+        If the simulation is reactive
+    chem_file : `str`, optional
+        String filename of the chemistry file
+    cti_source : `str`, optional
+        Contents of the chemistry file. If given, this is used instead
+        of ``chem_file``.
+
+    Returns
+    -------
+    `str`
+        The hexadecimal SHA-1 hash
+    """
+    key = hashlib.sha1()
+    key.update(solution_pool.key(chem_file, cti_source).encode('utf-8'))
+    key.update(np.ascontiguousarray(volume, dtype=float).tobytes())
+    key.update(repr((float(initial_temperature), float(initial_pressure),
+                     bool(is_reactive))).encode('utf-8'))
+    return key.hexdigest()
+
+
+class SimulationCheckpoint(object):
+    """State of a reactor simulation at one time step.
+
+    A `Simulation` started from a checkpoint with its ``restart``
+    parameter continues the integration from the state of the
+    checkpoint instead of from time zero, and its results include the
+    history of the simulation up to the checkpoint.
+
+    Parameters
+    ----------
+    stroke_key : `str`
+        Hash of the inputs of the simulation from `stroke_key`
+    run_key : `str`
+        Hash of `stroke_key` and of the other parameters of the
+        simulation that change its solution
+    history : `dict`
+        Arrays of the ``time``, ``temperature``, ``pressure``,
+        ``simulated_volume``, and the recorded properties of the
+        simulation up to and including the checkpoint
+    Y : `numpy.ndarray`
+        Mass fractions of the reactor at the checkpoint
+    captured : `SimulationCheckpoint`, optional
+        Checkpoint stored earlier in the same simulation at its
+        ``checkpoint_time``, which is kept with this checkpoint so a
+        simulation resumed from it still has its `Simulation.checkpoint`
+
+    Attributes
+    ----------
+    time : `float`
+        Time of the checkpoint, in seconds
+    temperature : `float`
+        Temperature of the reactor at the checkpoint, in Kelvin
+    pressure : `float`
+        Pressure of the reactor at the checkpoint, in bar
+    volume : `float`
+        Volume of the reactor at the checkpoint
+    """
+    def __init__(self, stroke_key, run_key, history, Y, captured=None):
+        self.stroke_key = stroke_key
+        self.run_key = run_key
+        self.history = history
+        self.Y = np.asarray(Y, dtype=float)
+        self.captured = captured
+        self.time = float(history['time'][-1])
+        self.temperature = float(history['temperature'][-1])
+        self.pressure = float(history['pressure'][-1])
+        self.volume = float(history['simulated_volume'][-1])
+
+    def __repr__(self):
+        return ('SimulationCheckpoint(time={self.time!r}, temperature={self.temperature!r}, '
+                'pressure={self.pressure!r}, stroke_key={self.stroke_key!r})').format(
+                    self=self,
+                )
+
+    def save(self, filename):
+        """Write the checkpoint to a NumPy ``.npz`` file.
+
+        The file is written under a temporary name and renamed, so an
+        existing checkpoint is not lost if the process is interrupted
+        while the file is written. The `captured` checkpoint is stored
+        as its mass fractions and the size of its history, which is
+        the start of the history of this checkpoint.
+
+        Parameters
+        ----------
+        filename : `str`
+            Name of the file
+        """
+        arrays = {'history.' + name: value for name, value in self.history.items()}
+        if self.captured is not None:
+            arrays['captured.Y'] = self.captured.Y
+            arrays['captured.size'] = len(self.captured.history['time'])
+        temp_name = '{}.tmp{}'.format(filename, os.getpid())
+        try:
+            with open(temp_name, 'wb') as out_file:
+                np.savez(out_file, stroke_key=self.stroke_key, run_key=self.run_key, Y=self.Y,
+                         **arrays)
+            os.replace(temp_name, filename)
+        finally:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+
+    @classmethod
+    def load(cls, filename):
+        """Read a checkpoint written by `save`.
+
+        Parameters
+        ----------
+        filename : `str`
+            Name of the file
+
+        Returns
+        -------
+        `SimulationCheckpoint`
+            The checkpoint
+        """
+        with np.load(filename) as data:
+            history = {name[len('history.'):]: data[name] for name in data.files
+                       if name.startswith('history.')}
+            stroke_key, run_key = str(data['stroke_key']), str(data['run_key'])
+            captured = None
+            if 'captured.Y' in data.files:
+                size = int(data['captured.size'])
+                captured = cls(stroke_key, run_key,
+                               {name: value[:size] for name, value in history.items()},
+                               data['captured.Y'])
+            return cls(stroke_key, run_key, history, data['Y'], captured)
+
+
+class SimulationCache(DiskCache):
+    """On-disk cache of the results of simulations.
+
+    The time histories of a `Simulation` are stored in a NumPy ``.npz``
+    file under its `Simulation.result_key`, which is a hash of all of
+    the inputs that change the results, so a simulation that was run
+    before, e.g., in an earlier analysis session, is loaded instead of
+    being run again. The least recently used files are removed as
+    described in `~uconnrcmpy.caches.DiskCache`.
+
+    Parameters
+    ----------
+    cache_dir : `str` or `pathlib.Path`, optional
+        Folder where the results are stored. If not given, the
+        ``simulations`` folder in `~uconnrcmpy.caches.cache_home` is
+        used.
+    max_size : `int`, optional
+        Largest total size of the stored results, in bytes
+    """
+
+    suffix = '.npz'
+
+    def __init__(self, cache_dir=None, max_size=1024**3):
+        if cache_dir is None:
+            cache_dir = cache_home() / 'simulations'
+        super().__init__(cache_dir, max_size)
+
+    def get(self, key):
+        """Load the results stored under a key.
+
+        Parameters
+        ----------
+        key : `str`
+            The `Simulation.result_key` of the simulation
+
+        Returns
+        -------
+        `tuple` or `None`
+            The `dict` of the arrays of the results and the
+            `SimulationCheckpoint` or `None`, as given to `put`, or
+            `None` if there are no results stored under ``key``
+        """
+        cache_path = self.path(key)
+        if not self.touch(cache_path):
+            return None
+        try:
+            with np.load(str(cache_path)) as data:
+                arrays = {name: data[name] for name in data.files}
+        except OSError:
+            # Removed by another process
+            return None
+
+        results = {name[len('results.'):]: value for name, value in arrays.items()
+                   if name.startswith('results.')}
+        checkpoint = None
+        if 'checkpoint.size' in arrays:
+            size = int(arrays['checkpoint.size'])
+            history = {name: value[:size] for name, value in results.items()}
+            checkpoint = SimulationCheckpoint(str(arrays['checkpoint.stroke_key']),
+                                              str(arrays['checkpoint.run_key']), history,
+                                              arrays['checkpoint.Y'])
+        return results, checkpoint
+
+    def put(self, key, results, checkpoint=None):
+        """Store the results of a simulation under a key.
+
+        Parameters
+        ----------
+        key : `str`
+            The `Simulation.result_key` of the simulation
+        results : `dict`
+            Arrays of the ``time``, ``temperature``, ``pressure``,
+            ``simulated_volume``, and the recorded properties
+        checkpoint : `SimulationCheckpoint`, optional
+            Checkpoint of the simulation, whose history must be the
+            first rows of the ``results``
+        """
+        arrays = {'results.' + name: value for name, value in results.items()}
+        if checkpoint is not None:
+            arrays.update({'checkpoint.size': len(checkpoint.history['time']),
+                           'checkpoint.stroke_key': checkpoint.stroke_key,
+                           'checkpoint.run_key': checkpoint.run_key,
+                           'checkpoint.Y': checkpoint.Y})
+        cache_path = self.path(key)
+        temp_path = self.temp_path(cache_path)
+        try:
+            with open(str(temp_path), 'wb') as out_file:
+                np.savez(out_file, **arrays)
+            os.replace(str(temp_path), str(cache_path))
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        self.evict(keep=cache_path)
+
+
+simulation_cache = SimulationCache()
+"""`SimulationCache`: The cache used by `~uconnrcmpy.conditions.Condition.run_simulation`."""
+
 
 class Simulation(object):
     """Contains a single simulation of the experiment.
@@ -29,6 +285,59 @@ class Simulation(object):
         Time at which the simulation will be ended
     chem_file : `str`, optional
         String filename of the chemistry file to use
+    cti_source : `str`, optional
+        Contents of the chemistry file. If given, this is used instead
+        of ``chem_file``.
+    tabulated_velocity : `bool`, optional
+        If `True`, the velocity of the piston is given to Cantera as a
+        `cantera.Tabulated1` function from `VolumeProfile.tabulated`,
+        so the integrator does not call back into Python to evaluate
+        it. Requires Cantera 2.5 or newer. Cantera searches the table
+        linearly, so this is only faster for short volume traces (see
+        ``benchmarks/wall_velocity.py``).
+    record_properties : `list` of `str`, optional
+        Names of properties of the `cantera.Solution` to record at
+        every time step in addition to the temperature and pressure,
+        e.g., ``'Y'`` for the mass fractions or ``'heat_release_rate'``
+    step_control : `str`, optional
+        How the largest time step of the integrator is chosen. With
+        ``'fixed'``, it is the sampling interval of the volume trace for
+        the whole simulation. With ``'phased'``, the sampling interval
+        is only used while the volume is changing and after ignition
+        starts, and ``relaxed_time_step`` is used otherwise.
+    relaxed_time_step : `float`, optional
+        Largest time step of the integrator while the volume is not
+        changing, with ``step_control='phased'``
+    frozen_chemistry : `bool`, optional
+        If `True`, the nonreactive simulation is computed along the
+        isentrope of the initial mixture at the times of the volume
+        trace instead of by integrating a reactor. Only valid if
+        ``is_reactive`` is `False`.
+    multipliers : `dict`, optional
+        Multipliers of the rates of reactions, keyed by the index of
+        the reaction, applied after the reactions are switched off for a
+        nonreactive simulation
+    restart : `SimulationCheckpoint`, optional
+        Checkpoint from which the reactor is started instead of the
+        initial temperature and pressure at time zero. It must have the
+        same `stroke_key` as this simulation and contain the
+        ``record_properties``. Not valid with ``frozen_chemistry``.
+    checkpoint_time : `float`, optional
+        Time, in seconds, at which the state of the reactor is stored
+        in `checkpoint`, e.g., the end of compression
+    checkpoint_file : `str`, optional
+        File where the state of the reactor is written every
+        ``checkpoint_interval`` time steps. If the file contains a
+        checkpoint with the same `run_key` when the simulation starts,
+        the simulation is resumed from it, along with its `checkpoint`
+        if the ``checkpoint_time`` had passed. The file is removed when
+        the simulation finishes.
+    checkpoint_interval : `int`, optional
+        Number of time steps between writes of the ``checkpoint_file``
+    cache : `SimulationCache`, optional
+        Cache of the results of simulations. If it contains results
+        with the same `result_key`, they are loaded instead of running
+        the simulation, and otherwise the results are stored in it.
 
     Attributes
     ----------
@@ -52,10 +361,100 @@ class Simulation(object):
         The initial temperature of the simulation
     initial_pressure : `float`
         The initial pressure of the simulation
+    tabulated_velocity : `bool`
+        If the velocity of the piston is a `cantera.Tabulated1` function
+    record_properties : `tuple` of `str`
+        Names of the additional properties that are recorded
+    properties : `dict`
+        Arrays of the additional properties, keyed by their names, with
+        one row for each time step
+    step_control : `str`
+        How the largest time step of the integrator is chosen
+    relaxed_time_step : `float`
+        Largest time step of the integrator while the volume is not
+        changing, with ``step_control='phased'``
+    frozen_chemistry : `bool`
+        If the nonreactive simulation is computed along the isentrope
+    multipliers : `dict`
+        Multipliers of the rates of reactions, keyed by their index
+    restart : `SimulationCheckpoint` or `None`
+        Checkpoint from which the reactor was started
+    checkpoint_time : `float` or `None`
+        Time at which the state of the reactor is stored
+    checkpoint : `SimulationCheckpoint` or `None`
+        State of the reactor at the ``checkpoint_time``, or `None` if
+        the simulation ended before it
+    checkpoint_file : `str` or `None`
+        File where the state of the reactor is written
+    checkpoint_interval : `int`
+        Number of time steps between writes of the ``checkpoint_file``
+    stroke_key : `str`
+        Hash of the initial state, volume trace, and mechanism of the
+        simulation, from `stroke_key`
+    run_key : `str`
+        Hash of the ``stroke_key`` and the other parameters that change
+        the solution
+    result_key : `str`
+        Hash of the ``run_key``, the end conditions, the checkpoint from
+        which the simulation starts, and the version of Cantera, which
+        identifies the results in a `SimulationCache`
+    cached : `bool`
+        If the results were loaded from the ``cache``
+
+    Notes
+    -----
+    With ``step_control='phased'``, the volume is considered to be
+    changing when it would change by more than the fraction
+    `volume_tolerance` over one step of ``relaxed_time_step``, and the
+    time step is only relaxed if the volume does not change for at
+    least ``relaxed_time_step`` after the current time, so the
+    integrator cannot step over the start of the compression. During a
+    reactive simulation, ignition is considered to have started when
+    the temperature increases faster than `ignition_rate` while the
+    volume is not changing, after which the sampling interval is used
+    until the end of the simulation.
+
+    With ``frozen_chemistry=True``, no reactor is integrated. The wall
+    does not transfer heat and the composition does not change, so the
+    entropy of the mixture is constant and the state at each volume is
+    found from the `~uconnrcmpy.isentropes.IsentropeTable` at the
+    initial temperature. The volume of the reactor is linear in time
+    between the points of the volume trace, so the temperature at
+    those points is the same as from the reactor, up to the tolerance
+    of the table, and the maximum temperature is at one of them. The
+    simulation is sampled at the points of the volume trace before the
+    ``end_time``, and at the ``end_time``.
+
+    A simulation started from a ``restart`` checkpoint only applies its
+    ``multipliers`` after the checkpoint, so it is identical to a
+    simulation started at time zero only if the multipliers are the
+    same or the reactions are negligible before the checkpoint. A
+    simulation resumed from the ``checkpoint_file`` may take different
+    time steps after the checkpoint than one that was not interrupted,
+    because the integrator is restarted.
     """
 
+    volume_tolerance = 1.0E-4
+    """`float`: Relative change of the volume over one relaxed time step
+    above which the volume is considered to be changing"""
+
+    ignition_rate = 1.0E4
+    """`float`: Rate of increase of the temperature, in K/s, above which
+    ignition is considered to have started"""
+
     def __init__(self, initial_temperature, initial_pressure, volume, is_reactive,
-                 end_temp=2500., end_time=0.2, chem_file='species.cti', cti_source=None):
+                 end_temp=2500., end_time=0.2, chem_file='species.cti', cti_source=None,
+                 tabulated_velocity=False, record_properties=(), step_control='fixed',
+                 relaxed_time_step=1.0E-3, frozen_chemistry=False, multipliers=None,
+                 restart=None, checkpoint_time=None, checkpoint_file=None,
+                 checkpoint_interval=1000, cache=None):
+        if step_control not in ('fixed', 'phased'):
+            raise ValueError('step_control must be one of "fixed" or "phased", '
+                             'not {!r}'.format(step_control))
+        if frozen_chemistry and is_reactive:
+            raise ValueError('frozen_chemistry is only valid for nonreactive simulations')
+        if frozen_chemistry and restart is not None:
+            raise ValueError('restart is not valid with frozen_chemistry')
 
         if volume is None:
             volume = np.genfromtxt('volume.csv', delimiter=',')
@@ -63,56 +462,267 @@ class Simulation(object):
         inp_time = volume[:, 0]
         inp_vol = volume[:, 1]
 
-        self.time = []
-        self.temperature = []
-        self.pressure = []
         self.input_volume = volume
-        self.simulated_volume = []
         self.end_temp = end_temp
         self.end_time = end_time
         self.is_reactive = is_reactive
         self.chem_file = chem_file
         self.initial_temperature = initial_temperature
         self.initial_pressure = initial_pressure
+        self.tabulated_velocity = tabulated_velocity
+        self.record_properties = tuple(record_properties)
+        self.step_control = step_control
+        self.relaxed_time_step = relaxed_time_step
+        self.frozen_chemistry = frozen_chemistry
+        self.multipliers = dict(multipliers or {})
+        self.restart = restart
+        self.checkpoint_time = checkpoint_time
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint = None
+        self.stroke_key = stroke_key(initial_temperature, initial_pressure, volume, is_reactive,
+                                     chem_file, cti_source)
+        run_key = hashlib.sha1(self.stroke_key.encode('utf-8'))
+        run_key.update(repr((sorted(self.multipliers.items()), self.record_properties,
+                             tabulated_velocity, step_control,
+                             float(relaxed_time_step))).encode('utf-8'))
+        self.run_key = run_key.hexdigest()
+        result_key = hashlib.sha1(self.run_key.encode('utf-8'))
+        restart_key = None if restart is None else (restart.run_key, restart.time)
+        result_key.update(repr((float(end_temp), float(end_time), frozen_chemistry,
+                                checkpoint_time, restart_key, ct.__version__)).encode('utf-8'))
+        self.result_key = result_key.hexdigest()
 
-        if cti_source is None:
-            gas = ct.Solution(chem_file)
+        cached = cache.get(self.result_key) if cache is not None else None
+        self.cached = cached is not None
+        if self.cached:
+            results, self.checkpoint = cached
+        elif self.frozen_chemistry:
+            results = self.integrate_frozen(inp_time, inp_vol, chem_file, cti_source)
         else:
-            gas = ct.Solution(source=cti_source)
-        gas.TP = self.initial_temperature, self.initial_pressure
-        if not self.is_reactive:
-            gas.set_multiplier(0)
-        reac = ct.IdealGasReactor(gas)
-        env = ct.Reservoir(ct.Solution('air.xml'))
-        ct.Wall(reac, env, A=1.0, velocity=VolumeProfile(inp_time, inp_vol))
-        netw = ct.ReactorNet([reac])
-        netw.set_max_time_step(inp_time[1])
-        self.time.append(netw.time)
-        self.temperature.append(reac.T)
-        self.pressure.append(gas.P/1E5)
-        self.simulated_volume.append(reac.volume)
-
-        while reac.T < self.end_temp and netw.time < self.end_time:
-            netw.step()
-            self.time.append(netw.time)
-            self.temperature.append(reac.T)
-            self.pressure.append(gas.P/1E5)
-            self.simulated_volume.append(reac.volume)
-
-        self.time = np.array(self.time)
-        self.pressure = np.array(self.pressure)
-        self.temperature = np.array(self.temperature)
-        self.simulated_volume = np.array(self.simulated_volume)
+            results = self.integrate_reactor(inp_time, inp_vol, chem_file, cti_source)
+        if cache is not None and not self.cached:
+            cache.put(self.result_key, results, self.checkpoint)
+
+        self.time = results.pop('time')
+        self.pressure = results.pop('pressure')
+        self.temperature = results.pop('temperature')
+        self.simulated_volume = results.pop('simulated_volume')
+        self.properties = results
         self.derivative = self.calculate_derivative(self.pressure, self.time)
 
     def __repr__(self):
         return ('Simulation(initial_temperature={self.initial_temperature!r}, '
                 'initial_pressure={self.initial_pressure!r}, volume={self.input_volume!r}, '
                 'is_reactive={self.is_reactive!r}, end_temp={self.end_temp!r}, '
-                'end_time={self.end_time!r}, chem_file={self.chem_file!r})').format(
+                'end_time={self.end_time!r}, chem_file={self.chem_file!r}, '
+                'tabulated_velocity={self.tabulated_velocity!r}, '
+                'record_properties={self.record_properties!r}, '
+                'step_control={self.step_control!r}, '
+                'relaxed_time_step={self.relaxed_time_step!r}, '
+                'frozen_chemistry={self.frozen_chemistry!r}, '
+                'multipliers={self.multipliers!r}, restart={self.restart!r}, '
+                'checkpoint_time={self.checkpoint_time!r}, '
+                'checkpoint_file={self.checkpoint_file!r}, '
+                'checkpoint_interval={self.checkpoint_interval!r}, '
+                'cached={self.cached!r})').format(
                     self=self,
                 )
 
+    def integrate_reactor(self, inp_time, inp_vol, chem_file, cti_source=None):
+        """Integrate a Cantera reactor with the volume trace.
+
+        Parameters
+        ----------
+        inp_time : `numpy.ndarray`
+            Time of the volume trace
+        inp_vol : `numpy.ndarray`
+            Volume of the volume trace
+        chem_file : `str`
+            String filename of the chemistry file to use
+        cti_source : `str`, optional
+            Contents of the chemistry file. If given, this is used
+            instead of ``chem_file``.
+
+        Returns
+        -------
+        `dict`
+            Arrays of the ``time``, ``temperature``, ``pressure``,
+            ``simulated_volume``, and the ``record_properties`` at every
+            time step of the integrator
+        """
+        profile = VolumeProfile(inp_time, inp_vol)
+        velocity = profile.tabulated() if self.tabulated_velocity else profile
+        sampling_time_step = inp_time[1]
+        if self.step_control == 'phased':
+            profile_time = inp_time.tolist()
+            change_times = profile.change_times(
+                self.volume_tolerance/self.relaxed_time_step).tolist()
+
+        restart = self.restart
+        if self.checkpoint_file is not None and os.path.exists(self.checkpoint_file):
+            saved = SimulationCheckpoint.load(self.checkpoint_file)
+            if saved.run_key == self.run_key:
+                print('Resuming the simulation from {} at {} s'.format(
+                    self.checkpoint_file, saved.time))
+                restart = saved
+        if restart is not None:
+            if restart.stroke_key != self.stroke_key:
+                raise ValueError('The checkpoint is from a simulation with a different initial '
+                                 'state, volume trace, mechanism, or is_reactive')
+            missing = set(self.record_properties) - set(restart.history)
+            if missing:
+                raise ValueError('The checkpoint does not contain the recorded properties '
+                                 '{}'.format(sorted(missing)))
+
+        # The Solutions are only used by the reactor network during the
+        # integration, so they are returned to the pool afterwards
+        with solution_pool.checkout(chem_file, cti_source) as gas, \
+                solution_pool.checkout('air.xml') as air:
+            if not self.is_reactive:
+                gas.set_multiplier(0)
+            for index, multiplier in self.multipliers.items():
+                gas.set_multiplier(multiplier, index)
+            if restart is None:
+                gas.TP = self.initial_temperature, self.initial_pressure
+                reac = ct.IdealGasReactor(gas)
+            else:
+                gas.TPY = restart.temperature, restart.pressure*1E5, restart.Y
+                reac = ct.IdealGasReactor(gas, volume=restart.volume)
+            env = ct.Reservoir(air)
+            ct.Wall(reac, env, A=1.0, velocity=velocity)
+            netw = ct.ReactorNet([reac])
+            if restart is not None:
+                netw.set_initial_time(restart.time)
+            netw.set_max_time_step(sampling_time_step)
+            max_time_step = sampling_time_step
+            igniting = False
+
+            def sample():
+                values = {name: getattr(gas, name) for name in self.record_properties}
+                values.update(time=netw.time, temperature=reac.T, pressure=gas.P/1E5,
+                              simulated_volume=reac.volume)
+                return values
+
+            def save_state():
+                history = {name: recorder[name].copy() for name in recorder.buffers}
+                return SimulationCheckpoint(self.stroke_key, self.run_key, history, gas.Y,
+                                            self.checkpoint)
+
+            initial_values = sample()
+            recorder = Recorder({name: np.shape(value) for name, value in initial_values.items()})
+            if restart is None:
+                recorder.append(**initial_values)
+            else:
+                recorder.extend(**{name: restart.history[name] for name in initial_values})
+                if restart.time == self.checkpoint_time:
+                    self.checkpoint = restart
+                elif (restart.captured is not None and
+                        restart.captured.time == self.checkpoint_time):
+                    self.checkpoint = restart.captured
+
+            capture = self.checkpoint_time is not None and netw.time < self.checkpoint_time
+            n_steps = 0
+            while reac.T < self.end_temp and netw.time < self.end_time:
+                prev_time, prev_temp = netw.time, reac.T
+                if capture and netw.time + max_time_step >= self.checkpoint_time:
+                    netw.advance(self.checkpoint_time)
+                    recorder.append(**sample())
+                    self.checkpoint = save_state()
+                    capture = False
+                else:
+                    netw.step()
+                    recorder.append(**sample())
+
+                if self.step_control == 'phased' and not igniting:
+                    index = max(bisect_right(profile_time, netw.time) - 1, 0)
+                    quiet = change_times[index] > netw.time + self.relaxed_time_step
+                    if quiet and self.is_reactive:
+                        temp_rate = (reac.T - prev_temp)/(netw.time - prev_time)
+                        igniting = temp_rate > self.ignition_rate
+                    new_time_step = self.relaxed_time_step if quiet and not igniting \
+                        else sampling_time_step
+                    if new_time_step != max_time_step:
+                        netw.set_max_time_step(new_time_step)
+                        max_time_step = new_time_step
+
+                n_steps += 1
+                if self.checkpoint_file is not None and n_steps % self.checkpoint_interval == 0:
+                    save_state().save(self.checkpoint_file)
+
+        if self.checkpoint_file is not None and os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+        return recorder.to_arrays()
+
+    def integrate_frozen(self, inp_time, inp_vol, chem_file, cti_source=None):
+        """Compute the nonreactive simulation along the isentrope.
+
+        Parameters
+        ----------
+        inp_time : `numpy.ndarray`
+            Time of the volume trace
+        inp_vol : `numpy.ndarray`
+            Volume of the volume trace
+        chem_file : `str`
+            String filename of the chemistry file to use
+        cti_source : `str`, optional
+            Contents of the chemistry file. If given, this is used
+            instead of ``chem_file``.
+
+        Returns
+        -------
+        `dict`
+            Arrays of the ``time``, ``temperature``, ``pressure``,
+            ``simulated_volume``, and the ``record_properties`` at the
+            points of the volume trace before the ``end_time``, and at
+            the ``end_time``
+        """
+        time = np.append(inp_time[inp_time < self.end_time], self.end_time)
+        # The reactor starts with a unit volume and its volume is
+        # constant after the end of the volume trace
+        volume = np.interp(time, inp_time, inp_vol)/inp_vol[0]
+
+        table = get_isentrope_table(self.initial_temperature, chem_file, cti_source)
+        pressure = table.pressure(volume, 1.0, self.initial_temperature, self.initial_pressure)
+        temperature = table.temperature(pressure, self.initial_temperature,
+                                        self.initial_pressure)
+        hot = np.nonzero(temperature >= self.end_temp)[0]
+        if len(hot) > 0:
+            end = hot[0] + 1
+            time, volume = time[:end], volume[:end]
+            pressure, temperature = pressure[:end], temperature[:end]
+
+        results = {'time': time, 'temperature': temperature, 'pressure': pressure/1E5,
+                   'simulated_volume': volume}
+        if self.record_properties:
+            with solution_pool.checkout(chem_file, cti_source) as gas:
+                recorder = Recorder({name: np.shape(getattr(gas, name))
+                                     for name in self.record_properties})
+                for T, P in zip(temperature, pressure):
+                    gas.TP = T, P
+                    recorder.append(**{name: getattr(gas, name)
+                                       for name in self.record_properties})
+            results.update(recorder.to_arrays())
+        return results
+
+    def ignition_delay(self, compression_time=0.0):
+        """Find the ignition delay from the pressure derivative.
+
+        Parameters
+        ----------
+        compression_time : `float`, optional
+            Time of the end of compression, in ms
+
+        Returns
+        -------
+        `float`
+            Time of the maximum of the derivative of the pressure after
+            the end of compression, in ms
+        """
+        ignition_idx = np.argmax(self.derivative)
+        return self.time[ignition_idx]*1000 - compression_time
+
     def calculate_derivative(self, dep_var, indep_var):
         """Calculate the derivative.
 
@@ -130,25 +740,14 @@ class Simulation(object):
 
         Notes
         -----
-        The derivative is calculated by computing the first-order
+        The derivative is calculated by computing the second-order
         Lagrange polynomial fit to the point under consideration and
-        its nearest neighbors. The Lagrange polynomial is used because
-        of the unequal spacing of the simulated data.
+        its nearest neighbors, with one-sided fits at the first and last
+        points. The Lagrange polynomial is used because of the unequal
+        spacing of the simulated data. See
+        `~uconnrcmpy.derivatives.nonuniform_derivative`.
         """
-        m = len(dep_var)
-        ddt = np.zeros(m)
-        for i in range(1, m-2):
-            x = indep_var[i]
-            x_min = indep_var[i-1]
-            x_plu = indep_var[i+1]
-            y = dep_var[i]
-            y_min = dep_var[i-1]
-            y_plu = dep_var[i+1]
-            ddt[i] = (y_min*(x - x_plu)/((x_min - x)*(x_min - x_plu)) +
-                      y*(2*x - x_min - x_plu)/((x - x_min)*(x - x_plu)) +
-                      y_plu*(x - x_min)/((x_plu - x_min)*(x_plu - x)))
-
-        return ddt
+        return nonuniform_derivative(dep_var, indep_var)
 
 
 class VolumeProfile(object):
@@ -194,12 +793,62 @@ class VolumeProfile(object):
         self.velocity = np.diff(self.volume)/np.diff(self.time)
         self.velocity = np.append(self.velocity, 0)
 
+        # The integrator calls this object with Python floats, for
+        # which indexing lists is much faster than indexing arrays
+        self._time_list = self.time.tolist()
+        self._velocity_list = self.velocity.tolist()
+        self._end_time = self._time_list[-1]
+        self._index = 0
+
     def __repr__(self):
         return ('VolumeProfile(time={self.time!r}, volume={self.volume!r}, '
                 'velocity={self.velocity!r}').format(
                     self=self,
                 )
 
+    def tabulated(self):
+        """Tabulate the velocity in a function evaluated by Cantera.
+
+        Returns
+        -------
+        `cantera.Tabulated1`
+            Piecewise constant function of the time whose value is the
+            velocity at the last element of the time array that is less
+            than or equal to the time, so it is evaluated in compiled
+            code without calling back into Python
+
+        Notes
+        -----
+        The function matches calling this object, except that the value
+        exactly at an element of the time array is the velocity of the
+        previous interval, and the value before the first element is
+        the first velocity instead of zero. The integrator does not
+        depend on the value at single points, and simulations start at
+        the first element of the time array.
+        """
+        return ct.Tabulated1(self.time, self.velocity, method='previous')
+
+    def change_times(self, rate_tolerance):
+        """Find the next time at which the volume is changing.
+
+        Parameters
+        ----------
+        rate_tolerance : `float`
+            Relative rate of change of the volume, in 1/s, above which
+            the volume is considered to be changing
+
+        Returns
+        -------
+        `numpy.ndarray`
+            1-D array containing, for each element of the time array,
+            the first element of the time array at or after it where
+            the volume is changing, or infinity if the volume does not
+            change after it
+        """
+        changing = np.abs(self.velocity) > rate_tolerance*self.volume
+        times = np.where(changing, self.time, np.inf)
+        return np.minimum.accumulate(times[::-1])[::-1]
+
     def __call__(self, t):
         """Return the velocity when called during a time step.
 
@@ -207,15 +856,130 @@ class VolumeProfile(object):
         ----------
         t : `float`
             Current simulation time.
-        """
 
-        if t < self.time[-1]:
-            # prev_time_point is the previous value in the time array
-            # after the current simulation time
-            prev_time_point = self.time[self.time <= t][-1]
-            # index is the index of the time array where
-            # prev_time_point occurs
-            index = np.where(self.time == prev_time_point)[0][0]
-            return self.velocity[index]
-        else:
+        Notes
+        -----
+        The velocity is the value at the last element of the time array
+        that is less than or equal to ``t``. The integrator calls this
+        function with times close to the previous call, so the interval
+        found by the previous call and the next interval are checked
+        first, and the interval is only searched for by bisection if
+        ``t`` is in neither of them. The velocity is zero before the
+        first and after the last element of the time array.
+        """
+        if t >= self._end_time:
+            return 0
+        time = self._time_list
+        index = self._index
+        if time[index] <= t:
+            if t < time[index + 1]:
+                return self._velocity_list[index]
+            if t < time[index + 2]:
+                self._index = index + 1
+                return self._velocity_list[index + 1]
+        elif t < time[0]:
             return 0
+
+        # index is the index of the last element of the time array that
+        # is less than or equal to the current simulation time
+        index = bisect_right(time, t) - 1
+        self._index = index
+        return self._velocity_list[index]
+
+
+class Recorder(object):
+    """Record samples of several variables in growing NumPy arrays.
+
+    Each variable is stored in a preallocated array whose capacity is
+    doubled when it is full, so appending a sample takes constant time
+    on average and the samples are never stored as Python objects.
+
+    Parameters
+    ----------
+    shapes : `dict`
+        Shape of one sample of each variable, keyed by the name of the
+        variable. The shape of a scalar variable is ``()``.
+    capacity : `int`, optional
+        Number of samples for which space is allocated initially
+
+    Attributes
+    ----------
+    buffers : `dict`
+        Arrays where the samples of each variable are stored, keyed by
+        the name of the variable. Only the first ``len(recorder)``
+        samples are valid.
+    """
+
+    def __init__(self, shapes, capacity=1024):
+        self.buffers = {name: np.empty((capacity,) + tuple(shape))
+                        for name, shape in shapes.items()}
+        self.capacity = capacity
+        self.size = 0
+
+    def __repr__(self):
+        return 'Recorder(variables={}, size={})'.format(sorted(self.buffers), self.size)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.buffers[name][:self.size]
+
+    def reserve(self, size):
+        """Make room for at least ``size`` samples.
+
+        Parameters
+        ----------
+        size : `int`
+            Number of samples that must fit in the buffers
+        """
+        if size <= self.capacity:
+            return
+        while self.capacity < size:
+            self.capacity *= 2
+        for name, buffer in self.buffers.items():
+            grown = np.empty((self.capacity,) + buffer.shape[1:])
+            grown[:self.size] = buffer[:self.size]
+            self.buffers[name] = grown
+
+    def append(self, **values):
+        """Append one sample of every variable.
+
+        Parameters
+        ----------
+        values
+            Value of each variable, passed as a keyword argument with
+            the name of the variable
+        """
+        if self.size == self.capacity:
+            self.reserve(self.size + 1)
+        for name, buffer in self.buffers.items():
+            buffer[self.size] = values[name]
+        self.size += 1
+
+    def extend(self, **values):
+        """Append several samples of every variable.
+
+        Parameters
+        ----------
+        values
+            Array of the samples of each variable, with one row for each
+            sample, passed as a keyword argument with the name of the
+            variable
+        """
+        n_samples = len(next(iter(values.values())))
+        self.reserve(self.size + n_samples)
+        for name, buffer in self.buffers.items():
+            buffer[self.size:self.size + n_samples] = values[name]
+        self.size += n_samples
+
+    def to_arrays(self):
+        """Copy the recorded samples into arrays of the recorded length.
+
+        Returns
+        -------
+        `dict`
+            Arrays of the samples of each variable, keyed by the name of
+            the variable, with one row for each sample
+        """
+        return {name: buffer[:self.size].copy() for name, buffer in self.buffers.items()}
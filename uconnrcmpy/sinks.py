@@ -0,0 +1,342 @@
+"""Destinations for the results of processed experiments"""
+
+# System imports
+import abc
+from collections import OrderedDict
+import csv
+import json
+import os
+from pathlib import Path
+import sqlite3
+
+# Third-party imports
+from pyperclip import copy
+
+
+def plain(value):
+    """Convert a NumPy scalar to the equivalent Python object.
+
+    Parameters
+    ----------
+    value
+        Value of a column of a record
+
+    Returns
+    -------
+    The value as a Python `int`, `float`, or `str`, which can be
+    written by the `json` and `sqlite3` modules
+    """
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+class ResultsSink(abc.ABC):
+    """Destination to which records of results are written one at a time.
+
+    A record is an ordered mapping of the names of the columns to their
+    values. Records written for a file of experimental data also have
+    the `manifest_columns`, which identify the contents of the file and
+    the parameters with which it was processed, so a sink that keeps
+    its records can tell which files do not have to be processed again.
+
+    Sinks are context managers that `close` themselves on exit.
+    Subclasses implement `write`, and sinks that keep their records
+    also implement `records` and set `keeps_records`.
+    """
+
+    manifest_columns = ('path', 'file_hash', 'parameters')
+    """`tuple` of `str`: Columns that identify the input of a record"""
+
+    keeps_records = False
+    """`bool`: True if the records can be read back with `records`, so
+    the `manifest_columns` are worth computing"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @abc.abstractmethod
+    def write(self, record):
+        """Write one record.
+
+        Parameters
+        ----------
+        record : `collections.OrderedDict`
+            Values of the columns of the record, keyed by their names
+        """
+
+    def records(self):
+        """Read the records that were written to this sink.
+
+        Returns
+        -------
+        `list` of `dict`
+            The records, in the order in which they were written
+        """
+        return []
+
+    def manifest(self):
+        """Find the inputs of the records that were written to this sink.
+
+        Returns
+        -------
+        `set` of `tuple`
+            The ``file_hash`` and ``parameters`` of each record that has
+            them
+        """
+        return {(record['file_hash'], record['parameters']) for record in self.records()
+                if record.get('file_hash') and record.get('parameters')}
+
+    def close(self):
+        """Finish writing the records."""
+        pass
+
+
+class ClipboardSink(ResultsSink):
+    """Copy the records to the clipboard as a table.
+
+    The records are copied when the sink is closed, as tab-separated
+    rows sorted as text, without the `manifest_columns`, so the table
+    can be pasted to a spreadsheet. Nothing is kept between runs.
+    """
+    def __init__(self):
+        self.rows = []
+
+    def __repr__(self):
+        return 'ClipboardSink(rows={})'.format(len(self.rows))
+
+    def write(self, record):
+        self.rows.append('\t'.join(str(value) for name, value in record.items()
+                                   if name not in self.manifest_columns))
+
+    def close(self):
+        copy('\n'.join(sorted(self.rows)))
+
+
+class CSVSink(ResultsSink):
+    """Append the records to a CSV file.
+
+    The first row of the file holds the names of the columns, which are
+    taken from the first record that is written to a new file. Each
+    record is flushed to the file as soon as it is written.
+
+    Parameters
+    ----------
+    filename : `str` or `pathlib.Path`
+        Name of the CSV file
+
+    Raises
+    ------
+    ValueError
+        If a record does not have the same columns as the file
+    """
+
+    keeps_records = True
+
+    def __init__(self, filename):
+        self.filename = str(filename)
+        self.columns = None
+        if os.path.exists(self.filename):
+            with open(self.filename, 'r', newline='') as in_file:
+                self.columns = next(csv.reader(in_file), None)
+        self.out_file = None
+
+    def __repr__(self):
+        return 'CSVSink(filename={self.filename!r})'.format(self=self)
+
+    def write(self, record):
+        if self.out_file is None:
+            self.out_file = open(self.filename, 'a', newline='')
+        writer = csv.writer(self.out_file)
+        if self.columns is None:
+            self.columns = list(record)
+            writer.writerow(self.columns)
+        if set(record) != set(self.columns):
+            raise ValueError('The record has the columns {} but {} has the columns {}'.format(
+                list(record), self.filename, self.columns))
+        writer.writerow([plain(record[name]) for name in self.columns])
+        self.out_file.flush()
+
+    def records(self):
+        if not os.path.exists(self.filename):
+            return []
+        with open(self.filename, 'r', newline='') as in_file:
+            return list(csv.DictReader(in_file))
+
+    def close(self):
+        if self.out_file is not None:
+            self.out_file.close()
+            self.out_file = None
+
+
+class JSONLinesSink(ResultsSink):
+    """Append the records to a JSON Lines file.
+
+    Each record is written as a JSON object on its own line and flushed
+    to the file as soon as it is written.
+
+    Parameters
+    ----------
+    filename : `str` or `pathlib.Path`
+        Name of the JSON Lines file
+    """
+
+    keeps_records = True
+
+    def __init__(self, filename):
+        self.filename = str(filename)
+        self.out_file = None
+
+    def __repr__(self):
+        return 'JSONLinesSink(filename={self.filename!r})'.format(self=self)
+
+    def write(self, record):
+        if self.out_file is None:
+            self.out_file = open(self.filename, 'a')
+        values = OrderedDict((name, plain(value)) for name, value in record.items())
+        self.out_file.write(json.dumps(values) + '\n')
+        self.out_file.flush()
+
+    def records(self):
+        if not os.path.exists(self.filename):
+            return []
+        with open(self.filename, 'r') as in_file:
+            return [json.loads(line) for line in in_file if line.strip()]
+
+    def close(self):
+        if self.out_file is not None:
+            self.out_file.close()
+            self.out_file = None
+
+
+class SQLiteSink(ResultsSink):
+    """Insert the records into a table of an SQLite database.
+
+    The table is created with the columns of the first record, and
+    columns are added when a record has new ones. Each record is
+    committed as soon as it is written.
+
+    Parameters
+    ----------
+    filename : `str` or `pathlib.Path`
+        Name of the database file
+    table : `str`, optional
+        Name of the table
+    """
+
+    keeps_records = True
+
+    def __init__(self, filename, table='results'):
+        self.filename = str(filename)
+        self.table = table
+        self.connection = None
+
+    def __repr__(self):
+        return 'SQLiteSink(filename={self.filename!r}, table={self.table!r})'.format(self=self)
+
+    def connect(self):
+        """Open the database if it is not open.
+
+        Returns
+        -------
+        `sqlite3.Connection`
+            The connection to the database
+        """
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.filename)
+        return self.connection
+
+    def columns(self):
+        """Find the columns of the table.
+
+        Returns
+        -------
+        `list` of `str`
+            Names of the columns, which is empty if the table does not
+            exist
+        """
+        cursor = self.connect().execute('PRAGMA table_info({})'.format(quote(self.table)))
+        return [row[1] for row in cursor]
+
+    def write(self, record):
+        connection = self.connect()
+        columns = self.columns()
+        if not columns:
+            connection.execute('CREATE TABLE {} ({})'.format(
+                quote(self.table), ', '.join(quote(name) for name in record)))
+        else:
+            for name in record:
+                if name not in columns:
+                    connection.execute('ALTER TABLE {} ADD COLUMN {}'.format(
+                        quote(self.table), quote(name)))
+        connection.execute('INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(self.table), ', '.join(quote(name) for name in record),
+            ', '.join('?' for _ in record)), [plain(value) for value in record.values()])
+        connection.commit()
+
+    def records(self):
+        if not os.path.exists(self.filename) or not self.columns():
+            return []
+        cursor = self.connect().execute('SELECT * FROM {} ORDER BY rowid'.format(
+            quote(self.table)))
+        names = [description[0] for description in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def quote(name):
+    """Quote an identifier for SQLite.
+
+    Parameters
+    ----------
+    name : `str`
+        Name of a table or column
+
+    Returns
+    -------
+    `str`
+        The name in double quotes, with the double quotes in it doubled
+    """
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def open_sink(sink=None):
+    """Find the sink for a destination of results.
+
+    Parameters
+    ----------
+    sink : `ResultsSink`, `str`, or `pathlib.Path`, optional
+        The sink itself, or the name of a file whose extension selects
+        the sink: ``.csv`` for `CSVSink`, ``.jsonl`` for
+        `JSONLinesSink`, and ``.db``, ``.sqlite``, or ``.sqlite3`` for
+        `SQLiteSink`. If not given, a `ClipboardSink` is used.
+
+    Returns
+    -------
+    `ResultsSink`
+        The sink
+
+    Raises
+    ------
+    ValueError
+        If the extension of the file is not recognized
+    """
+    if sink is None:
+        return ClipboardSink()
+    if isinstance(sink, ResultsSink):
+        return sink
+    suffix = Path(str(sink)).suffix.lower()
+    if suffix == '.csv':
+        return CSVSink(sink)
+    elif suffix == '.jsonl':
+        return JSONLinesSink(sink)
+    elif suffix in ('.db', '.sqlite', '.sqlite3'):
+        return SQLiteSink(sink)
+    raise ValueError('Unknown type of results file: {}'.format(sink))
@@ -0,0 +1,138 @@
+"""Pool of Cantera Solution objects shared within a process"""
+
+# System imports
+from contextlib import contextmanager
+import os
+import threading
+
+# Third-party imports
+import cantera as ct
+
+# Local imports
+from .mechanisms import mechanism_hash, load_path
+
+
+class SolutionPool(object):
+    """Pool of `cantera.Solution` objects keyed by the mechanism.
+
+    Parsing a detailed mechanism takes much longer than resetting the
+    state of an existing `cantera.Solution`, so objects are kept after
+    they are used and handed out again to the next user of the same
+    mechanism.
+
+    Attributes
+    ----------
+    idle : `dict`
+        Lists of the `cantera.Solution` objects that are not checked
+        out, with their initial states, keyed by the hash of the
+        mechanism
+
+    Notes
+    -----
+    A `cantera.Solution` is checked out by exactly one user at a time,
+    so objects are never shared by two threads, and a new object is
+    created if all of the objects for a mechanism are checked out.
+    Objects created by a parent process are discarded in a forked
+    child process, so each process parses its own mechanisms.
+    """
+    def __init__(self):
+        self.reset()
+        self.file_hashes = {}
+
+    def __repr__(self):
+        return 'SolutionPool(mechanisms={})'.format(len(self.idle))
+
+    def reset(self):
+        """Discard all of the idle `cantera.Solution` objects."""
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.idle = {}
+
+    def key(self, chem_file='species.cti', cti_source=None):
+        """Find the key of a mechanism in the pool.
+
+        The hash of a chemistry file is stored with its size and
+        modification time, so the file is only read again after it
+        changes.
+
+        Parameters
+        ----------
+        chem_file : `str` or `pathlib.Path`, optional
+            Filename of the chemistry file
+        cti_source : `str`, optional
+            Contents of the chemistry file. If given, this is used
+            instead of ``chem_file``.
+
+        Returns
+        -------
+        `str`
+            The hash of the mechanism
+        """
+        if cti_source is not None:
+            return mechanism_hash(cti_source=cti_source)
+        try:
+            stat = os.stat(str(chem_file))
+        except OSError:
+            return mechanism_hash(chem_file)
+        file_key = (os.path.abspath(str(chem_file)), stat.st_size, stat.st_mtime_ns)
+        if file_key not in self.file_hashes:
+            self.file_hashes[file_key] = mechanism_hash(chem_file)
+        return self.file_hashes[file_key]
+
+    @contextmanager
+    def checkout(self, chem_file='species.cti', cti_source=None):
+        """Check out a `cantera.Solution` for a mechanism.
+
+        Use as a context manager; the object is returned to the pool
+        when the ``with`` block exits and must not be used after that.
+
+        Parameters
+        ----------
+        chem_file : `str` or `pathlib.Path`, optional
+            Filename of the chemistry file
+        cti_source : `str`, optional
+            Contents of the chemistry file. If given, this is used
+            instead of ``chem_file``.
+
+        Yields
+        ------
+        `cantera.Solution`
+            The solution, set to the temperature, pressure, and
+            composition given in the chemistry file with all the
+            reaction rate multipliers equal to one
+        """
+        key = self.key(chem_file, cti_source)
+        with self.lock:
+            if os.getpid() != self.pid:
+                self.reset()
+            idle = self.idle.setdefault(key, [])
+            entry = idle.pop() if idle else None
+
+        if entry is None:
+            converted_file = load_path(chem_file, cti_source)
+            if converted_file is not None:
+                gas = ct.Solution(converted_file)
+            elif cti_source is None:
+                gas = ct.Solution(str(chem_file))
+            else:
+                gas = ct.Solution(source=cti_source)
+            entry = (gas, gas.TPY)
+
+        gas, initial_state = entry
+        gas.TPY = initial_state
+        if gas.n_reactions > 0:
+            gas.set_multiplier(1.0)
+        try:
+            yield gas
+        finally:
+            with self.lock:
+                if os.getpid() == self.pid:
+                    self.idle.setdefault(key, []).append(entry)
+
+
+solution_pool = SolutionPool()
+"""`SolutionPool`: The pool shared by all of UConnRCMPy in this process."""
+
+if hasattr(os, 'register_at_fork'):
+    # The lock may be held by another thread at the time of the fork
+    os.register_at_fork(after_in_child=solution_pool.reset)
@@ -0,0 +1,36 @@
+"""
+Fixtures shared by the test modules
+"""
+import os
+
+import numpy as np
+import pytest
+from ..constants import one_atm_in_bar, one_atm_in_torr
+from ..readers import parse_trace
+
+
+@pytest.fixture(scope='session')
+def alt_files(tmpdir_factory):
+    """Pressure traces in the format of AltExperiment, made from the voltage traces"""
+    datadir = os.path.dirname(__file__)
+    altdir = tmpdir_factory.mktemp('alt')
+    names = {
+        '00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt':
+            'Fuel_MF_EqRatio_1.00_PercentAr_0_PercentN2_79_00_in_00_mm_333K_1146torr-'
+            '21-Jul-15-1226_Endplug_HC.txt',
+        'NR_00_in_00_mm_333K-1137t-100x-21-Jul-15-1251.txt':
+            'Fuel_MF_EqRatio_1.00_PercentAr_0_PercentN2_79_NR_00_in_00_mm_333K_1137torr-'
+            '21-Jul-15-1251_Endplug_HC.txt',
+    }
+    files = {}
+    for voltage_name, alt_name in names.items():
+        signal = parse_trace(os.path.join(datadir, voltage_name))
+        pin = int(voltage_name.split('K-')[1].split('t-')[0])
+        pressure = (signal[:, 1] - signal[0, 1])*100 + pin*one_atm_in_bar/one_atm_in_torr
+        alt_file = str(altdir.join(alt_name))
+        np.savetxt(alt_file, np.column_stack((signal[:, 0], pressure)), fmt='%.6f',
+                   delimiter='\t')
+        key = 'nonrfile' if voltage_name.startswith('NR_') else 'reacfile'
+        files[key] = alt_file
+    files['cti_file'] = os.path.join(datadir, 'species.cti')
+    return files
@@ -0,0 +1,70 @@
+"""
+Test module for the catalogs module
+"""
+from datetime import datetime
+import os
+import shutil
+import pytest
+from ..catalogs import ExperimentCatalog, file_metadata
+
+reacfile = '00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt'
+
+
+def test_file_metadata():
+    metadata = file_metadata('NR_05_in_02_mm_343K-1200t-100x-21-Jul-15-1251.txt')
+    assert not metadata['reactive']
+    assert metadata['date'] == '2015-07-21 12:51'
+    assert metadata['time_of_day'] == '1251'
+    assert (metadata['Tin'], metadata['pin'], metadata['spacers'], metadata['shims']) == \
+        (343, 1200, 0.5, 2)
+    metadata = file_metadata('Fuel_MF_EqRatio_1.00_PercentAr_0_PercentN2_79_05_in_02_mm_'
+                             '343K_1200torr-21-Jul-15-1251_Endplug_HC.txt')
+    assert metadata['kind'] == 'AltExperiment'
+    assert metadata['fuel'] == 'MF'
+    assert metadata['reactive']
+    assert metadata['factor'] is None
+    assert metadata['pin'] == 1200
+
+
+def test_query(tmpdir):
+    names = ['00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt',
+             '00_in_00_mm_333K-1250t-100x-22-Jul-15-1226.txt',
+             '05_in_00_mm_343K-1150t-100x-23-Jul-15-1226.txt',
+             'NR_00_in_00_mm_333K-1180t-100x-24-Jul-15-1226.txt',
+             'bad.txt']
+    catalog = ExperimentCatalog(str(tmpdir.join('catalog.db')))
+    failures = catalog.add_files([tmpdir.join(name) for name in names])
+    assert list(failures) == [tmpdir.join('bad.txt')]
+    assert len(catalog) == 4
+
+    rows = catalog.query(reactive=True, Tin=333, pin=(1100, 1200))
+    assert [os.path.basename(row['path']) for row in rows] == [names[0]]
+    rows = catalog.query(Tin=333, pin=(1100, 1200))
+    assert [os.path.basename(row['path']) for row in rows] == [names[0], names[3]]
+    rows = catalog.query(date=(datetime(2015, 7, 22), None))
+    assert len(rows) == 3
+    assert len(catalog.query(spacers=0.5, processed=False)) == 1
+    assert catalog.query(processed=True) == []
+    with pytest.raises(ValueError):
+        catalog.query(Tout=333)
+
+    plan = catalog.connection.execute(
+        'EXPLAIN QUERY PLAN SELECT * FROM experiments WHERE pin >= 1100 AND pin <= 1200')
+    assert 'experiments_pin' in ' '.join(str(row) for row in plan)
+    assert catalog.remove_missing() == 4
+    catalog.close()
+
+
+def test_scan(tmpdir):
+    datadir = os.path.dirname(__file__)
+    cti_file = os.path.join(datadir, 'species.cti')
+    shutil.copy(os.path.join(datadir, reacfile), str(tmpdir.join(reacfile)))
+    filename = str(tmpdir.join('catalog.db'))
+    with ExperimentCatalog(filename) as catalog:
+        assert catalog.scan(cti_file, str(tmpdir)) == {}
+    with ExperimentCatalog(filename) as catalog:
+        row, = catalog.query(reactive=True, Tin=333, pin=1146)
+        assert row['ignition_delay'] > 0
+        assert row['T_EOC'] > 333
+        assert row['file_hash'] is not None
+        assert catalog.manifest() == {(row['file_hash'], row['parameters'])}
@@ -2,9 +2,22 @@
 Test module for the conditions module
 """
 import pytest
+from types import SimpleNamespace
 from unittest import mock
 import os
-from ..conditions import Condition
+import shutil
+from pathlib import Path
+import numpy as np
+import cantera as ct
+from ..conditions import (AltCondition,
+                          Condition,
+                          group_files,
+                          process_files,
+                          process_folder,
+                          scan_conditions,
+                          )
+from ..simulations import SimulationCache
+from ..sinks import CSVSink
 
 
 class TestCondition(object):
@@ -27,3 +40,172 @@ class TestCondition(object):
         c = Condition(cti_file=cti_file, plotting=False)
         c.add_experiment(reacfile, copy=False)
         c.add_experiment(nonrfile, copy=False)
+
+    def test_run_simulation_overwrite_policy(self, capsys):
+        cti_file = os.path.join(os.path.dirname(__file__), 'species.cti')
+        c = Condition(cti_file=cti_file, plotting=False)
+        c.nonreactive_sim = nonreactive_sim = object()
+        c.reactive_sim = reactive_sim = object()
+        with mock.patch('builtins.input', side_effect=AssertionError('Prompted for input')):
+            c.run_simulation(run_reactive=True, run_nonreactive=True)
+        assert c.nonreactive_sim is nonreactive_sim
+        assert c.reactive_sim is reactive_sim
+        assert 'Nothing was done' in capsys.readouterr().out
+        with pytest.raises(RuntimeError):
+            c.run_simulation(run_nonreactive=True, overwrite='error')
+        with pytest.raises(ValueError):
+            c.run_simulation(overwrite='ask')
+
+    @pytest.mark.skipif(not hasattr(ct.ReactorNet, 'set_max_time_step') or
+                        not hasattr(ct.ReactorNet, 'set_initial_time'),
+                        reason='Requires the ReactorNet methods of Cantera 2.x')
+    def test_run_simulation_parallel(self, tmpdir, monkeypatch):
+        cti_file = os.path.join(os.path.dirname(__file__), 'h2o2.cti')
+        time = np.linspace(0, 0.06, 601)
+        stroke = np.clip((time - 0.01)/0.03, 0, 1)
+        volume = 1.0 - (1.0 - 1.0/8.0)*(1.0 - np.cos(np.pi*stroke))/2.0
+
+        def run(parallel, cache):
+            monkeypatch.setattr('uconnrcmpy.conditions.simulation_cache', cache)
+            c = Condition(cti_file=cti_file, plotting=False)
+            c.reactive_case = SimpleNamespace(experiment_parameters={'Tin': 320.0},
+                                              compression_time=40.0)
+            c.volout = np.column_stack((time, volume))
+            c.presout = np.array([[0.0, 1.0]])
+            c.run_simulation(run_reactive=True, end_time=0.06, parallel=parallel)
+            return c
+
+        serial = run(False, SimulationCache(str(tmpdir.join('serial'))))
+        parallel_cache = SimulationCache(str(tmpdir.join('parallel')))
+        for cached in (False, True):
+            parallel = run(True, parallel_cache)
+            for attribute in ('nonreactive_sim', 'reactive_sim'):
+                expected, sim = getattr(serial, attribute), getattr(parallel, attribute)
+                assert sim.cached == cached
+                for name in ('time', 'temperature', 'pressure', 'simulated_volume'):
+                    assert np.array_equal(getattr(sim, name), getattr(expected, name))
+            assert parallel.reactive_sim.checkpoint.time == 0.04
+            assert np.array_equal(parallel.reactive_sim.checkpoint.Y,
+                                  serial.reactive_sim.checkpoint.Y)
+        assert len(parallel_cache.files()) == 2
+
+
+def test_process_folder_jobs(tmpdir):
+    datadir = os.path.dirname(__file__)
+    cti_file = os.path.join(datadir, 'species.cti')
+    reacfile = '00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt'
+    for name in (reacfile, '01_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt'):
+        shutil.copy(os.path.join(datadir, reacfile), str(tmpdir.join(name)))
+    tmpdir.join('02_bad.txt').write('not an experiment\n')
+
+    tables = []
+    for jobs in (1, 2):
+        # The clipboard does not keep a manifest, so the files are not hashed
+        with mock.patch('uconnrcmpy.sinks.copy') as copy, \
+                mock.patch('uconnrcmpy.conditions.file_hash',
+                           side_effect=AssertionError('Hashed a file')):
+            failures = process_folder(cti_file, str(tmpdir), jobs=jobs)
+        tables.append(copy.call_args[0][0])
+        assert list(failures) == [Path(str(tmpdir.join('02_bad.txt')))]
+    assert tables[0] == tables[1]
+    rows = tables[0].split('\n')
+    assert len(rows) == 2
+    assert rows == sorted(rows)
+
+
+def test_process_files_alternate(alt_files):
+    files = [Path(alt_files['reacfile']), Path(alt_files['nonrfile'])]
+    serial, failures = process_files(files, alt_files['cti_file'], alternate=True)
+    assert failures == {}
+    parallel, failures = process_files(files, alt_files['cti_file'], alternate=True, jobs=2)
+    assert failures == {}
+    assert serial == parallel
+    assert [record['file'] for record in serial] == sorted(f.name for f in files)
+    reactive = serial[[f.name for f in sorted(files)].index(files[0].name)]
+    assert reactive['ignition_delay'] > 0
+    assert reactive['T_EOC'] > 700
+
+
+def test_process_folder_sink_manifest(tmpdir, capsys):
+    datadir = os.path.dirname(__file__)
+    cti_file = os.path.join(datadir, 'species.cti')
+    reacfile = '00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt'
+    shutil.copy(os.path.join(datadir, reacfile), str(tmpdir.join(reacfile)))
+    results_file = str(tmpdir.join('results.csv'))
+
+    assert process_folder(cti_file, str(tmpdir), sink=results_file) == {}
+    sink = CSVSink(results_file)
+    records = sink.records()
+    assert len(records) == 1
+    assert records[0]['path'] == str(tmpdir.join(reacfile))
+    assert float(records[0]['Tin']) == 333.0
+
+    capsys.readouterr()
+    process_folder(cti_file, str(tmpdir), sink=results_file)
+    assert 'Skipping' in capsys.readouterr().out
+    assert len(sink.records()) == 1
+
+    with open(str(tmpdir.join(reacfile)), 'a') as out_file:
+        out_file.write('\n')
+    process_folder(cti_file, str(tmpdir), sink=results_file)
+    records = sink.records()
+    assert len(records) == 2
+    assert records[0]['file_hash'] != records[1]['file_hash']
+
+
+def test_group_files():
+    files = ['00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt',
+             'NR_00_in_00_mm_333K-1137t-100x-21-Jul-15-1251.txt',
+             '05_in_02_mm_333K-1146t-100x-22-Jul-15-0930.txt',
+             'Fuel_MF_EqRatio_1.00_PercentAr_0_PercentN2_79_05_in_02_mm_343K_1200torr-'
+             '21-Jul-15-1251_Endplug_HC.txt',
+             'notes.txt']
+    groups = group_files(files)
+    assert list(groups) == sorted(groups, key=repr)
+    assert groups[(333, 1146, 0.0, 0, None)] == [Path(files[0])]
+    assert groups[(333, 1137, 0.0, 0, None)] == [Path(files[1])]
+    assert groups[(333, 1146, 0.5, 2, None)] == [Path(files[2])]
+    assert groups[(343, 1200, 0.5, 2, 'MF')] == [Path(files[3])]
+    assert len(groups) == 4
+
+
+def test_scan_conditions(tmpdir, capsys):
+    datadir = os.path.dirname(__file__)
+    cti_file = os.path.join(datadir, 'species.cti')
+    reacfile = '00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt'
+    for name in (reacfile, '00_in_00_mm_333K-1146t-100x-21-Jul-15-1227.txt',
+                 '05_in_00_mm_333K-1146t-100x-21-Jul-15-1228.txt'):
+        shutil.copy(os.path.join(datadir, reacfile), str(tmpdir.join(name)))
+    tmpdir.join('00_in_00_mm_333K-1146t-100x-21-Jul-15-1229.txt').write('not an experiment\n')
+
+    groups = scan_conditions(cti_file, str(tmpdir))
+    assert list(groups) == [(333, 1146, 0.0, 0, None), (333, 1146, 0.5, 0, None)]
+    group = groups[(333, 1146, 0.0, 0, None)]
+    assert len(group) == 3
+    assert not group.built
+    assert len(group.condition.reactive_experiments) == 2
+    assert group.built
+    assert list(group.failures) == [Path(str(tmpdir.join(
+        '00_in_00_mm_333K-1146t-100x-21-Jul-15-1229.txt')))]
+    assert not groups[(333, 1146, 0.5, 0, None)].built
+
+    groups = scan_conditions(cti_file, str(tmpdir), lazy=False, jobs=2)
+    assert all(group.built for group in groups.values())
+    assert sorted(groups[(333, 1146, 0.0, 0, None)].condition.reactive_experiments) == [
+        reacfile, '00_in_00_mm_333K-1146t-100x-21-Jul-15-1227.txt']
+    assert len(groups[(333, 1146, 0.5, 0, None)].failures) == 0
+
+
+def test_scan_conditions_alternate(alt_files, tmpdir):
+    for key in ('reacfile', 'nonrfile'):
+        shutil.copy(alt_files[key], str(tmpdir))
+    for jobs in (1, 2):
+        groups = scan_conditions(alt_files['cti_file'], str(tmpdir), lazy=False, jobs=jobs)
+        assert list(groups) == [(333, 1137, 0.0, 0, 'MF'), (333, 1146, 0.0, 0, 'MF')]
+        for group in groups.values():
+            assert group.failures == {}
+            assert isinstance(group.condition, AltCondition)
+        reactive = groups[(333, 1146, 0.0, 0, 'MF')].condition.reactive_experiments
+        assert list(reactive) == [os.path.basename(alt_files['reacfile'])]
+        nonreactive = groups[(333, 1137, 0.0, 0, 'MF')].condition.nonreactive_experiments
+        assert list(nonreactive) == [os.path.basename(alt_files['nonrfile'])]
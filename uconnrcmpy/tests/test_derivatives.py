@@ -0,0 +1,92 @@
+"""
+Test module for the derivatives module
+"""
+import numpy as np
+import pytest
+from ..derivatives import (forward_difference,
+                           moving_average,
+                           smoothed_forward_difference,
+                           savgol_derivative,
+                           nonuniform_derivative,
+                           )
+
+
+@pytest.fixture(scope='module')
+def trace():
+    time = np.linspace(0, 1, 10001)
+    rng = np.random.RandomState(1234)
+    pressure = np.sin(2*np.pi*time) + 0.01*rng.randn(len(time))
+    return time, pressure
+
+
+def test_forward_difference(trace):
+    time, pressure = trace
+    m = len(pressure)
+    expected = np.zeros(m)
+    expected[:m-2] = ((-3*pressure[:m-2] + 4*pressure[1:m-1] - pressure[2:m]) /
+                      (2*np.diff(time[:m-1])))
+    assert np.allclose(forward_difference(pressure, time), expected)
+
+
+def test_forward_difference_zero_step():
+    time = np.array([0.0, 0.0, 1.0, 2.0, 3.0])
+    derivative = forward_difference(np.arange(5.0), time)
+    assert np.all(np.isfinite(derivative))
+    assert derivative[0] == 0.0
+
+
+@pytest.mark.parametrize('n_points', [1, 3, 151])
+def test_moving_average(trace, n_points):
+    _, pressure = trace
+    expected = np.convolve(pressure, np.ones(n_points)/n_points, mode='same')
+    assert np.allclose(moving_average(pressure, n_points), expected)
+
+
+def test_moving_average_even_points(trace):
+    with pytest.raises(ValueError):
+        moving_average(trace[1], 150)
+
+
+def test_smoothed_forward_difference_in_place(trace):
+    time, pressure = trace
+    out = np.empty(len(pressure))
+    work = np.empty(len(pressure) + 1)
+    result = smoothed_forward_difference(pressure, time, 151, out=out, work=work)
+    assert result is out
+    expected = moving_average(forward_difference(pressure, time), 151)
+    assert np.allclose(out, expected)
+
+
+def test_savgol_derivative_quadratic():
+    time = np.linspace(0, 1, 1001)
+    pressure = 3*time**2 + 2*time
+    derivative = savgol_derivative(pressure, time[1] - time[0], 11)
+    assert np.allclose(derivative[5:-5], 6*time[5:-5] + 2)
+
+
+def test_nonuniform_derivative_quadratic():
+    rng = np.random.RandomState(1234)
+    time = np.cumsum(rng.uniform(0.1, 1.0, 1000))
+    pressure = 3*time**2 + 2*time
+    assert np.allclose(nonuniform_derivative(pressure, time), 6*time + 2)
+
+
+def test_nonuniform_derivative_lagrange_loop():
+    rng = np.random.RandomState(1234)
+    time = np.cumsum(rng.uniform(0.1, 1.0, 100))
+    pressure = np.sin(time)
+    derivative = nonuniform_derivative(pressure, time)
+    for i in range(1, len(time) - 1):
+        x, x_min, x_plu = time[i], time[i-1], time[i+1]
+        y, y_min, y_plu = pressure[i], pressure[i-1], pressure[i+1]
+        expected = (y_min*(x - x_plu)/((x_min - x)*(x_min - x_plu)) +
+                    y*(2*x - x_min - x_plu)/((x - x_min)*(x - x_plu)) +
+                    y_plu*(x - x_min)/((x_plu - x_min)*(x_plu - x)))
+        assert np.isclose(derivative[i], expected)
+
+
+def test_nonuniform_derivative_short():
+    assert np.allclose(nonuniform_derivative([1.0, 3.0], [0.0, 0.5]), [4.0, 4.0])
+    assert np.allclose(nonuniform_derivative([1.0], [0.0]), [0.0])
+    derivative = nonuniform_derivative(np.arange(4.0), [0.0, 0.0, 1.0, 2.0])
+    assert np.all(np.isfinite(derivative))
@@ -3,8 +3,11 @@ Test module for the experiments module
 """
 import numpy as np
 import os
+from pathlib import Path
+import shutil
+from unittest import mock
 import pytest
-from ..experiments import Experiment
+from ..experiments import AltExperiment, Experiment, ExperimentCache, scan_file_name
 
 
 @pytest.fixture(scope='module')
@@ -25,6 +28,42 @@ def test_create_reactive_experiment(files):
     assert np.isclose(exp.pressure_trace.p_EOC, 30.111)
 
 
+def test_experiment_cache(files, tmpdir):
+    cache = ExperimentCache(str(tmpdir.join('cache')))
+    reacfile = str(tmpdir.join(os.path.basename(files['reacfile'])))
+    shutil.copy(files['reacfile'], reacfile)
+    first = Experiment(reacfile, cti_file=files['cti_file'], copy=False, experiment_cache=cache)
+    assert not first.cached
+    assert len(cache.files()) == 1
+    assert cache.files()[0][1] < 4096
+
+    second = Experiment(reacfile, cti_file=files['cti_file'], copy=False, experiment_cache=cache)
+    assert second.cached
+    assert second.cache_key == first.cache_key
+    assert second.results() == first.results()
+    assert np.array_equal(second.pressure_trace.pressure, first.pressure_trace.pressure)
+    assert np.array_equal(second.pressure_trace.derivative, first.pressure_trace.derivative)
+
+    cti_file = str(tmpdir.join('species.cti'))
+    shutil.copy(files['cti_file'], cti_file)
+    with open(cti_file, 'a') as out_file:
+        out_file.write('\n')
+    changed = [
+        Experiment(reacfile, cti_file=cti_file, copy=False, experiment_cache=cache),
+        Experiment(reacfile, cti_file=files['cti_file'], copy=False, experiment_cache=cache,
+                   derivative_method='savgol'),
+        Experiment(reacfile, cti_file=files['cti_file'], copy=False, experiment_cache=cache,
+                   filter_frequency=3000.0),
+    ]
+    with open(reacfile, 'a') as out_file:
+        out_file.write('\n')
+    changed.append(Experiment(reacfile, cti_file=files['cti_file'], copy=False,
+                              experiment_cache=cache))
+    assert not any(exp.cached for exp in changed)
+    assert changed[2].voltage_trace.filter_frequency == 3000.0
+    assert len(cache.files()) == 5
+
+
 def test_create_nonreactive_experiment(files):
     exp = Experiment(files['nonrfile'],
                      cti_file=files['cti_file'], copy=False)
@@ -32,3 +71,45 @@ def test_create_nonreactive_experiment(files):
     assert np.isclose(exp.T_EOC, 0.0)
     assert np.isclose(exp.first_stage, 0.0)
     assert np.isclose(exp.pressure_trace.p_EOC, 30.184)
+
+
+@pytest.mark.parametrize('name', [
+    '00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt',
+    'NR_00_in_00_mm_333K-1137t-100x-21-Jul-15-1251.txt',
+    '15_in_03_mm_323K-1032t-150x-03-Feb-16-0905.txt',
+])
+def test_scan_file_name(name):
+    metadata = scan_file_name(Path('data') / name)
+    name_parts = Experiment.parse_file_name(Path(name))
+    assert metadata['kind'] == 'Experiment'
+    assert metadata['reactive'] == (not name.startswith('NR_'))
+    assert metadata['fuel'] is None
+    for key in ('spacers', 'shims', 'Tin', 'pin', 'factor'):
+        assert metadata[key] == name_parts[key]
+    assert metadata['date'].strftime('%d-%b-%H:%M') == name_parts['date']
+    assert metadata['date'].strftime('%d-%b-%y') == name_parts['date_year']
+
+
+def test_scan_alt_file_name():
+    name = ('Fuel_MF_EqRatio_1.00_PercentAr_0_PercentN2_79_05_in_02_mm_343K_1200torr-'
+            '21-Jul-15-1251_Endplug_HC.txt')
+    metadata = scan_file_name(name)
+    name_parts = AltExperiment.parse_file_name(Path(name))
+    assert metadata['kind'] == 'AltExperiment'
+    assert metadata['fuel'] == 'MF'
+    assert metadata['factor'] is None
+    for key in ('spacers', 'shims', 'Tin', 'pin'):
+        assert metadata[key] == name_parts[key]
+    assert scan_file_name('notes.txt') is None
+    assert scan_file_name('00_in_00_mm_333K-1146t-100x-21-Foo-15-1226.txt') is None
+
+
+def test_alt_experiment_results(alt_files):
+    with mock.patch('uconnrcmpy.experiments.copy') as copy:
+        exp = AltExperiment(alt_files['nonrfile'], cti_file=alt_files['cti_file'])
+    results = exp.results()
+    assert not exp.pressure_trace.is_reactive
+    assert results['filter_frequency'] == exp.pressure_trace.filter_frequency
+    assert results['filter_frequency'] > 0
+    assert results['file'] == os.path.basename(alt_files['nonrfile'])
+    assert copy.call_args[0][0] == '\t'.join(map(str, results.values()))
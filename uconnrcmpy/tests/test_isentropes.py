@@ -0,0 +1,83 @@
+"""
+Test module for the isentropes module
+"""
+import numpy as np
+import os
+import pytest
+from ..isentropes import IsentropeTable, get_isentrope_table
+from ..solutions import solution_pool
+
+
+@pytest.fixture(scope='module')
+def chem_file():
+    return os.path.join(os.path.dirname(__file__), 'species.cti')
+
+
+def cantera_isentrope(chem_file, T_initial, p_initial, pressure):
+    temperature = np.zeros(len(pressure))
+    volume = np.zeros(len(pressure))
+    with solution_pool.checkout(chem_file) as gas:
+        gas.TP = T_initial, p_initial
+        initial_entropy = gas.entropy_mass
+        initial_density = gas.density
+        for i, p in enumerate(pressure):
+            gas.SP = initial_entropy, p
+            temperature[i] = gas.T
+            volume[i] = initial_density/gas.density
+    return temperature, volume
+
+
+@pytest.mark.parametrize('p_initial', [0.8E5, 1.5E5])
+def test_temperature_and_volume(chem_file, p_initial):
+    table = IsentropeTable(333.0, chem_file=chem_file)
+    pressure = np.linspace(p_initial, 60*p_initial, 500)
+    temperature, volume = cantera_isentrope(chem_file, 333.0, p_initial, pressure)
+    assert np.allclose(table.temperature(pressure, 333.0, p_initial), temperature, rtol=1.0E-6)
+    assert np.allclose(table.volume(pressure, 1.0, 333.0, p_initial), volume, rtol=1.0E-6)
+
+
+def test_pressure(chem_file):
+    table = IsentropeTable(333.0, chem_file=chem_file)
+    pressure = np.linspace(1.5E5, 90.0E5, 500)
+    _, volume = cantera_isentrope(chem_file, 333.0, 1.5E5, pressure)
+    assert np.allclose(table.pressure(volume, 1.0, 333.0, 1.5E5), pressure, rtol=5.0E-6)
+
+
+def test_reference_along_isentrope(chem_file):
+    table = IsentropeTable(333.0, chem_file=chem_file)
+    T_ref = 700.0
+    pressure = np.linspace(40.0E5, 20.0E5, 200)
+    temperature, volume = cantera_isentrope(chem_file, T_ref, pressure[0], pressure)
+    assert np.allclose(table.temperature(pressure, T_ref, pressure[0]), temperature, rtol=1.0E-6)
+    assert np.allclose(table.volume(pressure, 0.1, T_ref, pressure[0]), 0.1*volume, rtol=1.0E-6)
+
+
+def test_extend_table(chem_file):
+    table = IsentropeTable(333.0, chem_file=chem_file)
+    n_points = len(table.log_pressure_ratio)
+    pressure = np.array([0.1E5, 1.0E5, 500.0E5])
+    temperature, _ = cantera_isentrope(chem_file, 333.0, 1.0E5, pressure)
+    assert np.allclose(table.temperature(pressure, 333.0, 1.0E5), temperature, rtol=1.0E-6)
+    assert len(table.log_pressure_ratio) > n_points
+    assert np.all(np.diff(table.log_pressure_ratio) > 0)
+
+
+def test_backends_agree(chem_file):
+    nasa7_table = IsentropeTable(333.0, chem_file=chem_file, backend='nasa7')
+    cantera_table = IsentropeTable(333.0, chem_file=chem_file, backend='cantera')
+    assert nasa7_table.mixture is not None
+    assert cantera_table.mixture is None
+    pressure = np.linspace(1.0E5, 100.0E5, 500)
+    assert np.allclose(nasa7_table.temperature(pressure, 333.0, 1.0E5),
+                       cantera_table.temperature(pressure, 333.0, 1.0E5), rtol=1.0E-6)
+
+
+def test_invalid_backend(chem_file):
+    with pytest.raises(ValueError):
+        IsentropeTable(333.0, chem_file=chem_file, backend='invalid')
+
+
+def test_get_isentrope_table(chem_file):
+    table = get_isentrope_table(333.0, chem_file=chem_file)
+    assert get_isentrope_table(333, chem_file=chem_file) is table
+    assert get_isentrope_table(350.0, chem_file=chem_file) is not table
@@ -0,0 +1,77 @@
+"""
+Test module for the mechanisms module
+"""
+import os
+import cantera as ct
+import pytest
+from pathlib import Path
+from ..caches import cache_home
+from .. import mechanisms
+from ..mechanisms import MechanismCache, load_path, main
+
+
+@pytest.fixture
+def chem_file():
+    return os.path.join(os.path.dirname(__file__), 'species.cti')
+
+
+def test_get_converts_once(chem_file, tmpdir):
+    cache = MechanismCache(str(tmpdir))
+    cache_path = cache.get(chem_file)
+    assert cache_path.exists()
+    mtime = cache_path.stat().st_mtime
+    os.utime(str(cache_path), (mtime - 100, mtime - 100))
+    assert cache.get(chem_file) == cache_path
+    assert cache_path.stat().st_mtime > mtime - 100
+    gas = ct.Solution(str(cache_path))
+    assert gas.species_names == ['N2', 'iBuOH(1)', 'O2(2)']
+
+
+def test_get_from_source(chem_file, tmpdir):
+    cache = MechanismCache(str(tmpdir))
+    with open(chem_file, 'r') as in_file:
+        cti_source = in_file.read()
+    assert cache.get(cti_source=cti_source) == cache.get(chem_file)
+    assert len(cache.files()) == 1
+
+
+def test_evict_least_recently_used(chem_file, tmpdir):
+    cache = MechanismCache(str(tmpdir))
+    with open(chem_file, 'r') as in_file:
+        cti_source = in_file.read()
+    first = cache.get(cti_source=cti_source)
+    os.utime(str(first), (0, 0))
+    cache.max_size = first.stat().st_size
+    second = cache.get(cti_source=cti_source + '\n# A comment\n')
+    assert not first.exists()
+    assert second.exists()
+
+
+def test_main(chem_file, tmpdir, capsys):
+    main(['--cache-dir', str(tmpdir), chem_file])
+    cache = MechanismCache(str(tmpdir))
+    assert len(cache.files()) == 1
+    assert str(cache.path(chem_file)) in capsys.readouterr()[0]
+    main(['--cache-dir', str(tmpdir), '--clear'])
+    assert len(cache.files()) == 0
+
+
+def test_cache_home(tmpdir, monkeypatch):
+    monkeypatch.delenv('UCONNRCMPY_CACHE_DIR', raising=False)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmpdir))
+    assert cache_home() == Path(str(tmpdir)) / 'uconnrcmpy'
+    monkeypatch.setenv('UCONNRCMPY_CACHE_DIR', str(tmpdir.join('caches')))
+    assert cache_home() == Path(str(tmpdir.join('caches')))
+    assert MechanismCache().cache_dir == cache_home() / 'mechanisms'
+
+
+@pytest.mark.parametrize('cti_loadable', [True, False])
+def test_load_path_syntax_error(cti_loadable, tmpdir, monkeypatch):
+    monkeypatch.setattr(mechanisms, 'mechanism_cache', MechanismCache(str(tmpdir)))
+    monkeypatch.setattr(mechanisms, 'cti_loadable', cti_loadable)
+    cti_source = 'ideal_gas(name="gas", elements="N"\n'
+    if cti_loadable:
+        assert load_path(cti_source=cti_source) is None
+    else:
+        with pytest.raises(ValueError, match='syntax error'):
+            load_path(cti_source=cti_source)
@@ -0,0 +1,58 @@
+"""
+Test module for the readers module
+"""
+import os
+import shutil
+
+import numpy as np
+import pytest
+from pathlib import Path
+from ..readers import parse_trace, load_trace, sidecar_path
+
+
+@pytest.fixture
+def trace_file(tmpdir):
+    datadir = os.path.dirname(__file__)
+    src = os.path.join(datadir, '00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt')
+    dst = Path(str(tmpdir)) / os.path.basename(src)
+    shutil.copy(src, str(dst))
+    return dst
+
+
+def test_parse_trace_matches_genfromtxt(trace_file):
+    assert np.array_equal(parse_trace(trace_file), np.genfromtxt(str(trace_file)))
+
+
+def test_parse_trace_with_header(tmpdir):
+    file_path = Path(str(tmpdir)) / 'header.txt'
+    file_path.write_text('Time\tVoltage\n0.0\t1.0\n1.0\t2.0\n')
+    data = parse_trace(file_path)
+    assert data.shape == (3, 2)
+    assert np.array_equal(data[1:], [[0.0, 1.0], [1.0, 2.0]])
+
+
+def test_load_trace_sidecar(trace_file):
+    first = load_trace(trace_file)
+    assert sidecar_path(trace_file).exists()
+    second = load_trace(trace_file)
+    assert np.array_equal(first, second)
+
+    # Modifying the loaded array must not modify the sidecar
+    second[0, 1] = 100.0
+    assert np.array_equal(load_trace(trace_file), first)
+
+
+def test_load_trace_invalidates_changed_file(trace_file):
+    old_sidecar = sidecar_path(trace_file)
+    load_trace(trace_file)
+    with open(str(trace_file), 'a') as out_file:
+        out_file.write('2.000000\t0.000000\n')
+    data = load_trace(trace_file)
+    assert data.shape == (200001, 2)
+    assert not old_sidecar.exists()
+    assert sidecar_path(trace_file).exists()
+
+
+def test_load_trace_no_cache(trace_file):
+    load_trace(trace_file, cache=False)
+    assert not sidecar_path(trace_file).exists()
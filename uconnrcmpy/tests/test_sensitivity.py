@@ -0,0 +1,186 @@
+"""
+Test module for the sensitivity module
+"""
+import numpy as np
+import os
+import pytest
+import cantera as ct
+from .. import sensitivity
+from ..sensitivity import SensitivityAnalysis
+from ..simulations import Simulation, SimulationCache
+
+
+class FakeCondition(object):
+    reactive_compression_time = 30.0
+
+    def __init__(self, chem_file):
+        self.chem_file = chem_file
+
+    def simulation_parameters(self):
+        time = np.linspace(0, 0.1, 101)
+        return dict(initial_temperature=333.0, initial_pressure=1.0E5,
+                    volume=np.column_stack((time, 1.0 - 0.5*time)), chem_file=self.chem_file)
+
+
+class IgnitionCondition(object):
+    """A compression to CR 8 between 10 and 40 ms that ignites the h2o2.cti mixture."""
+    reactive_compression_time = 40.0
+
+    def simulation_parameters(self):
+        time = np.linspace(0, 0.06, 601)
+        stroke = np.clip((time - 0.01)/0.03, 0, 1)
+        volume = 1.0 - (1.0 - 1.0/8.0)*(1.0 - np.cos(np.pi*stroke))/2.0
+        return dict(initial_temperature=320.0, initial_pressure=1.0E5,
+                    volume=np.column_stack((time, 2.0*volume)),
+                    chem_file=os.path.join(os.path.dirname(__file__), 'h2o2.cti'))
+
+
+@pytest.fixture
+def chem_file(tmpdir):
+    with open(os.path.join(os.path.dirname(__file__), 'species.cti')) as in_file:
+        cti_source = in_file.read()
+    cti_source += ("reaction('N2 + O2(2) <=> N2 + O2(2)', [1.0, 0.0, 0.0])\n"
+                   "reaction('iBuOH(1) + O2(2) <=> iBuOH(1) + O2(2)', [1.0, 0.0, 0.0])\n"
+                   "reaction('iBuOH(1) + N2 <=> iBuOH(1) + N2', [1.0, 0.0, 0.0])\n")
+    chem_file = tmpdir.join('reactions.cti')
+    chem_file.write(cti_source)
+    return str(chem_file)
+
+
+def test_sensitivity_ranked_and_resumed(chem_file, tmpdir, monkeypatch):
+    delays = {None: 10.0, 0: 10.0, 1: 5.0, 2: 40.0}
+    calls = []
+
+    def fake_ignition_delay(compression_time, multipliers=None, **kwargs):
+        assert compression_time == 30.0
+        assert 'restart' not in kwargs
+        reaction = None if multipliers is None else list(multipliers)[0]
+        calls.append(reaction)
+        return delays[reaction]
+
+    monkeypatch.setattr(sensitivity, 'simulate_ignition_delay', fake_ignition_delay)
+    progress_file = str(tmpdir.join('runs.csv'))
+    analysis = SensitivityAnalysis(FakeCondition(chem_file), share_compression=False,
+                                   progress_file=progress_file)
+    table = analysis.run()
+    assert calls == [None, 0, 1, 2]
+    assert [row[1] for row in table] == [2, 1, 0]
+    assert np.isclose(table[0][4], 2.0)
+    assert np.isclose(table[1][4], -1.0)
+    assert table[2][4] == 0.0
+    assert table[0][2] == analysis.equations[2]
+
+    calls.clear()
+    resumed = SensitivityAnalysis(FakeCondition(chem_file), share_compression=False,
+                                  progress_file=progress_file)
+    assert resumed.run() == table
+    assert calls == []
+
+    table_file = str(tmpdir.join('sensitivity.csv'))
+    resumed.write_table(table_file)
+    with open(table_file) as in_file:
+        lines = in_file.read().splitlines()
+    assert lines[0] == 'rank,reaction,equation,ignition_delay,sensitivity'
+    assert lines[1].startswith('1,2,')
+
+
+def test_sensitivity_nominal_no_ignition(chem_file, tmpdir, monkeypatch):
+    calls = []
+
+    def fake_ignition_delay(compression_time, multipliers=None, **kwargs):
+        calls.append(multipliers)
+        return np.nan
+
+    monkeypatch.setattr(sensitivity, 'simulate_ignition_delay', fake_ignition_delay)
+    progress_file = str(tmpdir.join('runs.csv'))
+    analysis = SensitivityAnalysis(FakeCondition(chem_file), share_compression=False,
+                                   progress_file=progress_file)
+    with pytest.raises(RuntimeError):
+        analysis.run()
+    assert calls == [None]
+    assert np.isnan(analysis.load_progress()[-1])
+    with pytest.raises(RuntimeError):
+        analysis.run()
+    assert calls == [None]
+
+
+def test_sensitivity_key_changes(chem_file, tmpdir):
+    progress_file = str(tmpdir.join('runs.csv'))
+    first = SensitivityAnalysis(FakeCondition(chem_file), progress_file=progress_file)
+    second = SensitivityAnalysis(FakeCondition(chem_file), factor=0.5,
+                                 progress_file=progress_file)
+    assert first.key != second.key
+    first.save_progress(0, 1.0)
+    assert second.load_progress() == {}
+    assert first.load_progress() == {0: 1.0}
+
+
+@pytest.mark.skipif(not hasattr(ct.ReactorNet, 'set_max_time_step') or
+                    not hasattr(ct.ReactorNet, 'set_initial_time'),
+                    reason='Requires the ReactorNet methods of Cantera 2.x')
+def test_sensitivity_shared_compression_resumed(tmpdir, monkeypatch):
+    runs = []
+
+    def recorded_simulation(**kwargs):
+        sim = Simulation(**kwargs)
+        runs.append((kwargs['is_reactive'], sorted(sim.multipliers), 'restart' in kwargs,
+                     sim.cached))
+        return sim
+
+    monkeypatch.setattr(sensitivity, 'Simulation', recorded_simulation)
+    monkeypatch.setattr(sensitivity, 'simulation_cache', SimulationCache(str(tmpdir)))
+    progress_file = str(tmpdir.join('runs.csv'))
+
+    def analysis(reactions):
+        analysis = SensitivityAnalysis(IgnitionCondition(), reactions=reactions, end_time=0.06,
+                                       progress_file=progress_file)
+        analysis.compression_rtol = 1.0E-3
+        return analysis
+
+    first = analysis([0, 1])
+    first.run()
+    assert first.checkpoint.time == 0.04
+    assert first.nominal_delay > 0
+    assert runs == [(True, [], False, False), (False, [], False, False),
+                    (True, [0], True, False), (True, [1], True, False)]
+    nominal_delay = Simulation(is_reactive=True,
+                               **first.parameters).ignition_delay(first.compression_time)
+    assert np.isclose(first.nominal_delay, nominal_delay, rtol=1.0E-4)
+    assert np.isclose(first.ignition_delays[0], sensitivity.simulate_ignition_delay(
+        first.compression_time, multipliers={0: first.factor}, **first.parameters),
+        rtol=1.0E-4)
+
+    del runs[:]
+    resumed = analysis([0, 1, 2])
+    table = resumed.run()
+    assert runs == [(True, [], False, True), (False, [], False, True), (True, [2], True, False)]
+    assert resumed.nominal_delay == first.nominal_delay
+    assert resumed.checkpoint.time == 0.04
+    assert resumed.ignition_delays[0] == first.ignition_delays[0]
+    assert sorted(row[1] for row in table) == [0, 1, 2]
+
+    del runs[:]
+    finished = analysis([0, 1, 2])
+    assert finished.run() == table
+    assert runs == []
+    assert finished.checkpoint is None
+
+
+@pytest.mark.skipif(not hasattr(ct.ReactorNet, 'set_max_time_step') or
+                    not hasattr(ct.ReactorNet, 'set_initial_time'),
+                    reason='Requires the ReactorNet methods of Cantera 2.x')
+def test_sensitivity_shared_compression_no_ignition(tmpdir, monkeypatch, capsys):
+    runs = []
+
+    def recorded_simulation(**kwargs):
+        runs.append((kwargs['is_reactive'], kwargs.get('multipliers')))
+        return Simulation(**kwargs)
+
+    monkeypatch.setattr(sensitivity, 'Simulation', recorded_simulation)
+    analysis = SensitivityAnalysis(IgnitionCondition(), reactions=[0, 1], end_time=0.042,
+                                   progress_file=str(tmpdir.join('runs.csv')), use_cache=False)
+    with pytest.raises(RuntimeError):
+        analysis.run()
+    assert runs == [(True, None)]
+    assert np.isnan(analysis.nominal_delay)
+    assert 'not frozen' not in capsys.readouterr()[0]
@@ -0,0 +1,376 @@
+"""
+Test module for the simulations module
+"""
+import numpy as np
+import os
+import pytest
+import cantera as ct
+from ..simulations import (Simulation, SimulationCache, SimulationCheckpoint, VolumeProfile,
+                           Recorder, stroke_key)
+from ..solutions import solution_pool
+
+reactor_api = pytest.mark.skipif(
+    not hasattr(ct.ReactorNet, 'set_max_time_step') or
+    not hasattr(ct.ReactorNet, 'set_initial_time'),
+    reason='Requires the ReactorNet methods of Cantera 2.x')
+
+
+def masked_velocity(profile, t):
+    """Look up the velocity by masking the whole time array."""
+    if t < profile.time[-1]:
+        prev_time_point = profile.time[profile.time <= t][-1]
+        index = np.where(profile.time == prev_time_point)[0][0]
+        return profile.velocity[index]
+    else:
+        return 0
+
+
+def test_volume_profile_lookup():
+    rng = np.random.RandomState(1234)
+    time = np.cumsum(rng.uniform(0.5, 1.5, 1000))*1.0E-5
+    time -= time[0]
+    volume = 1.0 + rng.rand(len(time))
+    profile = VolumeProfile(time, volume)
+    # Steps forward like the integrator, with some jumps backward and
+    # beyond the end of the profile, and exactly on the time points
+    steps = np.concatenate((np.linspace(0, time[-1]*1.1, 5000),
+                            rng.uniform(0, time[-1]*1.1, 500),
+                            time))
+    for t in steps:
+        assert profile(float(t)) == masked_velocity(profile, t)
+
+
+def test_volume_profile_outside():
+    profile = VolumeProfile([0.0, 1.0, 2.0], [1.0, 2.0, 4.0])
+    assert profile(-1.0) == 0
+    assert profile(0.5) == 1.0
+    assert profile(1.5) == 2.0
+    assert profile(2.0) == 0
+
+
+@pytest.mark.skipif(not hasattr(ct, 'Tabulated1'), reason='Requires Cantera 2.5')
+def test_volume_profile_tabulated():
+    time = np.linspace(0, 0.1, 101)
+    profile = VolumeProfile(time, 1.0 + np.sin(10*time))
+    tabulated = profile.tabulated()
+    midpoints = (time[1:] + time[:-1])/2
+    for t in np.append(midpoints, 0.2):
+        assert tabulated(t) == profile(t)
+
+
+def test_recorder_grows():
+    recorder = Recorder({'time': (), 'mass_fractions': (3,)}, capacity=2)
+    for i in range(11):
+        recorder.append(time=0.1*i, mass_fractions=[i, 2*i, 3*i])
+    assert len(recorder) == 11
+    assert recorder.capacity == 16
+    arrays = recorder.to_arrays()
+    assert np.allclose(arrays['time'], 0.1*np.arange(11))
+    assert arrays['mass_fractions'].shape == (11, 3)
+    assert np.allclose(arrays['mass_fractions'][:, 2], 3*np.arange(11))
+    assert np.allclose(recorder['time'], arrays['time'])
+
+
+def test_volume_profile_change_times():
+    time = np.linspace(0, 0.9, 10)
+    volume = np.array([1.0, 1.0, 1.0, 0.5, 0.25, 0.25, 0.25, 0.25, 0.3, 0.3])
+    profile = VolumeProfile(time, volume)
+    expected = np.array([0.2, 0.2, 0.2, 0.3, 0.7, 0.7, 0.7, 0.7, np.inf, np.inf])
+    assert np.allclose(profile.change_times(0.1), expected)
+
+
+def test_simulation_step_control():
+    with pytest.raises(ValueError):
+        Simulation(300.0, 1.0E5, None, False, step_control='variable')
+
+
+@pytest.fixture(scope='module')
+def compression():
+    time = np.linspace(0, 0.05, 501)
+    volume = 1.0 - 0.9*np.clip(time/0.03, 0, 1)**2
+    return np.column_stack((time, 2.0*volume))
+
+
+def test_simulation_frozen_chemistry(compression):
+    chem_file = os.path.join(os.path.dirname(__file__), 'species.cti')
+    sim = Simulation(333.0, 1.0E5, compression, False, end_time=0.04, chem_file=chem_file,
+                     frozen_chemistry=True, record_properties=('density',))
+    assert np.allclose(sim.time[:-1], compression[compression[:, 0] < 0.04, 0])
+    assert sim.time[-1] == 0.04
+    assert np.allclose(sim.simulated_volume, np.interp(sim.time, compression[:, 0],
+                                                       compression[:, 1]/2.0))
+    with solution_pool.checkout(chem_file) as gas:
+        gas.TP = 333.0, 1.0E5
+        initial_entropy = gas.entropy_mass
+        initial_volume = gas.volume_mass
+        for i in range(0, len(sim.time), 50):
+            gas.SV = initial_entropy, initial_volume*sim.simulated_volume[i]
+            assert np.isclose(sim.temperature[i], gas.T, rtol=1.0E-6)
+            assert np.isclose(sim.pressure[i], gas.P/1E5, rtol=2.0E-6)
+            assert np.isclose(sim.properties['density'][i], gas.density, rtol=2.0E-6)
+
+
+def test_simulation_frozen_chemistry_end_temp(compression):
+    chem_file = os.path.join(os.path.dirname(__file__), 'species.cti')
+    sim = Simulation(333.0, 1.0E5, compression, False, end_temp=600.0, chem_file=chem_file,
+                     frozen_chemistry=True)
+    assert sim.temperature[-1] >= 600.0
+    assert np.all(sim.temperature[:-1] < 600.0)
+    with pytest.raises(ValueError):
+        Simulation(333.0, 1.0E5, compression, True, chem_file=chem_file, frozen_chemistry=True)
+
+
+def test_simulation_ignition_delay(compression):
+    chem_file = os.path.join(os.path.dirname(__file__), 'species.cti')
+    sim = Simulation(333.0, 1.0E5, compression, False, end_time=0.04, chem_file=chem_file,
+                     frozen_chemistry=True)
+    assert sim.ignition_delay(30.0) == sim.time[np.argmax(sim.derivative)]*1000 - 30.0
+
+
+def test_recorder_extend():
+    recorder = Recorder({'time': (), 'mass_fractions': (2,)}, capacity=2)
+    recorder.append(time=0.0, mass_fractions=[0.0, 1.0])
+    recorder.extend(time=np.arange(1, 6), mass_fractions=np.ones((5, 2)))
+    assert len(recorder) == 6
+    assert recorder.capacity == 8
+    assert np.allclose(recorder['time'], np.arange(6))
+    assert np.allclose(recorder['mass_fractions'][0], [0.0, 1.0])
+
+
+def test_simulation_checkpoint_roundtrip(tmpdir):
+    history = {'time': np.array([0.0, 0.01]), 'temperature': np.array([333.0, 700.0]),
+               'pressure': np.array([1.0, 20.0]), 'simulated_volume': np.array([1.0, 0.1]),
+               'Y': np.array([[0.5, 0.5], [0.4, 0.6]])}
+    checkpoint = SimulationCheckpoint('stroke', 'run', history, [0.4, 0.6])
+    assert checkpoint.time == 0.01
+    assert checkpoint.temperature == 700.0
+    filename = str(tmpdir.join('checkpoint.npz'))
+    checkpoint.save(filename)
+    assert os.listdir(str(tmpdir)) == ['checkpoint.npz']
+    loaded = SimulationCheckpoint.load(filename)
+    assert loaded.stroke_key == 'stroke'
+    assert loaded.run_key == 'run'
+    assert loaded.pressure == 20.0
+    assert loaded.volume == 0.1
+    assert np.allclose(loaded.Y, [0.4, 0.6])
+    assert sorted(loaded.history) == sorted(history)
+    assert np.allclose(loaded.history['Y'], history['Y'])
+    assert loaded.captured is None
+
+    captured = SimulationCheckpoint('stroke', 'run',
+                                    {name: value[:1] for name, value in history.items()},
+                                    [0.5, 0.5])
+    SimulationCheckpoint('stroke', 'run', history, [0.4, 0.6], captured).save(filename)
+    loaded = SimulationCheckpoint.load(filename)
+    assert loaded.time == 0.01
+    assert loaded.captured.time == 0.0
+    assert loaded.captured.run_key == 'run'
+    assert np.allclose(loaded.captured.Y, [0.5, 0.5])
+    assert np.allclose(loaded.captured.history['Y'], history['Y'][:1])
+
+
+def test_simulation_restart_mismatch(compression):
+    chem_file = os.path.join(os.path.dirname(__file__), 'species.cti')
+    key = stroke_key(333.0, 1.0E5, compression, True, chem_file)
+    assert key == stroke_key(333.0, 1.0E5, compression.copy(), True, chem_file)
+    assert key != stroke_key(333.0, 1.0E5, compression, False, chem_file)
+    assert key != stroke_key(340.0, 1.0E5, compression, True, chem_file)
+    history = {'time': np.array([0.0]), 'temperature': np.array([333.0]),
+               'pressure': np.array([1.0]), 'simulated_volume': np.array([1.0])}
+    checkpoint = SimulationCheckpoint(key, 'run', history, [1.0])
+    with pytest.raises(ValueError):
+        Simulation(333.0, 1.0E5, compression, False, chem_file=chem_file, restart=checkpoint)
+    with pytest.raises(ValueError):
+        Simulation(333.0, 1.0E5, compression, True, chem_file=chem_file, restart=checkpoint,
+                   record_properties=('Y',))
+    with pytest.raises(ValueError):
+        Simulation(333.0, 1.0E5, compression, False, chem_file=chem_file, restart=checkpoint,
+                   frozen_chemistry=True)
+
+
+def test_simulation_cache(compression, tmpdir):
+    chem_file = os.path.join(os.path.dirname(__file__), 'species.cti')
+    cache = SimulationCache(str(tmpdir))
+    first = Simulation(333.0, 1.0E5, compression, False, end_time=0.04, chem_file=chem_file,
+                       frozen_chemistry=True, record_properties=('Y',), cache=cache)
+    assert not first.cached
+    assert len(cache.files()) == 1
+    second = Simulation(333.0, 1.0E5, compression, False, end_time=0.04, chem_file=chem_file,
+                        frozen_chemistry=True, record_properties=('Y',), cache=cache)
+    assert second.cached
+    assert second.result_key == first.result_key
+    assert np.array_equal(second.time, first.time)
+    assert np.array_equal(second.pressure, first.pressure)
+    assert np.array_equal(second.properties['Y'], first.properties['Y'])
+    assert np.array_equal(second.derivative, first.derivative)
+    third = Simulation(333.0, 1.0E5, compression, False, end_time=0.03, chem_file=chem_file,
+                       frozen_chemistry=True, record_properties=('Y',), cache=cache)
+    assert not third.cached
+    assert len(cache.files()) == 2
+
+
+def test_simulation_cache_checkpoint_and_eviction(tmpdir):
+    cache = SimulationCache(str(tmpdir))
+    results = {'time': np.array([0.0, 0.01, 0.02]), 'temperature': np.array([333.0, 700.0, 800.0]),
+               'pressure': np.array([1.0, 20.0, 25.0]),
+               'simulated_volume': np.array([1.0, 0.1, 0.1])}
+    history = {name: value[:2] for name, value in results.items()}
+    cache.put('first', results, SimulationCheckpoint('stroke', 'run', history, [1.0]))
+    loaded, checkpoint = cache.get('first')
+    assert np.array_equal(loaded['pressure'], results['pressure'])
+    assert checkpoint.time == 0.01
+    assert checkpoint.stroke_key == 'stroke'
+    assert np.array_equal(checkpoint.history['temperature'], [333.0, 700.0])
+    assert cache.get('second') is None
+
+    os.utime(str(cache.path('first')), (0, 0))
+    cache.max_size = cache.files()[0][1]
+    cache.put('second', results)
+    assert cache.get('first') is None
+    assert cache.get('second')[1] is None
+
+
+@pytest.fixture(scope='module')
+def ignition_compression():
+    """A smooth compression to CR 8 between 10 and 40 ms that ignites the h2o2.cti mixture."""
+    time = np.linspace(0, 0.06, 601)
+    stroke = np.clip((time - 0.01)/0.03, 0, 1)
+    volume = 1.0 - (1.0 - 1.0/8.0)*(1.0 - np.cos(np.pi*stroke))/2.0
+    return np.column_stack((time, 2.0*volume))
+
+
+@pytest.fixture(scope='module')
+def ignition_chem_file():
+    return os.path.join(os.path.dirname(__file__), 'h2o2.cti')
+
+
+class CheckpointSaved(Exception):
+    pass
+
+
+@reactor_api
+def test_simulation_restart(ignition_compression, ignition_chem_file):
+    full = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                      chem_file=ignition_chem_file, checkpoint_time=0.04)
+    assert full.checkpoint.time == 0.04
+    assert full.temperature[-1] >= 2500.0
+    restarted = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                           chem_file=ignition_chem_file, checkpoint_time=0.04,
+                           restart=full.checkpoint)
+    assert restarted.checkpoint is full.checkpoint
+    n_history = len(full.checkpoint.history['time'])
+    assert np.array_equal(restarted.time[:n_history], full.time[:n_history])
+    assert np.isclose(restarted.ignition_delay(40.0), full.ignition_delay(40.0), rtol=1.0E-4)
+    assert np.isclose(restarted.temperature[-1], full.temperature[-1], rtol=1.0E-3)
+    assert np.isclose(restarted.pressure[-1], full.pressure[-1], rtol=1.0E-3)
+
+
+@reactor_api
+def test_simulation_checkpoint_file(ignition_compression, ignition_chem_file, tmpdir,
+                                    monkeypatch, capsys):
+    full = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                      chem_file=ignition_chem_file)
+    checkpoint_file = str(tmpdir.join('checkpoint.npz'))
+    save = SimulationCheckpoint.save
+
+    def save_and_stop(self, filename):
+        save(self, filename)
+        raise CheckpointSaved
+
+    monkeypatch.setattr(SimulationCheckpoint, 'save', save_and_stop)
+    with pytest.raises(CheckpointSaved):
+        Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                   chem_file=ignition_chem_file, checkpoint_file=checkpoint_file)
+    monkeypatch.undo()
+    assert os.path.exists(checkpoint_file)
+    saved = SimulationCheckpoint.load(checkpoint_file)
+    assert 0 < saved.time < full.time[-1]
+
+    resumed = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                         chem_file=ignition_chem_file, checkpoint_file=checkpoint_file)
+    assert 'Resuming the simulation from {}'.format(checkpoint_file) in capsys.readouterr()[0]
+    assert not os.path.exists(checkpoint_file)
+    n_history = len(saved.history['time'])
+    assert np.array_equal(resumed.time[:n_history], full.time[:n_history])
+    assert np.isclose(resumed.ignition_delay(40.0), full.ignition_delay(40.0), rtol=1.0E-4)
+    assert np.isclose(resumed.temperature[-1], full.temperature[-1], rtol=1.0E-3)
+
+    Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+               chem_file=ignition_chem_file, checkpoint_file=checkpoint_file)
+    assert not os.path.exists(checkpoint_file)
+
+
+@reactor_api
+def test_simulation_checkpoint_file_after_checkpoint_time(ignition_compression,
+                                                          ignition_chem_file, tmpdir, monkeypatch):
+    full = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                      chem_file=ignition_chem_file, checkpoint_time=0.04)
+    checkpoint_file = str(tmpdir.join('checkpoint.npz'))
+    save = SimulationCheckpoint.save
+
+    def save_and_stop_after_compression(self, filename):
+        save(self, filename)
+        if self.time > 0.04:
+            raise CheckpointSaved
+
+    monkeypatch.setattr(SimulationCheckpoint, 'save', save_and_stop_after_compression)
+    with pytest.raises(CheckpointSaved):
+        Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                   chem_file=ignition_chem_file, checkpoint_time=0.04,
+                   checkpoint_file=checkpoint_file)
+    monkeypatch.undo()
+    assert SimulationCheckpoint.load(checkpoint_file).time > 0.04
+
+    resumed = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                         chem_file=ignition_chem_file, checkpoint_time=0.04,
+                         checkpoint_file=checkpoint_file)
+    assert resumed.checkpoint.time == 0.04
+    assert np.array_equal(resumed.checkpoint.Y, full.checkpoint.Y)
+    for name, value in full.checkpoint.history.items():
+        assert np.array_equal(resumed.checkpoint.history[name], value)
+
+
+@reactor_api
+def test_simulation_reactor_recording(ignition_compression, ignition_chem_file):
+    sim = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                     chem_file=ignition_chem_file, record_properties=('Y', 'density'))
+    n_points = len(sim.time)
+    assert sim.time[0] == 0.0
+    assert np.all(np.diff(sim.time) > 0)
+    assert sim.temperature[0] == 320.0
+    assert sim.temperature[-1] >= 2500.0
+    assert np.all(sim.temperature[:-1] < 2500.0)
+    for name in ('temperature', 'pressure', 'simulated_volume', 'derivative'):
+        assert getattr(sim, name).shape == (n_points,)
+    assert sim.properties['density'].shape == (n_points,)
+    assert sim.properties['Y'].shape[0] == n_points
+    assert np.allclose(sim.properties['Y'].sum(axis=1), 1.0)
+    assert np.allclose(sim.properties['density']*sim.simulated_volume,
+                       sim.properties['density'][0]*sim.simulated_volume[0])
+    with solution_pool.checkout(ignition_chem_file) as gas:
+        for i in range(0, n_points, 500):
+            gas.TDY = sim.temperature[i], sim.properties['density'][i], sim.properties['Y'][i]
+            assert np.isclose(sim.pressure[i], gas.P/1E5)
+
+
+@reactor_api
+@pytest.mark.skipif(not hasattr(ct, 'Tabulated1'), reason='Requires Cantera 2.5')
+def test_simulation_reactor_step_control(ignition_compression, ignition_chem_file):
+    sampling_time_step = ignition_compression[1, 0]
+    fixed = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                       chem_file=ignition_chem_file, record_properties=('Y',))
+    assert np.diff(fixed.time).max() <= sampling_time_step*(1 + 1.0E-9)
+    phased = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                        chem_file=ignition_chem_file, record_properties=('Y',),
+                        step_control='phased')
+    assert np.diff(phased.time).max() > sampling_time_step*2
+    assert len(phased.time) < len(fixed.time)
+    tabulated = Simulation(320.0, 1.0E5, ignition_compression, True, end_time=0.06,
+                           chem_file=ignition_chem_file, record_properties=('Y',),
+                           tabulated_velocity=True)
+    for sim in (phased, tabulated):
+        assert np.isclose(sim.ignition_delay(40.0), fixed.ignition_delay(40.0), rtol=1.0E-4)
+        assert np.isclose(sim.temperature.max(), fixed.temperature.max(), rtol=1.0E-3)
+        assert np.isclose(sim.pressure[-1], fixed.pressure[-1], rtol=1.0E-3)
+        assert np.allclose(sim.properties['Y'][-1], fixed.properties['Y'][-1], rtol=1.0E-2,
+                           atol=1.0E-5)
@@ -0,0 +1,70 @@
+"""
+Test module for the sinks module
+"""
+from collections import OrderedDict
+from unittest import mock
+import numpy as np
+import pytest
+from ..sinks import ClipboardSink, CSVSink, JSONLinesSink, ResultsSink, SQLiteSink, open_sink
+
+
+def make_record(i, file_hash='abc'):
+    return OrderedDict([('Tin', np.float64(333.0)), ('pin', np.int64(1100 + i)),
+                        ('time_of_day', '12{:02d}'.format(i)), ('path', 'file{}.txt'.format(i)),
+                        ('file_hash', file_hash + str(i)), ('parameters', 'xyz')])
+
+
+@pytest.mark.parametrize('sink_class,suffix', [
+    (CSVSink, '.csv'), (JSONLinesSink, '.jsonl'), (SQLiteSink, '.db'),
+])
+def test_file_sinks(sink_class, suffix, tmpdir):
+    filename = str(tmpdir.join('results' + suffix))
+    with sink_class(filename) as sink:
+        sink.write(make_record(0))
+        # Each record is in the file as soon as it is written
+        assert len(sink_class(filename).records()) == 1
+        sink.write(make_record(1))
+    reopened = open_sink(filename)
+    assert isinstance(reopened, sink_class)
+    records = reopened.records()
+    assert [record['time_of_day'] for record in records] == ['1200', '1201']
+    assert float(records[1]['pin']) == 1101
+    assert reopened.manifest() == {('abc0', 'xyz'), ('abc1', 'xyz')}
+    reopened.write(make_record(2))
+    reopened.close()
+    assert len(sink_class(filename).records()) == 3
+
+
+def test_csv_sink_columns(tmpdir):
+    with CSVSink(str(tmpdir.join('results.csv'))) as sink:
+        sink.write(make_record(0))
+        with pytest.raises(ValueError):
+            sink.write(OrderedDict([('Tin', 333.0)]))
+
+
+def test_sqlite_sink_adds_columns(tmpdir):
+    with SQLiteSink(str(tmpdir.join('results.db'))) as sink:
+        sink.write(OrderedDict([('Tin', 333.0)]))
+        sink.write(OrderedDict([('Tin', 340.0), ('pin', 1100)]))
+        records = sink.records()
+    assert records == [{'Tin': 333.0, 'pin': None}, {'Tin': 340.0, 'pin': 1100}]
+
+
+def test_clipboard_sink():
+    sink = open_sink()
+    assert isinstance(sink, ClipboardSink)
+    sink.write(make_record(1))
+    sink.write(make_record(0))
+    with mock.patch('uconnrcmpy.sinks.copy') as copy:
+        sink.close()
+    copy.assert_called_once_with('333.0\t1100\t1200\n333.0\t1101\t1201')
+    assert sink.manifest() == set()
+    with pytest.raises(ValueError):
+        open_sink('results.txt')
+
+
+def test_results_sink_abstract():
+    with pytest.raises(TypeError):
+        ResultsSink()
+    assert not ClipboardSink.keeps_records
+    assert CSVSink.keeps_records and JSONLinesSink.keeps_records and SQLiteSink.keeps_records
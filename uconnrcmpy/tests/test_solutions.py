@@ -0,0 +1,71 @@
+"""
+Test module for the solutions module
+"""
+import os
+import shutil
+import threading
+import numpy as np
+import pytest
+from ..solutions import SolutionPool
+from ..mechanisms import mechanism_hash
+
+
+@pytest.fixture
+def chem_file(tmpdir):
+    file_name = 'species.cti'
+    chem_file = str(tmpdir.join(file_name))
+    shutil.copy(os.path.join(os.path.dirname(__file__), file_name), chem_file)
+    return chem_file
+
+
+def test_checkout_reuses_and_resets(chem_file):
+    pool = SolutionPool()
+    with pool.checkout(chem_file) as gas:
+        initial_state = gas.TPY
+        gas.TP = 1000.0, 50.0E5
+        gas.set_multiplier(0)
+        first = gas
+    with pool.checkout(chem_file) as gas:
+        assert gas is first
+        assert np.isclose(gas.T, initial_state[0])
+        assert np.isclose(gas.P, initial_state[1])
+        assert np.allclose(gas.Y, initial_state[2])
+        assert all(gas.multiplier(i) == 1.0 for i in range(gas.n_reactions))
+
+
+def test_nested_checkouts_are_distinct(chem_file):
+    pool = SolutionPool()
+    with pool.checkout(chem_file) as gas_1, pool.checkout(chem_file) as gas_2:
+        assert gas_1 is not gas_2
+    assert len(pool.idle[pool.key(chem_file)]) == 2
+
+
+def test_threads_are_isolated(chem_file):
+    pool = SolutionPool()
+    barrier = threading.Barrier(2)
+    solutions = []
+
+    def worker():
+        with pool.checkout(chem_file) as gas:
+            barrier.wait()
+            solutions.append(gas)
+            barrier.wait()
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert solutions[0] is not solutions[1]
+
+
+def test_key_follows_contents(chem_file):
+    pool = SolutionPool()
+    with open(chem_file, 'r') as in_file:
+        source = in_file.read()
+    key = pool.key(chem_file)
+    assert key == mechanism_hash(cti_source=source)
+    with open(chem_file, 'a') as out_file:
+        out_file.write('\n# A comment\n')
+    os.utime(chem_file, ns=(0, 0))
+    assert pool.key(chem_file) != key
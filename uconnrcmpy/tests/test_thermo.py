@@ -0,0 +1,48 @@
+"""
+Test module for the thermo module
+"""
+import numpy as np
+import os
+import pytest
+import cantera as ct
+from ..thermo import NASA7Mixture
+from ..solutions import solution_pool
+
+
+@pytest.fixture
+def gas():
+    with solution_pool.checkout(os.path.join(os.path.dirname(__file__), 'species.cti')) as gas:
+        gas.X = 'N2:0.7, O2(2):0.24, iBuOH(1):0.06'
+        yield gas
+
+
+def test_properties_match_cantera(gas):
+    mixture = NASA7Mixture(gas)
+    temperature = np.linspace(300.0, 2500.0, 100)
+    cp_R, h_RT, s_R = [np.zeros(len(temperature)) for _ in range(3)]
+    for i, T in enumerate(temperature):
+        gas.TP = T, 2.0E5
+        cp_R[i] = gas.cp_mole/ct.gas_constant
+        h_RT[i] = gas.enthalpy_mole/(ct.gas_constant*T)
+        s_R[i] = gas.entropy_mole/ct.gas_constant
+    assert np.allclose(mixture.cp_R(temperature), cp_R, rtol=1.0E-12)
+    assert np.allclose(mixture.h_RT(temperature), h_RT, rtol=1.0E-12)
+    assert np.allclose(mixture.entropy_R(temperature, 2.0E5), s_R, rtol=1.0E-12)
+
+
+def test_isentropic_temperature(gas):
+    mixture = NASA7Mixture(gas)
+    gas.TP = 333.0, 1.2E5
+    initial_entropy = gas.entropy_mass
+    initial_volume = gas.volume_mass
+    pressure = np.linspace(1.2E5, 60.0E5, 500)
+    temperature = np.zeros(len(pressure))
+    volume = np.zeros(len(pressure))
+    for i, p in enumerate(pressure):
+        gas.SP = initial_entropy, p
+        temperature[i] = gas.T
+        volume[i] = gas.volume_mass/initial_volume
+    assert np.allclose(mixture.isentropic_temperature(pressure, 333.0, 1.2E5), temperature,
+                       rtol=1.0E-8)
+    assert np.allclose(mixture.isentropic_volume_temperature(volume, 333.0, 1.0), temperature,
+                       rtol=1.0E-8)
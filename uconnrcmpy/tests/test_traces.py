@@ -0,0 +1,94 @@
+"""
+Test module for the traces module
+"""
+import numpy as np
+import os
+import pytest
+from ..solutions import solution_pool
+from ..traces import (VoltageTrace, ExperimentalPressureTrace, IsentropicTrace,
+                      VolumeFromPressure, TemperatureFromPressure)
+
+
+@pytest.fixture(scope='module', params=[
+    '00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt',
+    'NR_00_in_00_mm_333K-1137t-100x-21-Jul-15-1251.txt',
+])
+def trace_file(request):
+    return os.path.join(os.path.dirname(__file__), request.param)
+
+
+def test_spectral_cutoff_matches_filtfilt(trace_file):
+    filtfilt_trace = VoltageTrace(trace_file, cache=False, cutoff_method='filtfilt')
+    spectral_trace = VoltageTrace(trace_file, cache=False, cutoff_method='spectral')
+    assert np.isclose(spectral_trace.filter_frequency, filtfilt_trace.filter_frequency,
+                      rtol=0.005)
+
+
+def test_spectral_residuals_match_filtfilt(trace_file):
+    trace = VoltageTrace(trace_file, cache=False, cutoff_method='spectral')
+    nyquist_freq = trace.frequency/2.0
+    freqs = np.linspace(nyquist_freq/101, nyquist_freq, 101)
+    assert np.allclose(trace.spectral_residuals(freqs), trace.filtfilt_residuals(freqs),
+                       rtol=1.0E-3)
+
+
+def test_search_cutoff_matches_filtfilt(trace_file):
+    filtfilt_trace = VoltageTrace(trace_file, cache=False, cutoff_method='filtfilt')
+    search_trace = VoltageTrace(trace_file, cache=False, cutoff_method='search')
+    assert np.isclose(search_trace.filter_frequency, filtfilt_trace.filter_frequency,
+                      rtol=0.005)
+
+
+def test_invalid_cutoff_method(trace_file):
+    with pytest.raises(ValueError):
+        VoltageTrace(trace_file, cache=False, cutoff_method='fft')
+
+
+def loop_find_min_p_idx(pressure):
+    """Reference implementation of the search in find_EOC"""
+    min_p_idx = np.argmax(pressure) - 100
+    while pressure[min_p_idx] >= pressure[min_p_idx - 50]:
+        min_p_idx -= 1
+    return min_p_idx
+
+
+@pytest.mark.parametrize('file_name,pin,factor', [
+    ('00_in_00_mm_333K-1146t-100x-21-Jul-15-1226.txt', 1146, 100),
+    ('NR_00_in_00_mm_333K-1137t-100x-21-Jul-15-1251.txt', 1137, 100),
+])
+def test_find_EOC_matches_loop(file_name, pin, factor):
+    file_path = os.path.join(os.path.dirname(__file__), file_name)
+    trace = ExperimentalPressureTrace(VoltageTrace(file_path, cache=False), pin, factor)
+    min_p_idx = loop_find_min_p_idx(trace.pressure)
+    p_EOC_idx = np.argmax(trace.pressure[0:min_p_idx])
+    if trace.is_reactive:
+        assert trace.EOC_idx == p_EOC_idx
+    else:
+        assert trace.EOC_idx == np.argmax(trace.pressure)
+
+
+def test_find_EOC_monotonic_pressure():
+    trace = ExperimentalPressureTrace.__new__(ExperimentalPressureTrace)
+    trace.pressure = np.linspace(1.0, 30.0, 1000)
+    with pytest.raises(ValueError):
+        trace.find_EOC()
+
+
+def test_isentropic_trace_matches_cantera():
+    chem_file = os.path.join(os.path.dirname(__file__), 'species.cti')
+    pressure = np.linspace(1.5, 50.0, 300)
+    trace = IsentropicTrace(pressure, 2.0, 333.0, chem_file=chem_file)
+    with solution_pool.checkout(chem_file) as gas:
+        gas.TP = 333.0, pressure[0]*1.0E5
+        initial_entropy = gas.entropy_mass
+        initial_density = gas.density
+        for i, p in enumerate(pressure):
+            gas.SP = initial_entropy, p*1.0E5
+            assert np.isclose(trace.temperature[i], gas.T, rtol=1.0E-6)
+            assert np.isclose(trace.density[i], gas.density, rtol=1.0E-6)
+            assert np.isclose(trace.volume[i], 2.0*initial_density/gas.density, rtol=1.0E-6)
+            assert np.isclose(trace.enthalpy[i], gas.enthalpy_mass, rtol=1.0E-6)
+    assert np.allclose(trace.volume, VolumeFromPressure(pressure, 2.0, 333.0,
+                                                        chem_file=chem_file).volume)
+    assert np.allclose(trace.temperature, TemperatureFromPressure(pressure, 333.0,
+                                                                  chem_file=chem_file).temperature)
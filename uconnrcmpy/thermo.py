@@ -0,0 +1,287 @@
+"""Vectorized thermodynamic properties of ideal gas mixtures"""
+
+# Third-party imports
+import numpy as np
+import cantera as ct
+
+
+class NASA7Mixture(object):
+    r"""Thermodynamic properties of an ideal gas mixture of fixed composition.
+
+    The NASA 7-coefficient polynomials and the mole fractions of the
+    species in a `cantera.Solution` are extracted once, and the
+    properties are evaluated for whole arrays of temperature with
+    NumPy. Since the polynomials of the mixture are the mole-fraction
+    weighted sums of the polynomials of the species, the coefficients
+    are summed in advance for each range of temperature between the
+    midpoint temperatures of the species, so the cost of evaluating a
+    property does not depend on the number of species.
+
+    Parameters
+    ----------
+    gas : `cantera.Solution`
+        Ideal gas phase whose current composition is used
+
+    Attributes
+    ----------
+    X : `numpy.ndarray`
+        Mole fractions of the species that are present in the mixture
+    mean_molecular_weight : `float`
+        Mean molecular weight of the mixture, in kg/kmol
+    reference_pressure : `float`
+        Reference pressure of the polynomials, in Pa
+    breakpoints : `numpy.ndarray`
+        Sorted midpoint temperatures of the species, in Kelvin
+    coeffs : `numpy.ndarray`
+        Coefficients of the mixture polynomials, with one row for each
+        range of temperature separated by the ``breakpoints``
+
+    Raises
+    ------
+    ValueError
+        If the thermodynamic data of a species in the mixture are not
+        NASA 7-coefficient polynomials
+
+    Notes
+    -----
+    The polynomials are evaluated in the same way as by Cantera,
+    including using the low temperature polynomial of a species at its
+    midpoint temperature, so the properties are identical to the
+    values from Cantera up to round-off. The temperatures along an
+    isentrope are found by Newton iterations on the logarithm of the
+    temperature, which are converged to a relative change of the
+    temperature of ``1.0E-12``. The temperatures agree with the values
+    found by setting the state of the `cantera.Solution`, which uses
+    its own iterative solver, to a relative error better than
+    ``1.0E-8``. The exception is within a few millikelvin of the
+    midpoint temperature of a species whose polynomials are not
+    continuous there, where the isentrope can have two temperatures at
+    the same pressure and either one may be found.
+    """
+    def __init__(self, gas):
+        present = np.nonzero(gas.X > 0)[0]
+        self.X = gas.X[present]
+        self.mean_molecular_weight = gas.mean_molecular_weight
+        t_mid = np.zeros(len(present))
+        high = np.zeros((len(present), 7))
+        low = np.zeros((len(present), 7))
+        for i, k in enumerate(present):
+            thermo = gas.species(int(k)).thermo
+            if not isinstance(thermo, ct.NasaPoly2):
+                raise ValueError('The thermodynamic data of species {} are not NASA 7-coefficient '
+                                 'polynomials.'.format(gas.species_name(int(k))))
+            t_mid[i] = thermo.coeffs[0]
+            high[i] = thermo.coeffs[1:8]
+            low[i] = thermo.coeffs[8:15]
+            self.reference_pressure = thermo.reference_pressure
+
+        self.breakpoints = np.unique(t_mid)
+        self.coeffs = np.zeros((len(self.breakpoints) + 1, 7))
+        for r in range(len(self.breakpoints) + 1):
+            # A species uses its high temperature polynomial in the
+            # ranges above its midpoint temperature
+            use_high = t_mid <= (self.breakpoints[r - 1] if r > 0 else -np.inf)
+            self.coeffs[r] = np.dot(self.X, np.where(use_high[:, np.newaxis], high, low))
+
+        self.mixing_entropy = -np.dot(self.X, np.log(self.X))
+
+    def __repr__(self):
+        return 'NASA7Mixture(X={self.X!r})'.format(self=self)
+
+    def range_coeffs(self, temperature):
+        """Select the coefficients of the mixture for each temperature.
+
+        Parameters
+        ----------
+        temperature : `numpy.ndarray`
+            1-D array containing the temperature, in Kelvin
+
+        Returns
+        -------
+        `numpy.ndarray`
+            2-D array with the coefficients of the mixture polynomials
+            for each temperature in the rows
+        """
+        return self.coeffs[np.searchsorted(self.breakpoints, temperature, side='left')]
+
+    def cp_R(self, temperature):
+        """Compute the molar heat capacity at constant pressure.
+
+        Parameters
+        ----------
+        temperature : `numpy.ndarray`
+            1-D array containing the temperature, in Kelvin
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The heat capacity divided by the gas constant
+        """
+        T = np.asarray(temperature, dtype=float)
+        a = self.range_coeffs(T)
+        return a[:, 0] + T*(a[:, 1] + T*(a[:, 2] + T*(a[:, 3] + T*a[:, 4])))
+
+    def h_RT(self, temperature):
+        """Compute the molar enthalpy.
+
+        Parameters
+        ----------
+        temperature : `numpy.ndarray`
+            1-D array containing the temperature, in Kelvin
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The enthalpy divided by the gas constant and the temperature
+        """
+        T = np.asarray(temperature, dtype=float)
+        a = self.range_coeffs(T)
+        return (a[:, 0] + T*(a[:, 1]/2 + T*(a[:, 2]/3 + T*(a[:, 3]/4 + T*a[:, 4]/5))) +
+                a[:, 5]/T)
+
+    def s0_R(self, temperature):
+        """Compute the molar entropy at the reference pressure.
+
+        The entropy of mixing is not included.
+
+        Parameters
+        ----------
+        temperature : `numpy.ndarray`
+            1-D array containing the temperature, in Kelvin
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The entropy divided by the gas constant
+        """
+        T = np.asarray(temperature, dtype=float)
+        a = self.range_coeffs(T)
+        return (a[:, 0]*np.log(T) + T*(a[:, 1] + T*(a[:, 2]/2 + T*(a[:, 3]/3 + T*a[:, 4]/4))) +
+                a[:, 6])
+
+    def entropy_R(self, temperature, pressure):
+        """Compute the molar entropy of the mixture.
+
+        Parameters
+        ----------
+        temperature : `numpy.ndarray`
+            1-D array containing the temperature, in Kelvin
+        pressure : `numpy.ndarray`
+            1-D array containing the pressure, in Pa
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The entropy divided by the gas constant
+        """
+        return (self.s0_R(temperature) + self.mixing_entropy -
+                np.log(np.asarray(pressure)/self.reference_pressure))
+
+    def newton(self, function, derivative, target, T_guess, rtol=1.0E-12, max_iter=50):
+        """Solve for the temperature by Newton iterations on its logarithm.
+
+        Parameters
+        ----------
+        function : `callable`
+            Function of the temperature array whose value should equal
+            ``target``
+        derivative : `callable`
+            Function of the temperature array that returns the
+            derivative of ``function`` with respect to the logarithm of
+            the temperature
+        target : `numpy.ndarray`
+            1-D array containing the value of ``function`` at the
+            solution
+        T_guess : `numpy.ndarray`
+            1-D array containing the initial guess of the temperature
+        rtol : `float`, optional
+            Relative change of the temperature at which the iterations
+            stop
+        max_iter : `int`, optional
+            Largest number of iterations
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The temperature that solves each equation
+
+        Raises
+        ------
+        RuntimeError
+            If the iterations do not converge
+        """
+        log_T = np.log(T_guess)
+        active = np.arange(len(log_T))
+        for _ in range(max_iter):
+            T = np.exp(log_T[active])
+            step = (function(T) - target[active])/derivative(T)
+            # Limit the step to a factor of two in the temperature
+            np.clip(step, -0.7, 0.7, out=step)
+            log_T[active] -= step
+            active = active[np.abs(step) > rtol]
+            if len(active) == 0:
+                return np.exp(log_T)
+
+        # If the entropy jumps where the polynomials of a species meet,
+        # a solution in the jump cycles around the midpoint temperature,
+        # which is then taken as the solution like Cantera does
+        T = np.exp(log_T)
+        distance = np.abs(np.log(T[active, np.newaxis]/self.breakpoints[np.newaxis, :]))
+        nearest = np.argmin(distance, axis=1)
+        if np.all(distance[np.arange(len(active)), nearest] <= 1.0E-5):
+            T[active] = self.breakpoints[nearest]
+            return T
+        raise RuntimeError('The temperature along the isentrope did not converge.')
+
+    def isentropic_temperature(self, pressure, T_ref, p_ref):
+        """Compute the temperature along an isentrope from the pressure.
+
+        Parameters
+        ----------
+        pressure : `numpy.ndarray`
+            1-D array containing the pressure
+        T_ref : `float`
+            Temperature of the reference state of the isentrope, in
+            Kelvin
+        p_ref : `float`
+            Pressure of the reference state of the isentrope, in the
+            same units as ``pressure``
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The temperature at each pressure, in Kelvin
+        """
+        pressure = np.asarray(pressure, dtype=float)
+        target = self.s0_R([T_ref])[0] + np.log(pressure/p_ref)
+        # The guess assumes the heat capacity of the reference state
+        cp_R_ref = self.cp_R([T_ref])[0]
+        T_guess = T_ref*(pressure/p_ref)**(1/cp_R_ref)
+        return self.newton(self.s0_R, self.cp_R, target, T_guess)
+
+    def isentropic_volume_temperature(self, volume, T_ref, v_ref):
+        """Compute the temperature along an isentrope from the volume.
+
+        Parameters
+        ----------
+        volume : `numpy.ndarray`
+            1-D array containing the volume
+        T_ref : `float`
+            Temperature of the reference state of the isentrope, in
+            Kelvin
+        v_ref : `float`
+            Volume of the reference state of the isentrope, in the same
+            units as ``volume``
+
+        Returns
+        -------
+        `numpy.ndarray`
+            The temperature at each volume, in Kelvin
+        """
+        volume = np.asarray(volume, dtype=float)
+        # At constant entropy, s0/R - ln(T) + ln(v) is constant
+        target = self.s0_R([T_ref])[0] - np.log(T_ref) - np.log(volume/v_ref)
+        cv_R_ref = self.cp_R([T_ref])[0] - 1
+        T_guess = T_ref*(v_ref/volume)**(1/cv_R_ref)
+        return self.newton(lambda T: self.s0_R(T) - np.log(T), lambda T: self.cp_R(T) - 1,
+                           target, T_guess)
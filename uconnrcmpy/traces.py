@@ -4,12 +4,17 @@
 
 # Third-party imports
 import numpy as np
-import cantera as ct
 from scipy import signal as sig
-from scipy.interpolate import UnivariateSpline
+from scipy.interpolate import UnivariateSpline, CubicSpline
 from scipy.stats import linregress
 
 # Local imports
+from .readers import load_trace
+from .isentropes import get_isentrope_table
+from .derivatives import (forward_difference,
+                          smoothed_forward_difference,
+                          savgol_derivative,
+                          )
 from .constants import (one_atm_in_bar,
                         one_atm_in_torr,
                         one_bar_in_pa,
@@ -23,6 +28,21 @@ class VoltageTrace(object):
     ----------
     file_path : `pathlib.Path`
         `~pathlib.Path` object associated with the particular experiment
+    cache : `bool`, optional
+        If `True`, the signal is loaded from a binary sidecar of the
+        text file when possible. See `~uconnrcmpy.readers.load_trace`.
+    cutoff_method : `str`, optional
+        Method used to compute the filter residuals when the cutoff
+        frequency is set automatically, one of ``'filtfilt'`` (the
+        default), ``'spectral'``, or ``'search'``. See
+        `~VoltageTrace.filter_frequency`.
+    search_freqs : `int`, optional
+        Number of cutoff frequencies in the coarse grid of the
+        ``'search'`` method. See `~VoltageTrace.search_residuals`.
+    filter_frequency : `float`, optional
+        Cutoff frequency of the low-pass filter. If not given, the
+        optimal cutoff frequency is found from the residuals. See
+        `~VoltageTrace.filter_frequency`.
 
     Attributes
     ----------
@@ -36,6 +56,12 @@ class VoltageTrace(object):
         The sampling frequency of the pressure trace
     filtered_voltage : `numpy.ndarray`
         The voltage trace after filtering
+    cutoff_method : `str`
+        Method used to compute the filter residuals when the cutoff
+        frequency is set automatically
+    search_freqs : `int`
+        Number of cutoff frequencies in the coarse grid of the
+        ``'search'`` method
 
     Note
     ----
@@ -43,13 +69,19 @@ class VoltageTrace(object):
     mean of the first 200 points to eliminate DAQ startup
     effects seen in some data.
     """
-    def __init__(self, file_path):
+    def __init__(self, file_path, cache=True, cutoff_method='filtfilt', search_freqs=13,
+                 filter_frequency=None):
+        if cutoff_method not in ('filtfilt', 'spectral', 'search'):
+            raise ValueError('cutoff_method must be one of "filtfilt", "spectral", or "search", '
+                             'not {!r}'.format(cutoff_method))
+        self.cutoff_method = cutoff_method
+        self.search_freqs = search_freqs
         self.file_path = file_path
-        self.signal = np.genfromtxt(str(self.file_path))
+        self.signal = load_trace(self.file_path, cache=cache)
         self.time = self.signal[:, 0]
         self.frequency = np.rint(1/self.time[1])
 
-        self.filter_frequency = None
+        self.filter_frequency = filter_frequency
 
         self.signal[0, 1] = np.mean(self.signal[:200, 1])
 
@@ -80,6 +112,15 @@ class VoltageTrace(object):
         et al. [1]_). The methodology is described by Yu et al. [1]_,
         and the code is modifed from Duarte [2]_.
 
+        The residuals are computed by `~VoltageTrace.filtfilt_residuals`
+        or `~VoltageTrace.spectral_residuals`, depending on the
+        `~VoltageTrace.cutoff_method`. The spectral method computes the
+        same residuals from a single Fourier transform of the voltage and
+        is much faster for long traces. The search method filters the
+        voltage at a coarse grid of cutoff frequencies and only fills in
+        the full grid near the optimal cutoff frequency; see
+        `~VoltageTrace.search_residuals`.
+
         References
         ----------
         .. [1] B. Yu, D. Gabriel, L. Noble, and K.N. An, "Estimate of
@@ -100,30 +141,15 @@ class VoltageTrace(object):
             nyquist_freq = self.frequency/2.0
             n_freqs = 101
             freqs = np.linspace(nyquist_freq/n_freqs, nyquist_freq, n_freqs)
-            resid = np.zeros(n_freqs)
-            for i, fc in enumerate(freqs):
-                b, a = sig.butter(1, fc/nyquist_freq)
-                yf = sig.filtfilt(b, a, self.signal[:, 1])
-                resid[i] = np.sqrt(np.mean((yf - self.signal[:, 1])**2))
-
-            end_points = np.linspace(0.5, 0.1, 9)
-            r_sq = np.zeros(len(end_points))
-            intercepts = np.zeros(len(end_points))
-            for i, end_point in enumerate(end_points):
-                # The indices of the frequencies used for fitting the straight line
-                fit_freqs = np.arange(np.nonzero(freqs >= nyquist_freq*0.05)[0][0],
-                                      np.nonzero(freqs >= nyquist_freq*end_point)[0][0] + 1)
-                _, intercepts[i], r, _, _ = linregress(freqs[fit_freqs], resid[fit_freqs])
-                r_sq[i] = r**2
-
-            intercept = intercepts[np.argmax(r_sq)]
-
-            # The UnivariateSpline with s=0 forces the spline fit through every
-            # data point in the array. The residuals are shifted down by the
-            # intercept so that the root of the spline is the optimum cutoff
-            # frequency
+            if self.cutoff_method == 'spectral':
+                resid = self.spectral_residuals(freqs)
+            elif self.cutoff_method == 'search':
+                resid = self.search_residuals(freqs)
+            else:
+                resid = self.filtfilt_residuals(freqs)
+
             try:
-                self._filter_frequency = UnivariateSpline(freqs, resid - intercept, s=0).roots()[0]
+                self._filter_frequency = self.cutoff_from_residuals(freqs, resid)
             except IndexError:
                 self._filter_frequency = float(input(
                     'Automatic setting of the filter frequency failed. Please input a frequency; '
@@ -131,6 +157,199 @@ class VoltageTrace(object):
         else:
             self._filter_frequency = value
 
+    def filtfilt_residuals(self, freqs):
+        """Compute the filter residuals by filtering the voltage.
+
+        Parameters
+        ----------
+        freqs : `numpy.ndarray`
+            1-D array of cutoff frequencies at which the residuals
+            should be computed
+
+        Returns
+        -------
+        `numpy.ndarray`
+            1-D array of the root-mean-squared difference between the
+            filtered and unfiltered voltage for each cutoff frequency
+
+        Notes
+        -----
+        The voltage is filtered once for each cutoff frequency. A cutoff
+        at the Nyquist frequency does not filter the voltage at all, so
+        its residual is zero.
+        """
+        nyquist_freq = self.frequency/2.0
+        resid = np.zeros(len(freqs))
+        for i, fc in enumerate(freqs):
+            if fc >= nyquist_freq:
+                continue
+            b, a = sig.butter(1, fc/nyquist_freq)
+            yf = sig.filtfilt(b, a, self.signal[:, 1])
+            resid[i] = np.sqrt(np.mean((yf - self.signal[:, 1])**2))
+
+        return resid
+
+    def spectral_residuals(self, freqs):
+        r"""Compute the filter residuals from the spectrum of the voltage.
+
+        Parameters
+        ----------
+        freqs : `numpy.ndarray`
+            1-D array of cutoff frequencies at which the residuals
+            should be computed
+
+        Returns
+        -------
+        `numpy.ndarray`
+            1-D array of the root-mean-squared difference between the
+            filtered and unfiltered voltage for each cutoff frequency
+
+        Notes
+        -----
+        Filtering forwards and backwards with a first-order Butterworth
+        filter multiplies each frequency component of the signal by the
+        squared magnitude of the filter response,
+
+        .. math:: |H(\omega)|^2 = \frac{1}{1 + \tan^2(\omega/2)/\tan^2(\omega_c/2)}
+
+        where :math:`\omega_c` is the cutoff frequency, normalized so
+        that the Nyquist frequency is :math:`\pi`. By Parseval's theorem,
+        the mean-squared residual is then
+
+        .. math:: \frac{1}{N^2}\sum_k |Y_k|^2 \left(1 - |H(\omega_k)|^2\right)^2
+
+        where :math:`Y_k` is the discrete Fourier transform of the
+        voltage. The transform is computed once and reused for every
+        cutoff frequency, rather than filtering the voltage once per
+        cutoff frequency as in `~VoltageTrace.filtfilt_residuals`.
+
+        Before the transform, the straight line through the first and
+        last points of the voltage is subtracted, so that the periodic
+        extension of the signal assumed by the transform does not have a
+        jump. The filter passes a straight line unchanged, so this does
+        not change the residuals. The results agree with
+        `~VoltageTrace.filtfilt_residuals` except for the effect of the
+        padding at the ends of the signal.
+        """
+        nyquist_freq = self.frequency/2.0
+        voltage = self.signal[:, 1]
+        n = len(voltage)
+        detrended = voltage - np.linspace(voltage[0], voltage[-1], n)
+        power = np.abs(np.fft.rfft(detrended))**2
+        # The one-sided spectrum counts each frequency except zero
+        # and (for even lengths) the Nyquist frequency twice
+        power[1:(n + 1)//2] *= 2
+        tan_sq = np.tan(np.pi*np.arange(len(power))/n)**2
+
+        resid = np.zeros(len(freqs))
+        for i, fc in enumerate(freqs):
+            if fc >= nyquist_freq:
+                continue
+            ratio = tan_sq/np.tan(np.pi*fc/nyquist_freq/2)**2
+            resid[i] = np.sqrt(np.dot(power, (ratio/(1 + ratio))**2))/n
+
+        return resid
+
+    def search_residuals(self, freqs):
+        """Estimate the filter residuals by a coarse-to-fine search.
+
+        Parameters
+        ----------
+        freqs : `numpy.ndarray`
+            1-D array of cutoff frequencies, evenly spaced up to the
+            Nyquist frequency
+
+        Returns
+        -------
+        `numpy.ndarray`
+            1-D array of the residuals at each of the ``freqs``. Near
+            the optimal cutoff frequency, the residuals are computed by
+            `~VoltageTrace.filtfilt_residuals`. Elsewhere, they are
+            interpolated.
+
+        Notes
+        -----
+        The residuals are first computed at `~VoltageTrace.search_freqs`
+        of the ``freqs``, spaced geometrically so that the low
+        frequencies, where the residuals change quickly, are sampled more
+        densely. The residual curve is smooth, so the remaining
+        residuals are interpolated by a cubic spline in log-log space.
+        The optimal cutoff frequency is found from the interpolated
+        residuals by `~VoltageTrace.cutoff_from_residuals`, the residuals
+        at the two frequencies on either side of it are computed, and the
+        process is repeated until those residuals are all computed
+        rather than interpolated.
+
+        For the traces in the test suite, the default of 13 coarse
+        frequencies filters the voltage about 14 times instead of 101
+        times, and the optimal cutoff frequency is within 0.1% of the
+        value from the full grid.
+        """
+        n_freqs = len(freqs)
+        resid = np.zeros(n_freqs)
+        computed = np.zeros(n_freqs, dtype=bool)
+
+        coarse = np.rint(np.logspace(0, np.log10(n_freqs), self.search_freqs)).astype(int) - 1
+        indices = np.unique(coarse)
+        while len(indices) > 0:
+            resid[indices] = self.filtfilt_residuals(freqs[indices])
+            computed[indices] = True
+
+            # The residual is zero at the Nyquist frequency, which can't
+            # be interpolated in log space
+            known = np.nonzero(computed & (resid > 0))[0]
+            interpolant = CubicSpline(np.log(freqs[known]), np.log(resid[known]))
+            estimate = np.where(computed, resid, np.exp(interpolant(np.log(freqs))))
+
+            optimum = np.searchsorted(freqs, self.cutoff_from_residuals(freqs, estimate))
+            indices = np.arange(max(optimum - 2, 0), min(optimum + 2, n_freqs))
+            indices = indices[~computed[indices]]
+
+        return estimate
+
+    def cutoff_from_residuals(self, freqs, resid):
+        """Find the optimal cutoff frequency from the filter residuals.
+
+        See the documentation of `~VoltageTrace.filter_frequency` for a
+        description of the method.
+
+        Parameters
+        ----------
+        freqs : `numpy.ndarray`
+            1-D array of cutoff frequencies, evenly spaced up to the
+            Nyquist frequency
+        resid : `numpy.ndarray`
+            1-D array of the residuals at each of the ``freqs``
+
+        Returns
+        -------
+        `float`
+            The optimal cutoff frequency
+
+        Raises
+        ------
+        `IndexError`
+            If the residuals never cross the intercept of the linear fit
+        """
+        nyquist_freq = self.frequency/2.0
+        end_points = np.linspace(0.5, 0.1, 9)
+        r_sq = np.zeros(len(end_points))
+        intercepts = np.zeros(len(end_points))
+        for i, end_point in enumerate(end_points):
+            # The indices of the frequencies used for fitting the straight line
+            fit_freqs = np.arange(np.nonzero(freqs >= nyquist_freq*0.05)[0][0],
+                                  np.nonzero(freqs >= nyquist_freq*end_point)[0][0] + 1)
+            _, intercepts[i], r, _, _ = linregress(freqs[fit_freqs], resid[fit_freqs])
+            r_sq[i] = r**2
+
+        intercept = intercepts[np.argmax(r_sq)]
+
+        # The UnivariateSpline with s=0 forces the spline fit through every
+        # data point in the array. The residuals are shifted down by the
+        # intercept so that the root of the spline is the optimum cutoff
+        # frequency
+        return UnivariateSpline(freqs, resid - intercept, s=0).roots()[0]
+
     def change_filter_freq(self, value):
         """Change the filter frequency
 
@@ -196,6 +415,10 @@ class ExperimentalPressureTrace(object):
         The initial pressure of the experiment, in units of Torr
     factor : `float`
         The factor set on the charge amplifier
+    derivative_method : `str`, optional
+        Method used to compute the smoothed derivative, either
+        ``'boxcar'`` (the default) or ``'savgol'``. See
+        `~ExperimentalPressureTrace.calculate_smoothed_derivative`.
 
     Attributes
     ----------
@@ -216,13 +439,20 @@ class ExperimentalPressureTrace(object):
         Boolean if the pressure trace represents a reactive or
         or non-reactive experiment
     derivative : `numpy.ndarray`
-        1-D array containing the raw derivative computed from the
+        1-D array containing the smoothed derivative computed from the
         `pressure` trace.
+    derivative_method : `str`
+        Method used to compute the smoothed derivative
     zeroed_time : `numpy.ndarray`
         1-D array containing the time, with the zero point set at
         the end of compression.
     """
-    def __init__(self, voltage_trace, initial_pressure_in_torr, factor):
+    def __init__(self, voltage_trace, initial_pressure_in_torr, factor,
+                 derivative_method='boxcar'):
+        if derivative_method not in ('boxcar', 'savgol'):
+            raise ValueError('derivative_method must be one of "boxcar" or "savgol", '
+                             'not {!r}'.format(derivative_method))
+        self.derivative_method = derivative_method
         initial_pressure_in_bar = initial_pressure_in_torr*one_atm_in_bar/one_atm_in_torr
         self.pressure = (voltage_trace.filtered_voltage - voltage_trace.filtered_voltage[0])
         self.pressure *= factor
@@ -236,9 +466,7 @@ class ExperimentalPressureTrace(object):
         self.frequency = voltage_trace.frequency
 
         self.p_EOC, self.EOC_idx, self.is_reactive = self.find_EOC()
-        self.derivative = self.calculate_derivative(self.pressure, self.time)
-        # Smooth the derivative with a moving average 151 points wide
-        self.derivative = sig.fftconvolve(self.derivative, np.ones(151)/151, mode='same')
+        self.derivative = self.calculate_smoothed_derivative()
         self.zeroed_time = self.time - self.time[self.EOC_idx]
 
     def __repr__(self):
@@ -293,6 +521,13 @@ class ExperimentalPressureTrace(object):
             True if the case is reactive and False otherwise,
             respectively
 
+        Raises
+        ------
+        `ValueError`
+            If the pressure does not decrease anywhere before the
+            maximum pressure point, so that the minimum pressure before
+            ignition cannot be found
+
         Notes
         -----
         The EOC is found by moving backwards from the maximum pressure
@@ -303,13 +538,28 @@ class ExperimentalPressureTrace(object):
         this minimum point. If the pressure at the minimum is close to
         the initial pressure, assume the case is non-reactive and set
         the EOC pressure and the index to the max pressure point.
+
+        The test compares each pressure with the pressure 50 points
+        earlier, starting 100 points before the maximum pressure. Rather
+        than moving backwards one point at a time, the differences are
+        computed for all the points at once and the last point where the
+        pressure has decreased is taken as the minimum.
         """
         is_reactive = True
         max_p = np.amax(self.pressure)
         max_p_idx = np.argmax(self.pressure)
-        min_p_idx = max_p_idx - 100
-        while self.pressure[min_p_idx] >= self.pressure[min_p_idx - 50]:
-            min_p_idx -= 1
+        lag = 50
+        start_idx = max_p_idx - 100
+        if start_idx >= lag:
+            # lagged_diff[i] is the change in pressure from point i to point i + lag
+            lagged_diff = self.pressure[lag:start_idx + 1] - self.pressure[:start_idx + 1 - lag]
+            decreasing = np.nonzero(lagged_diff < 0)[0]
+        else:
+            decreasing = []
+        if len(decreasing) == 0:
+            raise ValueError('The end of compression could not be found because the pressure '
+                             'does not decrease before the maximum pressure.')
+        min_p_idx = decreasing[-1] + lag
 
         p_EOC = np.amax(self.pressure[0:min_p_idx])
         p_EOC_idx = np.argmax(self.pressure[0:min_p_idx])
@@ -339,13 +589,45 @@ class ExperimentalPressureTrace(object):
         -----
         The derivative is calculated by a second-order forward method
         and any places where the derivative is infinite are set to
-        zero.
+        zero. See `~uconnrcmpy.derivatives.forward_difference`.
         """
-        m = len(dep_var)
-        ddt = np.zeros(m)
-        ddt[:m-2] = (-3*dep_var[:m-2] + 4*(dep_var[1:m-1]) - dep_var[2:m])/(2*np.diff(indep_var[:m-1]))  # NOQA
-        ddt[np.isinf(ddt)] = 0
-        return ddt
+        return forward_difference(dep_var, indep_var)
+
+    def calculate_smoothed_derivative(self, n_points=151, out=None, work=None):
+        """Calculate the smoothed derivative of the pressure.
+
+        Parameters
+        ----------
+        n_points : `int`, optional
+            Odd number of points over which the derivative is smoothed
+        out : `numpy.ndarray`, optional
+            Array of the same length as the `pressure` where the
+            derivative is stored. If not given, a new array is allocated.
+        work : `numpy.ndarray`, optional
+            Scratch array at least one element longer than the
+            `pressure`. If not given, a new array is allocated.
+
+        Returns
+        -------
+        `numpy.ndarray`
+            1-D array containing the smoothed derivative
+
+        Notes
+        -----
+        If the `derivative_method` is ``'boxcar'``, the derivative is
+        calculated by a second-order forward method and smoothed by a
+        moving average ``n_points`` wide, computed from the cumulative
+        sum of the derivative. See
+        `~uconnrcmpy.derivatives.smoothed_forward_difference`. If the
+        `derivative_method` is ``'savgol'``, the derivative is the slope
+        of a quadratic fit to the ``n_points`` around each point. See
+        `~uconnrcmpy.derivatives.savgol_derivative`.
+        """
+        if self.derivative_method == 'savgol':
+            return savgol_derivative(self.pressure, 1.0/self.frequency, n_points, out=out)
+        else:
+            return smoothed_forward_difference(self.pressure, self.time, n_points,
+                                               out=out, work=work)
 
 
 class AltExperimentalPressureTrace(ExperimentalPressureTrace):
@@ -354,13 +636,20 @@ class AltExperimentalPressureTrace(ExperimentalPressureTrace):
     These pressure traces do not have an associated voltage trace,
     but the machinery in the VoltageTrace class is useful for
     filtering.
+
+    Attributes
+    ----------
+    filter_frequency : `float`
+        The cutoff frequency of the filter of the pressure. See
+        `VoltageTrace.filter_frequency`.
     """
-    def __init__(self, file_path, initial_pressure_in_torr):
+    def __init__(self, file_path, initial_pressure_in_torr, cache=True):
         # This is not a real voltage trace
-        pressure_trace = VoltageTrace(file_path)
+        pressure_trace = VoltageTrace(file_path, cache=cache)
 
         self.time = pressure_trace.time
         self.frequency = pressure_trace.frequency
+        self.filter_frequency = pressure_trace.filter_frequency
 
         self.pressure = pressure_trace.filtered_voltage
         pressure_start = np.mean(self.pressure[20:500])
@@ -398,6 +687,10 @@ class PressureFromVolume(object):
         Optional for Cantera versions greater than 2.2.0.
     chem_file : `str`, optional
         Filename of the chemistry file to be used
+    isentrope_table : `~uconnrcmpy.isentropes.IsentropeTable`, optional
+        Table of the isentrope of the mixture. If not given, the table
+        for ``T_initial`` is retrieved by
+        `~uconnrcmpy.isentropes.get_isentrope_table`.
 
     Attributes
     ----------
@@ -406,22 +699,16 @@ class PressureFromVolume(object):
 
     Notes
     -----
-    The pressure is computed in a `cantera.Solution` object by
-    setting the volume and the entropy according to an isentropic
-    process using the given volume trace.
+    The pressure is interpolated from the tabulated isentrope through
+    the initial state, where the given volume trace is relative to
+    the volume at the initial state.
     """
-    def __init__(self, volume, p_initial, T_initial, chem_file='species.cti', cti_source=None):
-        if cti_source is None:
-            gas = ct.Solution(chem_file)
-        else:
-            gas = ct.Solution(source=cti_source)
-        gas.TP = T_initial, p_initial
-        initial_volume = gas.volume_mass
-        initial_entropy = gas.entropy_mass
-        self.pressure = np.zeros((len(volume)))
-        for i, v in enumerate(volume):
-            gas.SV = initial_entropy, v*initial_volume
-            self.pressure[i] = gas.P/one_bar_in_pa
+    def __init__(self, volume, p_initial, T_initial, chem_file='species.cti', cti_source=None,
+                 isentrope_table=None):
+        if isentrope_table is None:
+            isentrope_table = get_isentrope_table(T_initial, chem_file=chem_file,
+                                                  cti_source=cti_source)
+        self.pressure = isentrope_table.pressure(volume, 1.0, T_initial, p_initial)/one_bar_in_pa
 
     def __repr__(self):
         return 'PressureFromVolume(pressure={self.pressure!r})'.format(self=self)
@@ -444,6 +731,10 @@ class VolumeFromPressure(object):
         Cantera versions greater than 2.2.0.
     chem_file : `str`, optional
         Filename of the chemistry file to be used
+    isentrope_table : `~uconnrcmpy.isentropes.IsentropeTable`, optional
+        Table of the isentrope of the mixture. If not given, the table
+        for ``T_initial`` is retrieved by
+        `~uconnrcmpy.isentropes.get_isentrope_table`.
 
     Attributes
     ----------
@@ -456,23 +747,16 @@ class VolumeFromPressure(object):
 
     .. math:: v_i = v_{initial}*\rho_{initial}/\rho_i
 
-    where the index :math:`i` indicates the current point. The state
-    is set at each point by setting the pressure from the input array
-    and the entropy to be constant. The volume is computed by the
-    isentropic relationship described above.
+    where the index :math:`i` indicates the current point. The density
+    at each point is found from the tabulated isentrope through the
+    initial temperature and the first pressure of the input array.
     """
-    def __init__(self, pressure, v_initial, T_initial, chem_file='species.cti', cti_source=None):
-        if cti_source is None:
-            gas = ct.Solution(chem_file)
-        else:
-            gas = ct.Solution(source=cti_source)
-        gas.TP = T_initial, pressure[0]*one_bar_in_pa
-        initial_entropy = gas.entropy_mass
-        initial_density = gas.density
-        self.volume = np.zeros((len(pressure)))
-        for i, p in enumerate(pressure):
-            gas.SP = initial_entropy, p*one_bar_in_pa
-            self.volume[i] = v_initial*initial_density/gas.density
+    def __init__(self, pressure, v_initial, T_initial, chem_file='species.cti', cti_source=None,
+                 isentrope_table=None):
+        if isentrope_table is None:
+            isentrope_table = get_isentrope_table(T_initial, chem_file=chem_file,
+                                                  cti_source=cti_source)
+        self.volume = isentrope_table.volume(pressure, v_initial, T_initial, pressure[0])
 
     def __repr__(self):
         return 'VolumeFromPressure(volume={self.volume!r})'.format(self=self)
@@ -493,6 +777,10 @@ class TemperatureFromPressure(object):
         Optional for Cantera versions greater than 2.2.0.
     chem_file : `str`, optional
         Filename of the chemistry file to be used
+    isentrope_table : `~uconnrcmpy.isentropes.IsentropeTable`, optional
+        Table of the isentrope of the mixture. If not given, the table
+        for ``T_initial`` is retrieved by
+        `~uconnrcmpy.isentropes.get_isentrope_table`.
 
     Attributes
     ----------
@@ -501,21 +789,77 @@ class TemperatureFromPressure(object):
 
     Notes
     -----
-    The temperature is computed in a `cantera.Solution` object by
-    setting the pressure and the entropy according to an isentropic
-    process using the given pressure trace.
+    The temperature is interpolated from the tabulated isentrope
+    through the initial temperature and the first pressure of the
+    given pressure trace.
     """
-    def __init__(self, pressure, T_initial, chem_file='species.cti', cti_source=None):
-        if cti_source is None:
-            gas = ct.Solution(chem_file)
-        else:
-            gas = ct.Solution(source=cti_source)
-        gas.TP = T_initial, pressure[0]*one_bar_in_pa
-        initial_entropy = gas.entropy_mass
-        self.temperature = np.zeros((len(pressure)))
-        for i, p in enumerate(pressure):
-            gas.SP = initial_entropy, p*one_bar_in_pa
-            self.temperature[i] = gas.T
+    def __init__(self, pressure, T_initial, chem_file='species.cti', cti_source=None,
+                 isentrope_table=None):
+        if isentrope_table is None:
+            isentrope_table = get_isentrope_table(T_initial, chem_file=chem_file,
+                                                  cti_source=cti_source)
+        self.temperature = isentrope_table.temperature(pressure, T_initial, pressure[0])
 
     def __repr__(self):
         return 'TemperatureFromPressure(temperature={self.temperature!r})'.format(self=self)
+
+
+class IsentropicTrace(object):
+    r"""Create the traces of the state along an isentrope.
+
+    Compute the temperature, volume, density, and enthalpy from a
+    pressure trace, assuming an isentropic process.
+
+    Parameters
+    ----------
+    pressure : `numpy.ndarray`
+        1-D array containing the pressure, in bar
+    v_initial : `float`
+        Initial volume of the experiment, in m**3
+    T_initial : `float`
+        Initial temperature of the experiment, in Kelvin
+    chem_file : `str`, optional
+        Filename of the chemistry file to be used
+    isentrope_table : `~uconnrcmpy.isentropes.IsentropeTable`, optional
+        Table of the isentrope of the mixture. If not given, the table
+        for ``T_initial`` is retrieved by
+        `~uconnrcmpy.isentropes.get_isentrope_table`.
+
+    Attributes
+    ----------
+    temperature : `numpy.ndarray`
+        The temperature trace, in Kelvin
+    volume : `numpy.ndarray`
+        The volume trace, in m**3
+    density : `numpy.ndarray`
+        The density trace, in kg/m**3
+    enthalpy : `numpy.ndarray`
+        The specific enthalpy trace, in J/kg
+
+    Notes
+    -----
+    The temperature is interpolated from the tabulated isentrope
+    through the initial temperature and the first pressure of the
+    given pressure trace, and the other properties follow from the
+    ideal gas law, so the isentrope is only evaluated once. The
+    volume is computed according to the formula
+
+    .. math:: v_i = v_{initial}*\rho_{initial}/\rho_i
+
+    where the index :math:`i` indicates the current point.
+    """
+    def __init__(self, pressure, v_initial, T_initial, chem_file='species.cti', cti_source=None,
+                 isentrope_table=None):
+        if isentrope_table is None:
+            isentrope_table = get_isentrope_table(T_initial, chem_file=chem_file,
+                                                  cti_source=cti_source)
+        pressure = np.asarray(pressure)
+        self.temperature = isentrope_table.temperature(pressure, T_initial, pressure[0])
+        self.density = isentrope_table.density(pressure*one_bar_in_pa, self.temperature)
+        initial_density = isentrope_table.density(pressure[0]*one_bar_in_pa, T_initial)
+        self.volume = v_initial*initial_density/self.density
+        self.enthalpy = isentrope_table.enthalpy(self.temperature)
+
+    def __repr__(self):
+        return ('IsentropicTrace(temperature={self.temperature!r}, '
+                'volume={self.volume!r})').format(self=self)